@@ -92,7 +92,6 @@ def runExample():
 		
 		if myAdxl.ADXL313_INTSOURCE_INACTIVITY:
 			print("Inactivity detected.")
-			time.sleep(1)
 		if myAdxl.ADXL313_INTSOURCE_DATAREADY:
 			myAdxl.readAccel() # read all axis from sensor, note this also updates all instance variables
 			print(\
@@ -102,7 +101,10 @@ def runExample():
 			)
 		else:
 			print("Device is asleep (dataReady is reading false)")
-		time.sleep(0.05)
+
+		# poll at the data rate while awake, and back off to the (much slower)
+		# sleep rate while the sensor is asleep
+		time.sleep(myAdxl.getPollInterval())
 
 if __name__ == '__main__':
 	try:
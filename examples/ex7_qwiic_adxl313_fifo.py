@@ -11,7 +11,7 @@
 # In order to use the FIFO in this way, we need to set it up to fire an interrupt
 # when it gets "almost full". This threshold of samples is called the "watermark".
 # When the watermark level is reached, it will fire the interrupt INT1.
-# Our raspi will be monitoring the watermark int source bit, and then quickly
+# Our raspi will sleep until the watermark level is about to be reached, and then quickly
 # read whatevers in the FIFO and save it to a log file.
 # Note, we can't print the data in real time to the terminal
 # because python terminal is too slow.
@@ -22,8 +22,7 @@
 # This will tell us how many samples are currently held in the FIFO.
 # This will allow us to read the entire contents and keep an eye on how full it is
 # getting before each read. This will help us fine tune how much time we have
-# between each read to do other things. (in this example, we are simplly going to do
-# a delay and print dots, but you could choose to do more useful things).
+# between each read to do other things. (in this example, we simply sleep).
 
 # **SPI app note***
 # Note, this example uses I2C to communicate the the sensor.
@@ -42,8 +41,9 @@
 # Enable watermark interrupt.
 # Map watermark interrupt to "int pin 1".
 # This harware interrupt pin setup could be monitored by a GPIO on the raspi,
-# or external system, however, for this example, we will simply
-# poll the interrupt register via software to monitor its status.
+# or external system, however, for this example, we will let the library
+# predict when the watermark will be reached (waitForWatermark()), and only
+# check the FIFO entries around that time.
 
 #------------------------------------------------------------------------
 #
@@ -164,37 +164,25 @@ def runExample():
 	# The FIFO may have been full from previous use
 	# and then would fail to cause an interrupt when starting this example.
 
-	uSecTimer = 0 # used to print some "dots" during down time in cycle
 	while True:
-		myAdxl.updateIntSourceStatuses() # this will update all INTSOURCE statuses.
-		if myAdxl.ADXL313_INTSOURCE_WATERMARK:
-			entries = myAdxl.getFifoEntriesAmount()
-			timegap_us = (micros() - lastWatermarkTime)
-			timegap_ms = round(timegap_us / 1000)
-			
-			print("\nWatermark Interrupt! Time since last read: ", timegap_us, "us ", timegap_ms, "ms Entries:", entries)
-			lastWatermarkTime = micros()
-			while entries > 0:
-				myAdxl.updateIntSourceStatuses() # this will update all INTSOURCE statuses.
-				if myAdxl.ADXL313_INTSOURCE_DATAREADY:
-					myAdxl.readAccel() # read all axis from sensor, note this also updates all instance variables
-
-					# Gotta log data to a text file, because printing to terminal is too slow
-					logfile.write(str(myAdxl.x))
-					logfile.write("\t")
-					logfile.write(str(myAdxl.y))
-					logfile.write("\t")
-					logfile.write(str(myAdxl.z))
-					logfile.write("\n")
-					entries -= 1 # we've read one more entry, so let's keep track and keep going until we're done
-				else:
-					print("Waiting for Data.")
+		# Rather than polling the int source in a tight loop, sleep until the FIFO
+		# is predicted to reach the watermark (from the bandwidth and the FIFO entries).
+		entries = myAdxl.waitForWatermark()
+		timegap_us = (micros() - lastWatermarkTime)
+		timegap_ms = round(timegap_us / 1000)
 		
-		time.sleep(0.000001) # sleep 1 microsecond
-		uSecTimer += 1
-		if uSecTimer > 100:
-			print(".", end = '')
-			uSecTimer = 0
+		print("\nWatermark reached! Time since last read: ", timegap_us, "us ", timegap_ms, "ms Entries:", entries)
+		lastWatermarkTime = micros()
+
+		# read all the entries out of the FIFO in one go, note this also updates all instance variables
+		for x, y, z in myAdxl.readFifo(entries):
+			# Gotta log data to a text file, because printing to terminal is too slow
+			logfile.write(str(x))
+			logfile.write("\t")
+			logfile.write(str(y))
+			logfile.write("\t")
+			logfile.write(str(z))
+			logfile.write("\n")
 
 
 if __name__ == '__main__':
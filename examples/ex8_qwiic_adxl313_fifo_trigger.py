@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# ex8_qwiic_adxl313_fifo_trigger.py
+#
+# Simple Example for the Qwiic ADXL313 DeviceSet that shows how to use the FIFO trigger mode.
+# In trigger mode, the FIFO keeps a history of the most recent samples.
+# When the trigger event happens (here, the activity interrupt mapped to INT1),
+# the FIFO holds on to that history and fills up with the samples that follow.
+# This lets us see what happened right before (and after) an impact, without
+# having to poll the data registers at full rate in software.
+#------------------------------------------------------------------------
+#
+# Written by  SparkFun Electronics, October 2020
+# 
+# This python library supports the SparkFun Electroncis qwiic 
+# qwiic sensor/board ecosystem on a Raspberry Pi (and compatable) single
+# board computers. 
+#
+# More information on qwiic is at https://www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#
+#==================================================================================
+# Copyright (c) 2019 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+# Example 8
+#
+
+from __future__ import print_function
+import qwiic_adxl313
+import time
+import sys
+
+def runExample():
+
+	print("\nSparkFun Adxl313  Example 8 - FIFO trigger mode, capture samples around an impact.\n")
+	myAdxl = qwiic_adxl313.QwiicAdxl313()
+
+	if myAdxl.connected == False:
+		print("The Qwiic ADXL313 device isn't connected to the system. Please check your connection", \
+			file=sys.stderr)
+		return
+	else:
+		print("Device connected successfully.")        
+  
+	myAdxl.standby()	# Must be in standby before changing settings.
+
+	myAdxl.setRange(myAdxl.ADXL313_RANGE_4_G)
+	myAdxl.setBandwidth(myAdxl.ADXL313_BW_400)
+
+	# setup activity sensing options, activity will be our trigger event
+	myAdxl.setActivityX(True)		# enable x-axis participation in detecting activity
+	myAdxl.setActivityY(True)		# enable y-axis participation in detecting activity
+	myAdxl.setActivityZ(True)		# enable z-axis participation in detecting activity
+	myAdxl.setActivityThreshold(20)	# 0-255 (62.5mg/LSB)
+
+	# the trigger event is whichever interrupt is mapped to the trigger pin
+	myAdxl.setInterruptMapping(myAdxl.ADXL313_INT_ACTIVITY_BIT, myAdxl.ADXL313_INT1_PIN)
+	myAdxl.ActivityINT(1)
+	myAdxl.InactivityINT(0)
+	myAdxl.DataReadyINT(0)
+	myAdxl.WatermarkINT(0)
+
+	myAdxl.autosleepOff()		# just in case it was set from a previous setup
+
+	myAdxl.measureModeOn()
+
+	while True:
+		# keep 31 samples of history, and trigger on INT1
+		myAdxl.armFifoTrigger(31, myAdxl.ADXL313_INT1_PIN)
+		print("Armed, waiting for activity...")
+
+		event = myAdxl.captureFifoTrigger(postSamples = 64, timeout = 10)
+		if event is None:
+			print("No trigger in the last 10 seconds.")
+			continue
+
+		print("Trigger! Samples captured:", len(event.samples))
+		for i, (x, y, z) in enumerate(event.samples):
+			print(\
+			 '{: 8.4f}'.format(event.sampleTime(i) - event.timestamp)\
+			, '\t', '{: 06d}'.format(x)\
+			, '\t', '{: 06d}'.format(y)\
+			, '\t', '{: 06d}'.format(z)\
+			)
+		time.sleep(1)
+
+if __name__ == '__main__':
+	try:
+		runExample()
+	except (KeyboardInterrupt, SystemExit) as exErr:
+		print("\nEnding Example 8")
+		sys.exit(0)
+
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+#-----------------------------------------------------------------------------
+# ex9_qwiic_adxl313_compression.py
+#
+# Compares the library's sample codec (SampleEncoder, lossless, made for accelerometer
+# data) with the general purpose zlib and lzma compressors, on the same samples.
+# Size, encode time and decode time are printed for each.
+#
+# The samples are read from the FIFO for a few seconds (800Hz, 4g range). Pass the
+# name of a raw capture file (python -m qwiic_adxl313 capture --format raw ...) to
+# compare on recorded data instead.
+#------------------------------------------------------------------------
+#
+# Written by  SparkFun Electronics, October 2020
+# 
+# This python library supports the SparkFun Electroncis qwiic 
+# qwiic sensor/board ecosystem on a Raspberry Pi (and compatable) single
+# board computers. 
+#
+# More information on qwiic is at https://www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#
+#==================================================================================
+# Copyright (c) 2019 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+# Example 9
+#
+
+from __future__ import print_function
+import qwiic_adxl313
+import io
+import lzma
+import sys
+import time
+import zlib
+from array import array
+
+def captureSamples(seconds):
+	myAdxl = qwiic_adxl313.QwiicAdxl313()
+
+	if myAdxl.connected == False:
+		print("The Qwiic ADXL313 device isn't connected to the system. Please check your connection", \
+			file=sys.stderr)
+		return None
+	else:
+		print("Device connected successfully.")
+
+	myAdxl.standby()
+	myAdxl.setRange(myAdxl.ADXL313_RANGE_4_G)
+	myAdxl.setBandwidth(myAdxl.ADXL313_BW_400)	# 800Hz output data rate
+	myAdxl.setFifoMode(myAdxl.ADXL313_FIFO_MODE_STREAM)
+	myAdxl.setFifoSamplesThreshhold(24)
+	myAdxl.clearFifo()
+	myAdxl.measureModeOn()
+
+	print("Capturing", seconds, "seconds of samples...")
+	samples = array('h')
+	start = time.time()
+	while time.time() - start < seconds:
+		entries = myAdxl.waitForWatermark(timeout = 0.5)
+		if entries:
+			samples.extend(myAdxl.readFifo(entries).data)
+	myAdxl.standby()
+	return samples
+
+def loadSamples(fileName):
+	samples = array('h')
+	with open(fileName, 'rb') as f:
+		samples.frombytes(f.read())
+	if sys.byteorder == 'big':
+		samples.byteswap()
+	return samples
+
+def timed(function, *args):
+	start = time.perf_counter()
+	result = function(*args)
+	return result, time.perf_counter() - start
+
+def codecEncode(raw, order):
+	stream = io.BytesIO()
+	encoder = qwiic_adxl313.SampleEncoder(stream, blockSize = 32, order = order)
+	encoder.write(qwiic_adxl313.SampleBatch(raw))
+	encoder.flush()
+	return stream.getvalue()
+
+def codecDecode(data):
+	return list(qwiic_adxl313.SampleDecoder(data))
+
+def runExample():
+
+	print("\nSparkFun Adxl313  Example 9 - Sample codec compared with zlib and lzma.\n")
+
+	if len(sys.argv) > 1:
+		raw = loadSamples(sys.argv[1])
+	else:
+		raw = captureSamples(5)
+		if raw is None:
+			return
+	rawBytes = raw.tobytes()
+	count = len(raw) // 3
+	if count == 0:
+		print("No samples.")
+		return
+
+	print("Samples:", count, " raw size:", len(rawBytes), "bytes\n")
+	print("{:<22}{:>10}{:>8}{:>14}{:>14}".format("method", "bytes", "ratio", "encode ms", "decode ms"))
+
+	methods = [
+		("codec, order 1", lambda: codecEncode(raw, 1), codecDecode),
+		("codec, order 2", lambda: codecEncode(raw, 2), codecDecode),
+		("zlib, level 6", lambda: zlib.compress(rawBytes, 6), zlib.decompress),
+		("zlib, level 9", lambda: zlib.compress(rawBytes, 9), zlib.decompress),
+		("lzma, preset 6", lambda: lzma.compress(rawBytes, preset = 6), lzma.decompress),
+	]
+	for name, encode, decode in methods:
+		encoded, encodeTime = timed(encode)
+		decoded, decodeTime = timed(decode, encoded)
+		print("{:<22}{:>10}{:>8.2f}{:>14.2f}{:>14.2f}".format(
+			name, len(encoded), len(rawBytes) / float(len(encoded)), encodeTime * 1000, decodeTime * 1000))
+
+if __name__ == '__main__':
+	try:
+		runExample()
+	except (KeyboardInterrupt, SystemExit) as exErr:
+		print("\nEnding Example 9")
+		sys.exit(0)
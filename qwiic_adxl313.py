@@ -53,6 +53,34 @@ New to qwiic? Take a look at the entire [SparkFun qwiic ecosystem](https://www.s
 
 import qwiic_i2c
 import time
+import struct
+import threading
+import queue
+import heapq
+import bisect
+import itertools
+import contextlib
+import collections
+import math
+import os
+import errno
+import ctypes
+import sys
+from array import array
+
+# NumPy is optional, and only imported by the code that uses it
+_numpyModule = False
+
+def _numpy():
+	# the numpy module, or None if it isn't installed
+	global _numpyModule
+	if _numpyModule is False:
+		try:
+			import numpy
+		except ImportError:
+			numpy = None
+		_numpyModule = numpy
+	return _numpyModule
 
 # Define the device name and I2C addresses. These are set in the class defintion 
 # as class variables, making them avilable without having to create a class instance.
@@ -71,8 +99,10 @@ _AVAILABLE_I2C_ADDRESS = [0x1D, 0x53]
 _validChipIDs = [0xCB]
 
 # define the class that encapsulates the device being created. All information associated with this
-# device is encapsulated by this class. The device class should be the only value exported 
-# from this module.
+# device is encapsulated by this class. Besides the device class, this module exports the bus
+# transports (QwiicBusArbiter, QwiicLinuxI2C, QwiicAdxl313Spi), the sample containers and the
+# batch processing helpers defined after it. Servers, exporters, offline analysis and the
+# command line tool are in the qwiic_adxl313_* modules, so importing the driver stays light.
 
 class QwiicAdxl313(object):
 	"""
@@ -81,9 +111,18 @@ class QwiicAdxl313(object):
 		:param address: The I2C address to use for the device. 
 						If not provided, the default address is used.
 		:param i2c_driver: An existing i2c driver object. If not provided 
-						a driver object is created. 
+						a driver object is created. QwiicLinuxI2C, QwiicAdxl313Spi
+						(SPI, address is ignored) and QwiicBusArbiter can also be used.
 		:return: The ADXL313 device object.
 		:rtype: Object
+
+		Concurrency: an object can be shared between threads. Every read-modify-write
+		of a register (setRegisterBit(), setRange(), setFifoMode(), clearFifo(), ...)
+		runs under a per-object lock, so concurrent setters never lose bits.
+		Batch reads (readFifo()) take the lock once per batch, not once per register.
+		The x, y, z and ADXL313_INTSOURCE_* attributes are only a convenience for
+		single threaded code; from several threads, use the values returned by
+		readFifo(), readLatest() and getIntSource(), which are immutable.
 	"""
 	# Constructor
 	device_name = _DEFAULT_NAME
@@ -163,6 +202,7 @@ class QwiicAdxl313(object):
 	ADXL313_AUTOSLEEP_BIT = 0x04
 	ADXL313_MEASURE_BIT = 0x03
 	ADXL313_SLEEP_BIT = 0x02
+	ADXL313_WAKEUP_RATES = (8, 4, 2, 1)	# Hz, sample rate while asleep, by POWER_CTL wakeup bits [1:0]
 
  	#/********************** BANDWIDTH RATE CODES (HZ) *******************/
 	ADXL313_BW_1600 = 0xF			# 1111		IDD = 170uA
@@ -176,12 +216,36 @@ class QwiicAdxl313(object):
 	ADXL313_BW_6_25 = 0x7			# 0111		IDD = 65uA (43 in low power)
 	ADXL313_BW_3_125 = 0x6			# 0110		IDD = 57uA
 
+	# supply current (uA) per bandwidth code: (normal, low power or None if not available)
+	ADXL313_SUPPLY_CURRENT = {
+		0xF: (170, None),
+		0xE: (115, None),
+		0xD: (170, None),
+		0xC: (170, 115),
+		0xB: (170, 82),
+		0xA: (170, 64),
+		0x9: (115, 57),
+		0x8: (82, 50),
+		0x7: (65, 43),
+		0x6: (57, None),
+	}
+	ADXL313_LOW_POWER_BIT = 0x04		# BW_RATE: reduced power operation
+	ADXL313_STANDBY_CURRENT = 0.1		# uA
+	ADXL313_SLEEP_CURRENT = 43			# uA, autosleep while asleep (sampling at 8Hz or less, as low power 6.25Hz)
+
  	#/********************** FIFO MODE OPTIONS ***************************/
 	ADXL313_FIFO_MODE_BYPASS = 0x00
 	ADXL313_FIFO_MODE_FIFO = 0x01
 	ADXL313_FIFO_MODE_STREAM = 0x02
 	ADXL313_FIFO_MODE_TRIGGER = 0x03
 
+ 	#/********************** FIFO_CTL / FIFO_STATUS BITS *****************/
+	ADXL313_FIFO_TRIGGER_BIT = 0x05		# FIFO_CTL: trigger event linked to INT1 (0) or INT2 (1)
+	ADXL313_FIFO_TRIG_BIT = 0x07		# FIFO_STATUS: a trigger event has occurred
+	ADXL313_FIFO_SIZE = 32
+	ADXL313_BUS_BYTES_PER_ENTRY = 9		# I2C bytes to pop one entry: address, register, address, 6 data
+	ADXL313_BUS_BYTES_PER_POLL = 4		# I2C bytes to read one status register
+
  	#/****************************** ERRORS ******************************/
 	ADXL313_OK = 1		# No Error
 	ADXL313_ERROR = 0		# Error Exists
@@ -189,6 +253,8 @@ class QwiicAdxl313(object):
 	ADXL313_NO_ERROR = 0		# Initial State
 	ADXL313_READ_ERROR = 1		# Accelerometer Reading Error
 	ADXL313_BAD_ARG = 2		# Bad Argument
+	ADXL313_ID_ERROR = 3		# DEVID/PARTID does not match an ADXL313
+	ADXL313_STUCK_ERROR = 4		# Sensor data is not updating
 
  	#/********************** INTERRUPT STATUSES **************************/
 	ADXL313_INTSOURCE_DATAREADY = 0
@@ -197,6 +263,20 @@ class QwiicAdxl313(object):
 	ADXL313_INTSOURCE_WATERMARK = 0
 	ADXL313_INTSOURCE_OVERRUN = 0
 
+	#/********************** HEALTH SUPERVISION **************************/
+	# registers holding configuration, re-applied by recover()
+	ADXL313_CONFIG_REGISTERS = (0x1E, 0x1F, 0x20, 0x24, 0x25, 0x26, 0x27, 0x2C, 0x2E, 0x2F, 0x31, 0x38, 0x2D)
+	ADXL313_STUCK_CHECKS = 3			# health checks in a row without new data in measure mode
+	ADXL313_STUCK_PERIODS = 2			# sample periods waited for new data before the sensor is considered stuck
+	ADXL313_RECOVERY_DELAY_MIN = 0.1	# seconds, first retry delay of recover()
+	ADXL313_RECOVERY_DELAY_MAX = 30.0	# seconds, retry delays double up to this
+	ADXL313_BW_RATE_RESET = 0x0A		# BW_RATE after power up (100Hz output data rate)
+
+ 	#/********************** DATA_FORMAT BITS ****************************/
+	ADXL313_FULL_RES_BIT = 0x03		# 1: 1024 LSB/g at every range, 0: 10 bit (1024 LSB/g at 0.5g, halved per range step)
+
+	asleep = False		# autosleep state, see getPollInterval()
+
 	#/***************** x,y,z variables (raw values) *********************/
 	x = 0
 	y = 0
@@ -218,6 +298,219 @@ class QwiicAdxl313(object):
 		else:
 			self._i2c = i2c_driver
 
+		# bus error accounting and health supervision (see checkHealth())
+		self.i2cErrors = 0
+		self._config = {}
+		self._lastFrame = None
+		self._newData = 0
+		self._newDataAtLastCheck = 0
+		self._healthMonitor = None
+		self._noDataChecks = 0
+		self._recoveryDelay = self.ADXL313_RECOVERY_DELAY_MIN
+		self._nextRecovery = 0.0
+
+		# serializes read-modify-write sequences and batch reads (see class docstring)
+		self._lock = threading.RLock()
+
+		# energy and duty cycle accounting (see getEnergyStats())
+		self._powerState = 'standby'
+		self._powerStateCurrent = self.ADXL313_STANDBY_CURRENT
+		self.resetEnergyStats()
+
+		# latest sample cache shared by all readers (see readLatest())
+		self._latest = None
+		self._latestVersion = 0
+		self._latestLock = threading.Lock()
+
+		# FIFO fill rate (Hz) observed by waitForWatermark()
+		self._fillRate = None
+		self._fillRateNominal = None
+
+		# opt-in acquisition metrics (see enableMetrics())
+		self.metrics = None
+
+	# ----------------------------------
+	# _busTransaction()
+	#
+	# Holds a shared bus (see QwiicBusArbiter) for a sequence of transfers
+	def _busTransaction(self, priority):
+		transaction = getattr(self._i2c, 'transaction', None)
+		if transaction is None:
+			return contextlib.nullcontext()
+		return transaction(priority, self.address)
+
+	# ----------------------------------
+	# _readRegister() / _readRegisters() / _writeRegister()
+	#
+	# All register access goes through here, so bus errors are counted and
+	# configuration writes are remembered for recover()
+	def _countBus(self, transactions, nBytes):
+		with self._lock:
+			self.busTransactions += transactions
+			self.busBytes += nBytes
+
+	def _timed(self, function, *args):
+		# one bus call, timed for the transaction latency metric when enabled
+		metrics = self.metrics
+		if metrics is None:
+			return function(*args)
+		start = time.perf_counter()
+		try:
+			return function(*args)
+		finally:
+			latency = time.perf_counter() - start
+			with self._lock:
+				metrics.observeTransaction(latency)
+
+	def _readRegister(self, regAddress):
+		self._countBus(1, 1)
+		try:
+			return self._timed(self._i2c.readByte, self.address, regAddress)
+		except (IOError, OSError):
+			self.i2cErrors += 1
+			raise
+
+	def _readRegisters(self, regAddress, nBytes):
+		self._countBus(1, nBytes)
+		try:
+			return self._timed(self._i2c.readBlock, self.address, regAddress, nBytes)
+		except (IOError, OSError):
+			self.i2cErrors += 1
+			raise
+
+	def _readFifoData(self, entries):
+		# one data register read per FIFO entry; drivers with readBlocks() (e.g.
+		# QwiicLinuxI2C) batch them into as few bus operations as they can
+		self._countBus(entries, entries * self.ADXL313_TO_READ)
+		try:
+			readBlocks = getattr(self._i2c, 'readBlocks', None)
+			if readBlocks is not None:
+				return self._timed(readBlocks, self.address, self.ADXL313_DATA_X0, self.ADXL313_TO_READ, entries)
+			data = bytearray()
+			for _ in range(entries):
+				data.extend(self._timed(self._i2c.readBlock, self.address, self.ADXL313_DATA_X0, self.ADXL313_TO_READ))
+			return data
+		except (IOError, OSError):
+			self.i2cErrors += 1
+			raise
+
+	def _writeRegister(self, regAddress, value):
+		self._countBus(1, 1)
+		try:
+			self._timed(self._i2c.writeByte, self.address, regAddress, value)
+		except (IOError, OSError):
+			self.i2cErrors += 1
+			return False
+		if regAddress in self.ADXL313_CONFIG_REGISTERS:
+			with self._lock:
+				self._config[regAddress] = value
+				if regAddress == self.ADXL313_POWER_CTL or regAddress == self.ADXL313_BW_RATE:
+					self._updatePowerState()
+		return True
+
+	# ----------------------------------
+	# _updatePowerState()
+	#
+	# Closes the time spent in the previous power state, from the configuration written
+	# and the asleep attribute (call with the device lock held)
+	def _updatePowerState(self):
+		now = time.monotonic()
+		elapsed = now - self._powerStateSince
+		self._powerStateTimes[self._powerState] += elapsed
+		self._sensorCharge += self._powerStateCurrent * elapsed
+		self._powerStateSince = now
+
+		powerCtl = self._config.get(self.ADXL313_POWER_CTL, 0)
+		bwRate = self._config.get(self.ADXL313_BW_RATE, self.ADXL313_BW_RATE_RESET)
+		normalCurrent, lowPowerCurrent = self.ADXL313_SUPPLY_CURRENT.get(bwRate & 0x0F, (170, None))
+		lowPower = (bwRate >> self.ADXL313_LOW_POWER_BIT) & 1 and lowPowerCurrent is not None
+		if not (powerCtl >> self.ADXL313_MEASURE_BIT) & 1:
+			self._powerState = 'standby'
+			self._powerStateCurrent = self.ADXL313_STANDBY_CURRENT
+		elif (powerCtl >> self.ADXL313_AUTOSLEEP_BIT) & 1:
+			# asleep follows the activity/inactivity sources (see _trackSleep())
+			self._powerState = 'autosleep'
+			if self.asleep:
+				self._powerStateCurrent = self.ADXL313_SLEEP_CURRENT
+			else:
+				self._powerStateCurrent = lowPowerCurrent if lowPower else normalCurrent
+		elif lowPower:
+			self._powerState = 'lowpower'
+			self._powerStateCurrent = lowPowerCurrent
+		else:
+			self._powerState = 'measure'
+			self._powerStateCurrent = normalCurrent
+
+	# ----------------------------------
+	# getEnergyStats()
+	#
+	# Time per power state, bus and wake up counters, and an energy estimate
+	def getEnergyStats(self, supplyVoltage=3.3, transactionEnergy=0.0, wakeupEnergy=0.0):
+		""" 
+			Time spent in each power state (tracked from the POWER_CTL and BW_RATE
+			writes made through this object), bus and host wake up counters, and an
+			energy estimate from the ADXL313_SUPPLY_CURRENT table. With autosleep on,
+			time spent asleep (see the asleep attribute) is charged at
+			ADXL313_SLEEP_CURRENT. Only counters are read, so this is cheap to call often.
+
+			:param supplyVoltage: sensor supply voltage (V)
+			:param transactionEnergy: host + bus energy (J) per bus transaction
+			:param wakeupEnergy: host energy (J) per wake up (FIFO drain)
+
+			:return: dictionary with the seconds spent in 'standby', 'measure', 'lowpower'
+					 and 'autosleep', 'busTransactions', 'busBytes', 'wakeups',
+					 'sensorEnergy' (J) and 'energy' (J, sensor + bus + wake ups)
+			:rtype: dict
+		"""
+		with self._lock:
+			elapsed = time.monotonic() - self._powerStateSince
+			stats = dict(self._powerStateTimes)
+			stats[self._powerState] += elapsed
+			sensorEnergy = (self._sensorCharge + self._powerStateCurrent * elapsed) * 1e-6 * supplyVoltage
+			stats['busTransactions'] = self.busTransactions
+			stats['busBytes'] = self.busBytes
+			stats['wakeups'] = self.wakeups
+		stats['sensorEnergy'] = sensorEnergy
+		stats['energy'] = sensorEnergy + self.busTransactions * transactionEnergy + self.wakeups * wakeupEnergy
+		return stats
+
+	# ----------------------------------
+	# resetEnergyStats()
+	#
+	# Restarts the energy and duty cycle accounting
+	def resetEnergyStats(self):
+		""" 
+			Restarts the energy and duty cycle accounting (the power state is kept)
+		"""
+		with self._lock:
+			self._powerStateTimes = dict.fromkeys(('standby', 'measure', 'lowpower', 'autosleep'), 0.0)
+			self._powerStateSince = time.monotonic()
+			self._sensorCharge = 0.0
+			self.busTransactions = 0
+			self.busBytes = 0
+			self.wakeups = 0
+
+	# ----------------------------------
+	# enableMetrics()
+	#
+	# Turns on acquisition metrics collection
+	def enableMetrics(self, metrics=None):
+		""" 
+			Turns on acquisition metrics: FIFO fill at drain, full FIFO drains and drain
+			latency, collected by readFifo(), and the latency of every bus call. Bus and
+			error counters are read from this object when the metrics are rendered, so
+			they cost nothing extra.
+
+			:param metrics: an AcquisitionMetrics, a new one if not provided
+
+			:return: the metrics, to give to a qwiic_adxl313_metrics.MetricsServer
+			:rtype: AcquisitionMetrics
+		"""
+		if metrics is None:
+			metrics = AcquisitionMetrics(self)
+		self.metrics = metrics
+		return metrics
+
 	# ----------------------------------
 	# isConnected()
 	#
@@ -230,7 +523,10 @@ class QwiicAdxl313(object):
 			:return: True if the device is connected, otherwise False.
 			:rtype: bool
 		"""
-		return qwiic_i2c.isDeviceConnected(self.address)
+		isDeviceConnected = getattr(self._i2c, 'isDeviceConnected', None)
+		if isDeviceConnected is None:
+			return qwiic_i2c.isDeviceConnected(self.address)
+		return isDeviceConnected(self.address)
 
 	connected = property(isConnected)
 
@@ -246,9 +542,14 @@ class QwiicAdxl313(object):
 			:rtype: bool
 		"""
 		# are we who we need to be?
-		chipID = self._i2c.readByte(self.address, self.AGB0_REG_WHO_AM_I)
-		if not chipID in _validChipIDs:
-			print("Invalid Chip ID: 0x%.2X" % chipID)
+		try:
+			ids = self._readRegisters(self.ADXL313_DEVID_0, 3)
+		except (IOError, OSError):
+			print("Unable to read the chip ID")
+			return False
+		if ids[0] != self.ADXL313_DEVID_0_RSP_EXPECTED or ids[1] != self.ADXL313_DEVID_1_RSP_EXPECTED \
+				or not ids[2] in _validChipIDs:
+			print("Invalid Chip ID: 0x%.2X 0x%.2X 0x%.2X" % (ids[0], ids[1], ids[2]))
 			return False
 
 		return True
@@ -307,13 +608,20 @@ class QwiicAdxl313(object):
 			:return: Returns true of the function was completed, otherwise False.
 			:rtype: bool
 		"""
-		_register = self._i2c.readByte(self.address, regAddress)
-		if(state):
-			_register |= (1 << bitPos) # Forces nth Bit of _register to 1. Other Bits Unchanged.
-		else:
-			_register &= ~(1 << bitPos) # Forces nth Bit of _register to 0. Other Bits Unchanged.
-		self._i2c.writeByte(self.address, regAddress, _register)
-		return True        
+		return self._updateRegister(regAddress, 1 << bitPos, (1 << bitPos) if state else 0)
+
+	# ----------------------------------
+	# _updateRegister()
+	#
+	# Read-modify-write of some bits of a register
+	def _updateRegister(self, regAddress, mask, value):
+		# setters report any bus failure, on the read or the write, by returning False
+		with self._lock:
+			try:
+				_register = self._readRegister(regAddress)
+			except (IOError, OSError):
+				return False
+			return self._writeRegister(regAddress, (_register & ~mask) | (value & mask))
 
 	# ----------------------------------
 	# getRegisterBit()
@@ -329,7 +637,7 @@ class QwiicAdxl313(object):
 			:return: Status of bit spcified within the register (0 or 1)
 			:rtype: bool
 		"""
-		_register = self._i2c.readByte(self.address, regAddress)
+		_register = self._readRegister(regAddress)
 		return ((_register >> bitPos) & 1)  
 
 	# ----------------------------------
@@ -343,22 +651,151 @@ class QwiicAdxl313(object):
 			:return: Returns true of the function was completed, otherwise False.
 			:rtype: bool
 		"""
-		buff = self._i2c.readBlock(self.address, self.ADXL313_DATA_X0, self.ADXL313_TO_READ)
-		self.x = ((buff[1] << 8) | buff[0])
-		self.y = ((buff[3] << 8) | buff[2])
-		self.z = ((buff[5] << 8) | buff[4])
-
-		# device datatype is SIGNED 16 bit int (twos compliment)
-		# python receives this as simply 16 bits of data and stores it in a 32 byte data type
-		# we need to modify each incoming data value to be more useful and allow negative values
-		if self.x > 32767:
-			self.x -= 65536
-		if self.y > 32767:
-			self.y -= 65536
-		if self.z > 32767:
-			self.z -= 65536			
+		with self._lock:
+			buff = self._readRegisters(self.ADXL313_DATA_X0, self.ADXL313_TO_READ)
+			x = ((buff[1] << 8) | buff[0])
+			y = ((buff[3] << 8) | buff[2])
+			z = ((buff[5] << 8) | buff[4])
+
+			# device datatype is SIGNED 16 bit int (twos compliment)
+			# python receives this as simply 16 bits of data and stores it in a 32 byte data type
+			# we need to modify each incoming data value to be more useful and allow negative values
+			if x > 32767:
+				x -= 65536
+			if y > 32767:
+				y -= 65536
+			if z > 32767:
+				z -= 65536			
+			self.x, self.y, self.z = x, y, z
+			self._trackFrames([(x, y, z)])
+			self._setLatest((x, y, z))
 		return True    
 
+	# ----------------------------------
+	# readLatest()
+	#
+	# Latest sample, shared between readers
+	def readLatest(self, maxAge=None):
+		""" 
+			Returns the latest sample, reading the sensor only when the cached one is
+			older than maxAge. Concurrent callers share a single bus read, so several
+			consumers polling within one sample period cost one transaction.
+			Unlike readAccel(), x, y and z are not modified.
+
+			:param maxAge: staleness bound in seconds, defaults to one sample period
+							of the configured output data rate
+
+			:return: (version, timestamp (time.monotonic()), (x, y, z)); version increases with every new read
+			:rtype: tuple
+		"""
+		if maxAge is None:
+			maxAge = 1.0 / self._configuredDataRate()
+		latest = self._latest
+		if latest is not None and time.monotonic() - latest[1] <= maxAge:
+			return latest
+		with self._latestLock:
+			# another reader may have refreshed the cache while we waited
+			latest = self._latest
+			if latest is not None and time.monotonic() - latest[1] <= maxAge:
+				return latest
+			with self._lock:
+				buff = self._readRegisters(self.ADXL313_DATA_X0, self.ADXL313_TO_READ)
+				sample = struct.unpack('<hhh', bytes(bytearray(buff)))
+				self._trackFrames([sample])
+				return self._setLatest(sample)
+
+	def _setLatest(self, sample):
+		self._latestVersion += 1
+		self._latest = (self._latestVersion, time.monotonic(), sample)
+		return self._latest
+
+	# ----------------------------------
+	# readSample()
+	#
+	# Reads one sample as an immutable Sample
+	def readSample(self):
+		""" 
+			Reads the current acceleration (as readAccel()) and returns it as an
+			immutable Sample, safe to queue or hand to another thread.
+
+			:return: the sample
+			:rtype: Sample
+		"""
+		with self._lock:
+			self.readAccel()
+			return Sample(self.x, self.y, self.z, time.time(), self._configuredScale())
+
+	# ----------------------------------
+	# getScale()
+	#
+	# Reads the current scale factor (g per LSB)
+	def getScale(self):
+		""" 
+			Reads the current scale factor, from the range and FULL_RES bit of DATA_FORMAT
+
+			:return: g per LSB of the raw x, y and z values
+			:rtype: float
+		"""
+		return self._scaleFromDataFormat(self._readRegister(self.ADXL313_DATA_FORMAT))
+
+	def _scaleFromDataFormat(self, dataFormat):
+		if (dataFormat >> self.ADXL313_FULL_RES_BIT) & 1:
+			return 1.0 / 1024
+		return (1 << (dataFormat & 0b00000011)) / 1024.0
+
+	def _configuredScale(self):
+		# scale from the last DATA_FORMAT written (no bus traffic)
+		return self._scaleFromDataFormat(self._config.get(self.ADXL313_DATA_FORMAT, 0))
+
+	def _configuredDataRate(self):
+		# output data rate from the last BW_RATE written (no bus traffic)
+		code = self._config.get(self.ADXL313_BW_RATE, self.ADXL313_BW_RATE_RESET) & 0x0F
+		return 6.25 * (2 ** (code - self.ADXL313_BW_3_125))
+
+	# ----------------------------------
+	# getConfiguredDataRate() / getConfiguredScale() / getConfiguredRange() / getPowerState()
+	#
+	# The configuration written through this object, without bus traffic
+	def getConfiguredDataRate(self):
+		""" 
+			Output data rate from the last BW_RATE written through this object (the
+			power up rate if none was). No bus traffic.
+
+			:return: output data rate in Hz
+			:rtype: float
+		"""
+		return self._configuredDataRate()
+
+	def getConfiguredScale(self):
+		""" 
+			Scale of the raw values, from the last DATA_FORMAT written through this
+			object. No bus traffic.
+
+			:return: g per LSB
+			:rtype: float
+		"""
+		return self._configuredScale()
+
+	def getConfiguredRange(self):
+		""" 
+			Range from the last DATA_FORMAT written through this object. No bus
+			traffic; see getRange() to read it from the device.
+
+			:return: range in g (0.5, 1, 2 or 4)
+			:rtype: float
+		"""
+		return 0.5 * (1 << (self._config.get(self.ADXL313_DATA_FORMAT, 0) & 0b00000011))
+
+	def getPowerState(self):
+		""" 
+			Power state tracked from the POWER_CTL and BW_RATE writes made through
+			this object (see getEnergyStats())
+
+			:return: 'standby', 'measure', 'lowpower' or 'autosleep'
+			:rtype: string
+		"""
+		return self._powerState
+
 	# ----------------------------------
 	# getRange()
 	#
@@ -370,7 +807,7 @@ class QwiicAdxl313(object):
 			:return: range setting of the device (from in DATA_FORMAT register)
 			:rtype: float
 		"""
-		_register = self._i2c.readByte(self.address, regAddress)
+		_register = self._readRegister(self.ADXL313_DATA_FORMAT)
 		_range = (_register & 0b00000011)
 		range_val = 0.1 # float, so we can handle the 0.5 range value
 
@@ -400,11 +837,7 @@ class QwiicAdxl313(object):
 			:return: Returns true of the function was completed, otherwise False.
 			:rtype: bool
 		"""
-		_register = self._i2c.readByte(self.address, self.ADXL313_DATA_FORMAT)
-		to_write = new_range
-		to_write |= (_register & 0b11101100)
-		self._i2c.writeByte(self.address, self.ADXL313_DATA_FORMAT, to_write)
-		return True
+		return self._updateRegister(self.ADXL313_DATA_FORMAT, 0b00010011, new_range)
 
 	# ----------------------------------
 	# autosleepOn()
@@ -420,12 +853,13 @@ class QwiicAdxl313(object):
 			:return: Returns true of the function was completed, otherwise False.
 			:rtype: bool
 		"""
-		# set the link bit, to "link" activity and inactivity sensing
-		self.setRegisterBit(self.ADXL313_POWER_CTL, self.ADXL313_LINK_BIT, True)
+		with self._lock:
+			# set the link bit, to "link" activity and inactivity sensing
+			if not self.setRegisterBit(self.ADXL313_POWER_CTL, self.ADXL313_LINK_BIT, True):
+				return False
 
-		# set the autosleep
-		self.setRegisterBit(self.ADXL313_POWER_CTL, self.ADXL313_AUTOSLEEP_BIT, True)
-		return True
+			# set the autosleep
+			return self.setRegisterBit(self.ADXL313_POWER_CTL, self.ADXL313_AUTOSLEEP_BIT, True)
 
 	# ----------------------------------
 	# autosleepOff()
@@ -439,8 +873,7 @@ class QwiicAdxl313(object):
 			:rtype: bool
 		"""
 		# clear the autosleep bit
-		self.setRegisterBit(self.ADXL313_POWER_CTL, self.ADXL313_AUTOSLEEP_BIT, False)
-		return True		
+		return self.setRegisterBit(self.ADXL313_POWER_CTL, self.ADXL313_AUTOSLEEP_BIT, False)
 
 	# ----------------------------------
 	# setActivityX()
@@ -544,8 +977,7 @@ class QwiicAdxl313(object):
 			:rtype: bool
 		"""
 		activityThreshold = self.limit(activityThreshold)
-		self._i2c.writeByte(self.address, self.ADXL313_THRESH_ACT, activityThreshold)
-		return True		
+		return self._writeRegister(self.ADXL313_THRESH_ACT, activityThreshold)
 
 	# ----------------------------------
 	# getActivityThreshold()
@@ -558,7 +990,7 @@ class QwiicAdxl313(object):
 			:return: activity detection theshold
 			:rtype: byte
 		"""
-		return self._i2c.readByte(self.address, self.ADXL313_THRESH_ACT)			
+		return self._readRegister(self.ADXL313_THRESH_ACT)			
 
 	# ----------------------------------
 	# setInactivityThreshold()
@@ -578,8 +1010,7 @@ class QwiicAdxl313(object):
 			:rtype: bool
 		"""
 		inactivityThreshold = self.limit(inactivityThreshold)
-		self._i2c.writeByte(self.address, self.ADXL313_THRESH_INACT, inactivityThreshold)
-		return True		
+		return self._writeRegister(self.ADXL313_THRESH_INACT, inactivityThreshold)
 
 	# ----------------------------------
 	# getInactivityThreshold()
@@ -592,7 +1023,7 @@ class QwiicAdxl313(object):
 			:return: inactivity detection theshold
 			:rtype: byte
 		"""
-		return self._i2c.readByte(self.address, self.ADXL313_THRESH_INACT)			
+		return self._readRegister(self.ADXL313_THRESH_INACT)			
 
 	# ----------------------------------
 	# setTimeInactivity()
@@ -613,8 +1044,7 @@ class QwiicAdxl313(object):
 			:rtype: bool
 		"""
 		timeInactivity = self.limit(timeInactivity)
-		self._i2c.writeByte(self.address, self.ADXL313_TIME_INACT, timeInactivity)
-		return True		
+		return self._writeRegister(self.ADXL313_TIME_INACT, timeInactivity)
 
 	# ----------------------------------
 	# getTimeInactivity()
@@ -627,7 +1057,7 @@ class QwiicAdxl313(object):
 			:return: inactivity detection time requirement
 			:rtype: byte
 		"""
-		return self._i2c.readByte(self.address, self.ADXL313_TIME_INACT)			
+		return self._readRegister(self.ADXL313_TIME_INACT)			
 
 	def limit(self, num, minimum=1, maximum=255):
 		"""
@@ -790,7 +1220,7 @@ class QwiicAdxl313(object):
 			:return: FIFO mode (0=bypass,1=fifo,2=stream,3=trigger)
 			:rtype: byte
 		"""
-		_register = self._i2c.readByte(self.address, self.ADXL313_FIFO_CTL)
+		_register = self._readRegister(self.ADXL313_FIFO_CTL)
 		mode = (_register & 0b11000000) # mask all the other bits [0:5]
 		mode = (mode >> 6)
 		return mode
@@ -808,11 +1238,8 @@ class QwiicAdxl313(object):
 			:return: Returns true of the function was completed, otherwise False.
 			:rtype: bool
 		"""
-		_register = self._i2c.readByte(self.address, self.ADXL313_FIFO_CTL) # read entire FIFO_CTRL reg
-		_register &= 0b00111111 # clear current mode bits
-		_register |= (mode << 6) # set the desired mode bits into our "write regiter variable"
-		self._i2c.writeByte(self.address, self.ADXL313_FIFO_CTL, _register) # write it!
-		return True
+		# replace the mode bits [6:7] of FIFO_CTL
+		return self._updateRegister(self.ADXL313_FIFO_CTL, 0b11000000, mode << 6)
 
 	# ----------------------------------
 	# getFifoSamplesThreshhold()
@@ -825,7 +1252,7 @@ class QwiicAdxl313(object):
 			:return: FIFO samples threshold (0-32)
 			:rtype: byte
 		"""
-		_register = self._i2c.readByte(self.address, self.ADXL313_FIFO_CTL)
+		_register = self._readRegister(self.ADXL313_FIFO_CTL)
 		samples = (_register & 0b00011111) # mask all the other bits we don't need [5:7]
 		return samples
 
@@ -842,11 +1269,8 @@ class QwiicAdxl313(object):
 			:return: Returns true of the function was completed, otherwise False.
 			:rtype: bool
 		"""
-		_register = self._i2c.readByte(self.address, self.ADXL313_FIFO_CTL) # read entire FIFO_CTRL reg
-		_register &= 0b11100000 # clear current sample threshhold bits [0:4]
-		_register |= samples # set the desired sample threshhold bits into our "write regiter variable"
-		self._i2c.writeByte(self.address, self.ADXL313_FIFO_CTL, _register) # write it!
-		return True
+		# replace the sample threshhold bits [0:4] of FIFO_CTL
+		return self._updateRegister(self.ADXL313_FIFO_CTL, 0b00011111, min(samples, 0b00011111))
 
 	# ----------------------------------
 	# getFifoEntriesAmount()
@@ -859,7 +1283,7 @@ class QwiicAdxl313(object):
 			:return: FIFO entries amount (0-32)
 			:rtype: byte
 		"""
-		_register = self._i2c.readByte(self.address, self.ADXL313_FIFO_STATUS) 
+		_register = self._readRegister(self.ADXL313_FIFO_STATUS) 
 		entries = (_register & 0b00111111) # mask all the other bits we don't need [6:7]
 		return entries
 
@@ -874,10 +1298,203 @@ class QwiicAdxl313(object):
 			:return: Returns true of the function was completed, otherwise False.
 			:rtype: bool
 		"""
-		mode = self.getFifoMode() # get current mode, so we can return it here later
-		self.setFifoMode(self.ADXL313_FIFO_MODE_BYPASS) # sets mode to bypass temporarily to clear contents
-		self.setFifoMode(mode) # return mode to previous selection
-		return True
+		with self._lock:
+			mode = self.getFifoMode() # get current mode, so we can return it here later
+			if not self.setFifoMode(self.ADXL313_FIFO_MODE_BYPASS): # sets mode to bypass temporarily to clear contents
+				return False
+			return self.setFifoMode(mode) # return mode to previous selection
+
+	# ----------------------------------
+	# getDataRate()
+	#
+	# Get the output data rate (Hz) selected by the BW_RATE register
+	def getDataRate(self):
+		""" 
+			Get the output data rate (Hz) selected by the BW_RATE register.
+			Note, the output data rate is twice the bandwidth (e.g. ADXL313_BW_100 = 200Hz).
+
+			:return: output data rate in Hz
+			:rtype: float
+		"""
+		code = self.getBandwidth() & 0x0F
+		return 6.25 * (2 ** (code - self.ADXL313_BW_3_125))
+
+	# ----------------------------------
+	# readFifo()
+	#
+	# Reads entries out of the FIFO
+	def readFifo(self, entries=None):
+		""" 
+			Reads entries out of the FIFO. Each entry is popped by a single
+			multi-byte read of the data registers, without polling INT_SOURCE in between.
+			x, y and z are updated with the last entry read.
+
+			:param entries: number of entries to read. If not provided, FIFO_STATUS is read first.
+
+			:return: the samples, oldest first; a sequence of (x, y, z) tuples
+			:rtype: SampleBatch
+		"""
+		with self._lock:
+			metrics = self.metrics
+			if metrics is not None:
+				start = time.perf_counter()
+			with self._busTransaction(QwiicBusArbiter.PRIORITY_HIGH):
+				if entries is None:
+					entries = self.getFifoEntriesAmount()
+				data = self._readFifoData(entries)
+			self.wakeups += 1
+			if metrics is not None:
+				metrics.observeDrain(entries, time.perf_counter() - start)
+			samples = SampleBatch.fromBytes(data, time.time(), self._configuredDataRate(), self._configuredScale())
+			if samples:
+				self.x, self.y, self.z = samples[-1]
+				self._trackFrames(samples, True)
+				self._setLatest(samples[-1])
+			return samples
+
+	# ----------------------------------
+	# setFifoTriggerPin()
+	#
+	# Links the FIFO trigger event to INT1 or INT2
+	def setFifoTriggerPin(self, interruptPin):
+		""" 
+			Links the FIFO trigger event (trigger mode) to the interrupt mapped to INT1 or INT2
+
+			:param interruptPin: ADXL313_INT1_PIN or ADXL313_INT2_PIN
+
+			:return: Returns true of the function was completed, otherwise False.
+			:rtype: bool
+		"""
+		return self.setRegisterBit(self.ADXL313_FIFO_CTL, self.ADXL313_FIFO_TRIGGER_BIT, interruptPin)
+
+	# ----------------------------------
+	# getFifoTriggerPin()
+	#
+	# Gets the interrupt pin the FIFO trigger event is linked to
+	def getFifoTriggerPin(self):
+		""" 
+			Gets the interrupt pin the FIFO trigger event is linked to
+
+			:return: ADXL313_INT1_PIN or ADXL313_INT2_PIN
+			:rtype: int
+		"""
+		return self.getRegisterBit(self.ADXL313_FIFO_CTL, self.ADXL313_FIFO_TRIGGER_BIT)
+
+	# ----------------------------------
+	# isFifoTriggered()
+	#
+	# Reads the FIFO_TRIG bit of FIFO_STATUS
+	def isFifoTriggered(self):
+		""" 
+			Reads the FIFO_TRIG bit of FIFO_STATUS
+
+			:return: 1 if a trigger event has occurred (trigger mode), otherwise 0
+			:rtype: int
+		"""
+		return self.getRegisterBit(self.ADXL313_FIFO_STATUS, self.ADXL313_FIFO_TRIG_BIT)
+
+	# ----------------------------------
+	# armFifoTrigger()
+	#
+	# Clears the FIFO and puts it in trigger mode
+	def armFifoTrigger(self, preSamples=31, interruptPin=ADXL313_INT1_PIN):
+		""" 
+			Clears the FIFO and puts it in trigger mode. The FIFO keeps the last
+			preSamples entries until the interrupt mapped to interruptPin fires,
+			then collects entries until it is full.
+			Note, the interrupt used as trigger (e.g. activity) must be enabled and
+			mapped to interruptPin.
+
+			:param preSamples: entries kept from before the trigger event (0-31)
+			:param interruptPin: ADXL313_INT1_PIN or ADXL313_INT2_PIN
+
+			:return: Returns true of the function was completed, otherwise False.
+			:rtype: bool
+		"""
+		with self._lock:
+			preSamples = self.limit(preSamples, 0, self.ADXL313_FIFO_SIZE - 1)
+			self.setFifoMode(self.ADXL313_FIFO_MODE_BYPASS) # bypass clears the FIFO and the trigger status
+			to_write = (self.ADXL313_FIFO_MODE_TRIGGER << 6) | (interruptPin << self.ADXL313_FIFO_TRIGGER_BIT) | preSamples
+			return self._writeRegister(self.ADXL313_FIFO_CTL, to_write)
+
+	# ----------------------------------
+	# captureFifoTrigger()
+	#
+	# Waits for a trigger event and reads the samples around it
+	def captureFifoTrigger(self, postSamples=1, timeout=None, waitForInterrupt=None, pollInterval=0.001):
+		""" 
+			Waits for the trigger event of an armed FIFO (see armFifoTrigger()) and
+			reads the pre-trigger history plus postSamples samples at full rate.
+			Reading keeps going past the 32 FIFO entries, so postSamples is not
+			limited by the FIFO size as long as draining keeps up with the data rate.
+
+			:param postSamples: samples to collect from the trigger sample onwards
+			:param timeout: seconds to wait for the trigger, None waits forever. Collecting the
+							post-trigger samples may run past it by the time they take at the data rate;
+							after that (or if the FIFO stops filling for a second) a partial event is returned
+			:param waitForInterrupt: optional function(timeout) that blocks until the
+							trigger pin fires (e.g. a GPIO edge wait), instead of polling FIFO_STATUS
+			:param pollInterval: seconds between FIFO_STATUS polls
+
+			:return: the event (with complete False if it holds fewer samples than
+					 asked for), or None if the timeout expired before the trigger
+			:rtype: FifoTriggerEvent
+		"""
+		preSamples = self.getFifoSamplesThreshhold()
+		deadline = None if timeout is None else time.monotonic() + timeout
+		while True:
+			if waitForInterrupt is not None:
+				remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+				waitForInterrupt(remaining)
+			if self.isFifoTriggered():
+				break
+			if deadline is not None and time.monotonic() >= deadline:
+				return None
+			if waitForInterrupt is None:
+				time.sleep(pollInterval)
+		triggerTime = time.time()
+		rate = self.getDataRate()
+
+		samples = []
+		wanted = preSamples + postSamples
+		# the post-trigger samples get at least twice the time they need
+		now = time.monotonic()
+		collectDeadline = now + 2.0 * postSamples / rate + 0.1
+		if deadline is not None:
+			collectDeadline = max(deadline, collectDeadline)
+		lastEntry = now
+		while len(samples) < wanted:
+			entries = self.getFifoEntriesAmount()
+			now = time.monotonic()
+			if entries:
+				samples.extend(self.readFifo(min(entries, wanted - len(samples))))
+				lastEntry = now
+			elif (deadline is not None and now >= collectDeadline) or now - lastEntry >= 1.0:
+				return FifoTriggerEvent(triggerTime, rate, preSamples, samples, False)
+			else:
+				time.sleep(0.5 / rate)
+		return FifoTriggerEvent(triggerTime, rate, preSamples, samples)
+
+	# ----------------------------------
+	# getIntSource()
+	#
+	# Reads the int Source Register once and returns it
+	def getIntSource(self):
+		""" 
+			Reads the int Source Register once and returns it. Unlike updateIntSourceStatuses(),
+			the individual status attributes are left alone; only the asleep attribute is
+			updated from the activity/inactivity sources. The read and that update happen
+			under the device lock, so this is safe to call from any thread.
+			Test the result with the interrupt bit positions, e.g.
+			(source >> ADXL313_INT_WATERMARK_BIT) & 1
+
+			:return: contents of the INT_SOURCE register
+			:rtype: int
+		"""
+		with self._lock:
+			source = self._readRegister(self.ADXL313_INT_SOURCE)
+			self._trackSleep(source)
+			return source
 
 	# ----------------------------------
 	# updateIntSourceStatuses()
@@ -890,19 +1507,425 @@ class QwiicAdxl313(object):
 			:return: Returns true of the function was completed, otherwise False.
 			:rtype: bool
 		"""
-		_register = self._i2c.readByte(self.address, self.ADXL313_INT_SOURCE)
-		self.ADXL313_INTSOURCE_DATAREADY = ((_register >> self.ADXL313_INT_DATA_READY_BIT) & 1)
-		self.ADXL313_INTSOURCE_ACTIVITY = ((_register >> self.ADXL313_INT_ACTIVITY_BIT) & 1)
-		self.ADXL313_INTSOURCE_INACTIVITY = ((_register >> self.ADXL313_INT_INACTIVITY_BIT) & 1)
-		self.ADXL313_INTSOURCE_WATERMARK = ((_register >> self.ADXL313_INT_WATERMARK_BIT) & 1)
-		self.ADXL313_INTSOURCE_OVERRUN = ((_register >> self.ADXL313_INT_OVERRUN_BIT) & 1)
-		return True
+		with self._lock:
+			_register = self._readRegister(self.ADXL313_INT_SOURCE)
+			self._trackSleep(_register)
+			self.ADXL313_INTSOURCE_DATAREADY = ((_register >> self.ADXL313_INT_DATA_READY_BIT) & 1)
+			self.ADXL313_INTSOURCE_ACTIVITY = ((_register >> self.ADXL313_INT_ACTIVITY_BIT) & 1)
+			self.ADXL313_INTSOURCE_INACTIVITY = ((_register >> self.ADXL313_INT_INACTIVITY_BIT) & 1)
+			self.ADXL313_INTSOURCE_WATERMARK = ((_register >> self.ADXL313_INT_WATERMARK_BIT) & 1)
+			self.ADXL313_INTSOURCE_OVERRUN = ((_register >> self.ADXL313_INT_OVERRUN_BIT) & 1)
+			return True
+
+	# ----------------------------------
+	# _trackSleep()
+	#
+	# Follows autosleep transitions from the activity/inactivity sources
+	def _trackSleep(self, source):
+		if not (self._config.get(self.ADXL313_POWER_CTL, 0) >> self.ADXL313_AUTOSLEEP_BIT) & 1:
+			asleep = False
+		elif (source >> self.ADXL313_INT_ACTIVITY_BIT) & 1:
+			asleep = False
+		elif (source >> self.ADXL313_INT_INACTIVITY_BIT) & 1:
+			asleep = True
+		else:
+			return
+		with self._lock:
+			if asleep != self.asleep:
+				self.asleep = asleep
+				self._updatePowerState()
+
+	# ----------------------------------
+	# getPollInterval()
+	#
+	# How long to wait before polling the sensor again
+	def getPollInterval(self):
+		""" 
+			How long to wait before polling the sensor again, from the configuration
+			written through this object (no bus traffic). With autosleep on, the sensor
+			is assumed asleep after an inactivity event and awake after an activity event
+			(see the asleep attribute, updated by getIntSource() and updateIntSourceStatuses()).
+			While asleep, this is the sleep mode sample period (POWER_CTL wakeup bits);
+			while awake, the time to fill the FIFO to the watermark, or one sample period in bypass mode.
+
+			:return: seconds until new data is expected
+			:rtype: float
+		"""
+		if self.asleep:
+			return 1.0 / self.ADXL313_WAKEUP_RATES[self._config.get(self.ADXL313_POWER_CTL, 0) & 0b00000011]
+		fifoCtl = self._config.get(self.ADXL313_FIFO_CTL, 0)
+		samples = 1
+		if (fifoCtl >> 6) != self.ADXL313_FIFO_MODE_BYPASS:
+			samples = max(fifoCtl & 0b00011111, 1)
+		return samples / self._configuredDataRate()
+
+	# ----------------------------------
+	# waitForWatermark()
+	#
+	# Sleeps until the FIFO is predicted to reach the watermark
+	def waitForWatermark(self, timeout=None, margin=0.1):
+		""" 
+			Waits until the FIFO holds at least the watermark (samples threshold) number
+			of entries, without an interrupt pin. Instead of polling INT_SOURCE in a tight
+			loop, the time the watermark will be reached is predicted from the fill level
+			and the data rate, and the host sleeps until just before it. The fill rate
+			used for the prediction is corrected from the fill levels actually observed,
+			so a sensor clock that runs fast or slow costs at most an extra poll.
+			The FIFO must be in FIFO, stream or trigger mode: in bypass mode it never
+			fills, and ValueError is raised.
+
+			:param timeout: seconds to wait at most, None waits forever
+			:param margin: fraction of the predicted wait to wake up early
+
+			:return: FIFO entries when the watermark was reached, or None on timeout
+			:rtype: int
+		"""
+		fifoCtl = self._config.get(self.ADXL313_FIFO_CTL)
+		if fifoCtl is None:
+			fifoCtl = self._readRegister(self.ADXL313_FIFO_CTL)
+		if (fifoCtl >> 6) == self.ADXL313_FIFO_MODE_BYPASS:
+			raise ValueError("the FIFO is in bypass mode, the watermark is never reached")
+		watermark = max(fifoCtl & 0b00011111, 1)
+		nominalRate = self._configuredDataRate()
+		if self._fillRate is None or self._fillRateNominal != nominalRate:
+			self._fillRate = nominalRate
+			self._fillRateNominal = nominalRate
+		deadline = None if timeout is None else time.monotonic() + timeout
+		lastTime = None
+		lastEntries = None
+		while True:
+			entries = self.getFifoEntriesAmount()
+			now = time.monotonic()
+			if entries >= watermark:
+				return entries
+
+			# correct the fill rate from what was actually observed since the last poll
+			if lastTime is not None and entries > lastEntries:
+				observed = (entries - lastEntries) / (now - lastTime)
+				if 0.5 * nominalRate < observed < 2 * nominalRate:
+					self._fillRate += 0.25 * (observed - self._fillRate)
+			lastTime = now
+			lastEntries = entries
+
+			wait = (watermark - entries) / self._fillRate
+			wait = max(wait * (1 - margin), 0.5 / self._fillRate)
+			if deadline is not None:
+				if now >= deadline:
+					return None
+				wait = min(wait, deadline - now)
+			time.sleep(wait)
+
+	# ----------------------------------
+	# pollAutosleep()
+	#
+	# One step of an autosleep aware reader
+	def pollAutosleep(self):
+		""" 
+			One step of an autosleep aware reader. Reads INT_SOURCE once, follows sleep
+			and wake transitions, and reads whatever data is available: the whole FIFO
+			(on watermark, overrun or activity) or a single sample in bypass mode.
+			Sleep for the returned interval before the next call; it stretches to the
+			sleep rate while the sensor sleeps and snaps back on activity.
+
+			:return: (samples read, seconds to wait before the next call)
+			:rtype: tuple
+		"""
+		with self._lock:
+			source = self.getIntSource()
+			fifoMode = self._config.get(self.ADXL313_FIFO_CTL, 0) >> 6
+			if fifoMode != self.ADXL313_FIFO_MODE_BYPASS:
+				if source & ((1 << self.ADXL313_INT_WATERMARK_BIT) | (1 << self.ADXL313_INT_OVERRUN_BIT)
+							 | (1 << self.ADXL313_INT_ACTIVITY_BIT)):
+					samples = self.readFifo()
+				else:
+					samples = SampleBatch(array('h'), time.time(), self._configuredDataRate(), self._configuredScale())
+			elif (source >> self.ADXL313_INT_DATA_READY_BIT) & 1:
+				sample = self.readSample()
+				samples = SampleBatch(array('h', (sample.x, sample.y, sample.z)), sample.timestamp,
+									  self._configuredDataRate(), sample.scale)
+			else:
+				samples = SampleBatch(array('h'), time.time(), self._configuredDataRate(), self._configuredScale())
+			return samples, self.getPollInterval()
+
+	# ----------------------------------
+	# planAcquisition()
+	#
+	# Chooses bandwidth, low power and FIFO settings for an application
+	def planAcquisition(self, bandwidth, maxLatency, wakeupCost=0.001, busThroughput=40000,
+						allowLowPower=True):
+		""" 
+			Chooses the BW_RATE code, low power bit, FIFO mode and watermark for an
+			application, and predicts the resulting load. The slowest rate giving at
+			least the required bandwidth is used; the watermark is the largest one that
+			meets the latency bound and still leaves time to drain the FIFO (host wake up
+			plus bus transfer) before it overruns. Nothing is written, see applyPlan().
+
+			:param bandwidth: required signal bandwidth in Hz (output data rate / 2)
+			:param maxLatency: longest acceptable delay (seconds) between a sample and its read
+			:param wakeupCost: host time (seconds) to wake up and start a drain
+			:param busThroughput: bus/transport throughput in bytes per second
+							(400kHz I2C is roughly 40000)
+			:param allowLowPower: use the low power mode where the rate supports it
+
+			:return: the plan
+			:rtype: AcquisitionPlan
+		"""
+		codes = [code for code in sorted(self.ADXL313_SUPPLY_CURRENT)
+				 if 6.25 * (2 ** (code - self.ADXL313_BW_3_125)) / 2 >= bandwidth]
+		if not codes:
+			raise ValueError("bandwidth above 1600Hz is not supported")
+		code = codes[0]
+		rate = 6.25 * (2 ** (code - self.ADXL313_BW_3_125))
+		normalCurrent, lowPowerCurrent = self.ADXL313_SUPPLY_CURRENT[code]
+		lowPower = allowLowPower and lowPowerCurrent is not None
+
+		entryTime = self.ADXL313_BUS_BYTES_PER_ENTRY / float(busThroughput)
+		if rate * entryTime >= 1:
+			raise ValueError("the bus can not keep up with %gHz" % rate)
+		watermark = None
+		for samples in range(self.ADXL313_FIFO_SIZE - 1, 0, -1):
+			latency = samples / rate + wakeupCost + samples * entryTime
+			headroom = (self.ADXL313_FIFO_SIZE - samples) / rate
+			if latency <= maxLatency and headroom >= wakeupCost + samples * entryTime:
+				watermark = samples
+				break
+		if watermark is None:
+			raise ValueError("no watermark meets a %gs latency at %gHz" % (maxLatency, rate))
+
+		wakeups = rate / watermark
+		busBytes = rate * self.ADXL313_BUS_BYTES_PER_ENTRY + wakeups * self.ADXL313_BUS_BYTES_PER_POLL
+		return AcquisitionPlan(code, lowPower, self.ADXL313_FIFO_MODE_STREAM, watermark, rate,
+							   wakeups, busBytes / float(busThroughput),
+							   lowPowerCurrent if lowPower else normalCurrent)
+
+	# ----------------------------------
+	# applyPlan()
+	#
+	# Applies an AcquisitionPlan
+	def applyPlan(self, plan):
+		""" 
+			Applies a plan from planAcquisition(): the sensor is put in standby, BW_RATE and
+			FIFO_CTL are written, and measure mode is restored if it was on.
+
+			:param plan: the AcquisitionPlan
+
+			:return: Returns true of the function was completed, otherwise False.
+			:rtype: bool
+		"""
+		with self._lock:
+			try:
+				powerCtl = self._readRegister(self.ADXL313_POWER_CTL)
+				fifoCtl = self._readRegister(self.ADXL313_FIFO_CTL)
+			except (IOError, OSError):
+				return False
+			ok = self._writeRegister(self.ADXL313_POWER_CTL, powerCtl & ~(1 << self.ADXL313_MEASURE_BIT))
+			ok = ok and self._writeRegister(self.ADXL313_BW_RATE,
+				plan.bandwidthCode | (plan.lowPower << self.ADXL313_LOW_POWER_BIT))
+			ok = ok and self._writeRegister(self.ADXL313_FIFO_CTL,
+				(plan.fifoMode << 6) | (fifoCtl & (1 << self.ADXL313_FIFO_TRIGGER_BIT)) | plan.watermark)
+			return ok and self._writeRegister(self.ADXL313_POWER_CTL, powerCtl)
+
+	# ----------------------------------
+	# snapshot()
+	#
+	# Reads the whole register map in a few burst reads
+	def snapshot(self, includeIntSource=False):
+		""" 
+			Reads the register map (0x00 - 0x39) in a few burst reads (3 or 4) and
+			decodes it. The data registers are skipped, since reading them pops the FIFO,
+			and INT_SOURCE is skipped unless asked for, since reading it clears the
+			activity and inactivity events. The configuration cached by this object
+			(used by recover(), readLatest(), ...) is refreshed from the result.
+
+			:param includeIntSource: also read INT_SOURCE
+
+			:return: the decoded registers
+			:rtype: RegisterSnapshot
+		"""
+		if includeIntSource:
+			ranges = ((0x00, 32), (0x20, 18), (self.ADXL313_FIFO_CTL, 2))
+		else:
+			ranges = ((0x00, 32), (0x20, 16), (self.ADXL313_DATA_FORMAT, 1), (self.ADXL313_FIFO_CTL, 2))
+		registers = {}
+		with self._lock:
+			with self._busTransaction(QwiicBusArbiter.PRIORITY_NORMAL):
+				for start, count in ranges:
+					for offset, value in enumerate(self._readRegisters(start, count)):
+						registers[start + offset] = value
+			for regAddress in self.ADXL313_CONFIG_REGISTERS:
+				self._config[regAddress] = registers[regAddress]
+			self._updatePowerState()
+		return RegisterSnapshot(registers)
+
+	# ----------------------------------
+	# _trackFrames()
+	#
+	# Notes evidence that the sensor is producing data, for checkHealth()
+	def _trackFrames(self, samples, fromFifo=False):
+		# FIFO entries are always new samples. A data register read only proves new
+		# data when the frame changed: a sensor at rest legitimately repeats frames
+		last = samples[-1]
+		if fromFifo or last != self._lastFrame:
+			self._newData += 1
+		self._lastFrame = last
+
+	# ----------------------------------
+	# checkHealth()
+	#
+	# Cheap health check, recovering the sensor if needed
+	def checkHealth(self):
+		""" 
+			Cheap health check, meant to be called periodically from the acquisition loop
+			(or from a background thread, see startHealthMonitor()).
+			Verifies DEVID/PARTID (one 3 byte read), and in measure mode looks for a
+			stuck sensor: one that produced no new data for ADXL313_STUCK_CHECKS checks
+			in a row, and still produces none within ADXL313_STUCK_PERIODS sample periods
+			(the last check waits that long, holding the bus lock so nobody else reads the
+			data). New data is FIFO entries (waiting, or read since the last check),
+			DATA_READY or OVERRUN in bypass mode, or a changed frame read from the data
+			registers. Identical frames are not a fault: a sensor at rest often repeats
+			its output.
+			In bypass mode INT_SOURCE is only read when the activity and inactivity
+			interrupts are disabled, since reading it clears them.
+			On failure, recover() is attempted, with exponential backoff between
+			attempts, so a dead sensor never stalls the caller.
+
+			:return: ADXL313_NO_ERROR, ADXL313_READ_ERROR, ADXL313_ID_ERROR or ADXL313_STUCK_ERROR
+			:rtype: int
+		"""
+		status = self.ADXL313_NO_ERROR
+		with self._lock:
+			try:
+				ids = self._readRegisters(self.ADXL313_DEVID_0, 3)
+				if ids[0] != self.ADXL313_DEVID_0_RSP_EXPECTED or ids[1] != self.ADXL313_DEVID_1_RSP_EXPECTED \
+						or not ids[2] in _validChipIDs:
+					status = self.ADXL313_ID_ERROR
+				elif self._hasNewData():
+					self._noDataChecks = 0
+				else:
+					self._noDataChecks += 1
+					if self._noDataChecks >= self.ADXL313_STUCK_CHECKS:
+						if self._waitForNewData():
+							self._noDataChecks = 0
+						else:
+							status = self.ADXL313_STUCK_ERROR
+			except (IOError, OSError):
+				status = self.ADXL313_READ_ERROR
+			self._newDataAtLastCheck = self._newData
+
+		if status == self.ADXL313_NO_ERROR:
+			self._recoveryDelay = self.ADXL313_RECOVERY_DELAY_MIN
+			return status
+
+		now = time.monotonic()
+		if now >= self._nextRecovery:
+			self.recover()
+			self._nextRecovery = now + self._recoveryDelay
+			self._recoveryDelay = min(self._recoveryDelay * 2, self.ADXL313_RECOVERY_DELAY_MAX)
+		return status
+
+	def _hasNewData(self):
+		# evidence of new data since the last check (see checkHealth())
+		powerCtl = self._config.get(self.ADXL313_POWER_CTL, 0)
+		if not (powerCtl >> self.ADXL313_MEASURE_BIT) & 1:
+			return True		# standby, no data expected
+		return self._newData != self._newDataAtLastCheck or self._dataWaiting()
+
+	def _dataWaiting(self):
+		# new data waiting in the sensor, read without consuming it
+		if (self._config.get(self.ADXL313_FIFO_CTL, 0) >> 6) != self.ADXL313_FIFO_MODE_BYPASS:
+			return self.getFifoEntriesAmount() > 0
+		events = (1 << self.ADXL313_INT_ACTIVITY_BIT) | (1 << self.ADXL313_INT_INACTIVITY_BIT)
+		if self._config.get(self.ADXL313_INT_ENABLE, 0) & events:
+			return True		# can't tell without clearing events someone is waiting for
+		source = self._readRegister(self.ADXL313_INT_SOURCE)
+		return bool(source & ((1 << self.ADXL313_INT_DATA_READY_BIT) | (1 << self.ADXL313_INT_OVERRUN_BIT)))
+
+	def _waitForNewData(self):
+		# polls _dataWaiting() for ADXL313_STUCK_PERIODS sample periods
+		period = self._samplePeriod()
+		deadline = time.monotonic() + self.ADXL313_STUCK_PERIODS * period
+		while True:
+			if self._dataWaiting():
+				return True
+			if time.monotonic() >= deadline:
+				return False
+			time.sleep(period / 4)
+
+	def _samplePeriod(self):
+		# seconds between samples, at the sleep mode rate while autosleep is on
+		powerCtl = self._config.get(self.ADXL313_POWER_CTL, 0)
+		if (powerCtl >> self.ADXL313_AUTOSLEEP_BIT) & 1:
+			return 1.0 / self.ADXL313_WAKEUP_RATES[powerCtl & 0b00000011]
+		return 1.0 / self._configuredDataRate()
+
+	# ----------------------------------
+	# startHealthMonitor() / stopHealthMonitor()
+	#
+	# Runs checkHealth() periodically from a background thread
+	def startHealthMonitor(self, interval=1.0, callback=None):
+		""" 
+			Runs checkHealth() (and so recover() when needed) every interval seconds
+			from a daemon thread, for applications that don't call it from their own loop.
+
+			:param interval: seconds between checks
+			:param callback: optional function(status) called when a check fails
+		"""
+		self.stopHealthMonitor()
+		stop = threading.Event()
+		def run():
+			while not stop.wait(interval):
+				status = self.checkHealth()
+				if status != self.ADXL313_NO_ERROR and callback is not None:
+					callback(status)
+		thread = threading.Thread(target=run, name="adxl313-health")
+		thread.daemon = True
+		self._healthMonitor = (stop, thread)
+		thread.start()
+
+	def stopHealthMonitor(self):
+		""" 
+			Stops the background health checks started by startHealthMonitor()
+		"""
+		if self._healthMonitor is not None:
+			stop, thread = self._healthMonitor
+			self._healthMonitor = None
+			stop.set()
+			if thread is not threading.current_thread():
+				thread.join()
+
+	# ----------------------------------
+	# recover()
+	#
+	# Re-applies the configuration written through this object
+	def recover(self):
+		""" 
+			Re-applies every configuration register written through this object
+			(e.g. after the sensor lost power). The sensor is put in standby while
+			the registers are written, and POWER_CTL is restored last.
+
+			:return: Returns true of the function was completed, otherwise False.
+			:rtype: bool
+		"""
+		with self._lock:
+			config = dict(self._config)
+			self._noDataChecks = 0
+			powerCtl = config.get(self.ADXL313_POWER_CTL)
+			ok = True
+			if powerCtl is not None:
+				ok = self._writeRegister(self.ADXL313_POWER_CTL, powerCtl & ~(1 << self.ADXL313_MEASURE_BIT))
+			for regAddress in self.ADXL313_CONFIG_REGISTERS:
+				if ok and regAddress in config:
+					ok = self._writeRegister(regAddress, config[regAddress])
+			self._config = config
+			self._updatePowerState()
+			return ok
 
 	# ----------------------------------
 	# Lower Power definitions
 	# 
 	def isLowPower(self):
-		return getRegisterBit(self.ADXL313_BW_RATE, 4)
+		return self.getRegisterBit(self.ADXL313_BW_RATE, 4)
 
 	def lowPowerOn(self):
 		return self.setRegisterBit(self.ADXL313_BW_RATE, 4, True)
@@ -912,9 +1935,9 @@ class QwiicAdxl313(object):
 
 	def setLowPower(self, state):
 		if(state):
-			self.lowPowerOn()
+			return self.lowPowerOn()
 		else:
-			self.lowPowerOff()
+			return self.lowPowerOff()
 
 	lowPower = property(isLowPower, setLowPower)
 
@@ -922,9 +1945,2393 @@ class QwiicAdxl313(object):
 	# Bandwidth definitions
 	# 
 	def setBandwidth(self, bw):
-		self._i2c.writeByte(self.address, self.ADXL313_BW_RATE, bw)
+		return self._writeRegister(self.ADXL313_BW_RATE, bw)
 
 	def getBandwidth(self):
-		return self._i2c.readByte(self.address, self.ADXL313_BW_RATE)
+		return self._readRegister(self.ADXL313_BW_RATE)
 
 	bandwidth = property(getBandwidth, setBandwidth)
+
+class FifoTriggerEvent(object):
+	"""
+	FifoTriggerEvent
+
+		Samples captured around a FIFO trigger event (see QwiicAdxl313.captureFifoTrigger()).
+
+		:param timestamp: time (time.time()) at which the trigger was detected
+		:param rate: output data rate (Hz) of the samples
+		:param triggerIndex: index of the first sample at or after the trigger event
+		:param samples: list of contiguous (x, y, z) tuples, oldest first
+		:param complete: False if the capture stopped (timeout, FIFO not filling) before
+						 all the samples asked for were read
+	"""
+	def __init__(self, timestamp, rate, triggerIndex, samples, complete=True):
+		self.timestamp = timestamp
+		self.rate = rate
+		self.triggerIndex = triggerIndex
+		self.samples = samples
+		self.complete = complete
+
+	def sampleTime(self, index):
+		"""
+			Estimated time of a sample, relative to the trigger detection time
+
+			:param index: index of the sample in samples
+
+			:return: time (time.time() base) of the sample
+			:rtype: float
+		"""
+		return self.timestamp + (index - self.triggerIndex) / self.rate
+
+class AcquisitionPlan(object):
+	"""
+	AcquisitionPlan
+
+		Settings chosen by QwiicAdxl313.planAcquisition() and their predicted cost.
+
+		:param bandwidthCode: BW_RATE code (ADXL313_BW_*)
+		:param lowPower: 1 to use the low power mode
+		:param fifoMode: ADXL313_FIFO_MODE_*
+		:param watermark: FIFO samples threshold
+		:param dataRate: output data rate in Hz
+		:param wakeupsPerSecond: predicted host wake ups (FIFO drains) per second
+		:param busUtilization: predicted fraction of the bus throughput used
+		:param current: predicted sensor supply current in uA
+	"""
+	def __init__(self, bandwidthCode, lowPower, fifoMode, watermark, dataRate,
+				 wakeupsPerSecond, busUtilization, current):
+		self.bandwidthCode = bandwidthCode
+		self.lowPower = int(lowPower)
+		self.fifoMode = fifoMode
+		self.watermark = watermark
+		self.dataRate = dataRate
+		self.wakeupsPerSecond = wakeupsPerSecond
+		self.busUtilization = busUtilization
+		self.current = current
+
+	def __repr__(self):
+		return ("AcquisitionPlan(bandwidthCode=0x%X, lowPower=%d, fifoMode=%d, watermark=%d, dataRate=%g, "
+				"wakeupsPerSecond=%.3g, busUtilization=%.3g, current=%g)") % (
+				self.bandwidthCode, self.lowPower, self.fifoMode, self.watermark, self.dataRate,
+				self.wakeupsPerSecond, self.busUtilization, self.current)
+
+class RegisterSnapshot(object):
+	"""
+	RegisterSnapshot
+
+		Decoded copy of the ADXL313 registers (see QwiicAdxl313.snapshot()).
+		Snapshots compare equal when their registers are equal; diff() lists
+		the registers that changed.
+
+		:param registers: dictionary of register address to value
+	"""
+	def __init__(self, registers):
+		self.registers = registers
+
+	def __eq__(self, other):
+		return isinstance(other, RegisterSnapshot) and self.registers == other.registers
+
+	def __ne__(self, other):
+		return not self == other
+
+	def __repr__(self):
+		return "RegisterSnapshot(%s)" % ", ".join("0x%.2X=0x%.2X" % (reg, self.registers[reg]) for reg in sorted(self.registers))
+
+	def diff(self, other):
+		"""
+			:return: register addresses whose value differs between the two snapshots
+			:rtype: list
+		"""
+		return sorted(reg for reg in set(self.registers) | set(other.registers)
+					  if self.registers.get(reg) != other.registers.get(reg))
+
+	def _bit(self, regAddress, bitPos):
+		return (self.registers[regAddress] >> bitPos) & 1
+
+	def _signed(self, regAddress):
+		value = self.registers[regAddress]
+		return value - 256 if value > 127 else value
+
+	# identification
+	devId0 = property(lambda self: self.registers[QwiicAdxl313.ADXL313_DEVID_0])
+	devId1 = property(lambda self: self.registers[QwiicAdxl313.ADXL313_DEVID_1])
+	partId = property(lambda self: self.registers[QwiicAdxl313.ADXL313_PARTID])
+	revId = property(lambda self: self.registers[QwiicAdxl313.ADXL313_REVID])
+	xId = property(lambda self: self.registers[QwiicAdxl313.ADXL313_XID])
+	validId = property(lambda self: self.devId0 == QwiicAdxl313.ADXL313_DEVID_0_RSP_EXPECTED
+					   and self.devId1 == QwiicAdxl313.ADXL313_DEVID_1_RSP_EXPECTED and self.partId in _validChipIDs)
+
+	# offsets (signed, 3.9mg/LSB)
+	offsetX = property(lambda self: self._signed(QwiicAdxl313.ADXL313_OFSX))
+	offsetY = property(lambda self: self._signed(QwiicAdxl313.ADXL313_OFSY))
+	offsetZ = property(lambda self: self._signed(QwiicAdxl313.ADXL313_OFSZ))
+
+	# activity / inactivity
+	activityThreshold = property(lambda self: self.registers[QwiicAdxl313.ADXL313_THRESH_ACT])
+	inactivityThreshold = property(lambda self: self.registers[QwiicAdxl313.ADXL313_THRESH_INACT])
+	timeInactivity = property(lambda self: self.registers[QwiicAdxl313.ADXL313_TIME_INACT])
+	activityAcCoupled = property(lambda self: self._bit(QwiicAdxl313.ADXL313_ACT_INACT_CTL, 7))
+	activityX = property(lambda self: self._bit(QwiicAdxl313.ADXL313_ACT_INACT_CTL, 6))
+	activityY = property(lambda self: self._bit(QwiicAdxl313.ADXL313_ACT_INACT_CTL, 5))
+	activityZ = property(lambda self: self._bit(QwiicAdxl313.ADXL313_ACT_INACT_CTL, 4))
+	inactivityAcCoupled = property(lambda self: self._bit(QwiicAdxl313.ADXL313_ACT_INACT_CTL, 3))
+	inactivityX = property(lambda self: self._bit(QwiicAdxl313.ADXL313_ACT_INACT_CTL, 2))
+	inactivityY = property(lambda self: self._bit(QwiicAdxl313.ADXL313_ACT_INACT_CTL, 1))
+	inactivityZ = property(lambda self: self._bit(QwiicAdxl313.ADXL313_ACT_INACT_CTL, 0))
+
+	# BW_RATE
+	bandwidth = property(lambda self: self.registers[QwiicAdxl313.ADXL313_BW_RATE] & 0x0F)
+	lowPower = property(lambda self: self._bit(QwiicAdxl313.ADXL313_BW_RATE, 4))
+	dataRate = property(lambda self: 6.25 * (2 ** (self.bandwidth - QwiicAdxl313.ADXL313_BW_3_125)))
+
+	# POWER_CTL
+	i2cDisabled = property(lambda self: self._bit(QwiicAdxl313.ADXL313_POWER_CTL, QwiicAdxl313.ADXL313_I2C_DISABLE_BIT))
+	link = property(lambda self: self._bit(QwiicAdxl313.ADXL313_POWER_CTL, QwiicAdxl313.ADXL313_LINK_BIT))
+	autosleep = property(lambda self: self._bit(QwiicAdxl313.ADXL313_POWER_CTL, QwiicAdxl313.ADXL313_AUTOSLEEP_BIT))
+	measure = property(lambda self: self._bit(QwiicAdxl313.ADXL313_POWER_CTL, QwiicAdxl313.ADXL313_MEASURE_BIT))
+	sleep = property(lambda self: self._bit(QwiicAdxl313.ADXL313_POWER_CTL, QwiicAdxl313.ADXL313_SLEEP_BIT))
+	wakeup = property(lambda self: self.registers[QwiicAdxl313.ADXL313_POWER_CTL] & 0b00000011)
+
+	# interrupts (bit fields, see ADXL313_INT_*_BIT)
+	interruptEnable = property(lambda self: self.registers[QwiicAdxl313.ADXL313_INT_ENABLE])
+	interruptMap = property(lambda self: self.registers[QwiicAdxl313.ADXL313_INT_MAP])
+	intSource = property(lambda self: self.registers.get(QwiicAdxl313.ADXL313_INT_SOURCE))
+
+	# DATA_FORMAT
+	selfTest = property(lambda self: self._bit(QwiicAdxl313.ADXL313_DATA_FORMAT, 7))
+	spi3Wire = property(lambda self: self._bit(QwiicAdxl313.ADXL313_DATA_FORMAT, 6))
+	intInvert = property(lambda self: self._bit(QwiicAdxl313.ADXL313_DATA_FORMAT, 5))
+	fullRes = property(lambda self: self._bit(QwiicAdxl313.ADXL313_DATA_FORMAT, QwiicAdxl313.ADXL313_FULL_RES_BIT))
+	justify = property(lambda self: self._bit(QwiicAdxl313.ADXL313_DATA_FORMAT, 2))
+	range = property(lambda self: self.registers[QwiicAdxl313.ADXL313_DATA_FORMAT] & 0b00000011)
+
+	# FIFO
+	fifoMode = property(lambda self: self.registers[QwiicAdxl313.ADXL313_FIFO_CTL] >> 6)
+	fifoTriggerPin = property(lambda self: self._bit(QwiicAdxl313.ADXL313_FIFO_CTL, QwiicAdxl313.ADXL313_FIFO_TRIGGER_BIT))
+	fifoSamples = property(lambda self: self.registers[QwiicAdxl313.ADXL313_FIFO_CTL] & 0b00011111)
+	fifoTriggered = property(lambda self: self._bit(QwiicAdxl313.ADXL313_FIFO_STATUS, QwiicAdxl313.ADXL313_FIFO_TRIG_BIT))
+	fifoEntries = property(lambda self: self.registers[QwiicAdxl313.ADXL313_FIFO_STATUS] & 0b00111111)
+
+#-----------------------------------------------------------------------------
+# Sample containers
+
+class Sample(object):
+	"""
+	Sample
+
+		One immutable raw sample.
+
+		:param x: raw x value
+		:param y: raw y value
+		:param z: raw z value
+		:param timestamp: time (time.time()) of the sample
+		:param scale: g per LSB of the raw values
+	"""
+	__slots__ = ('x', 'y', 'z', 'timestamp', 'scale')
+
+	def __init__(self, x, y, z, timestamp=None, scale=None):
+		object.__setattr__(self, 'x', x)
+		object.__setattr__(self, 'y', y)
+		object.__setattr__(self, 'z', z)
+		object.__setattr__(self, 'timestamp', timestamp)
+		object.__setattr__(self, 'scale', scale)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Sample is immutable")
+
+	def __iter__(self):
+		return iter((self.x, self.y, self.z))
+
+	def __eq__(self, other):
+		return isinstance(other, Sample) and (self.x, self.y, self.z, self.timestamp, self.scale) == \
+			(other.x, other.y, other.z, other.timestamp, other.scale)
+
+	def __hash__(self):
+		return hash((self.x, self.y, self.z, self.timestamp, self.scale))
+
+	def __repr__(self):
+		return "Sample(x=%d, y=%d, z=%d, timestamp=%r, scale=%r)" % (self.x, self.y, self.z, self.timestamp, self.scale)
+
+	def acceleration(self):
+		"""
+			:return: (x, y, z) in g
+			:rtype: tuple
+		"""
+		return (self.x * self.scale, self.y * self.scale, self.z * self.scale)
+
+class SampleBatch(object):
+	"""
+	SampleBatch
+
+		A batch of raw samples (e.g. one FIFO drain), stored as packed signed 16 bit
+		x, y, z triplets (6 bytes per sample). Behaves as a sequence of (x, y, z)
+		tuples, and exposes its memory for zero-copy hand off through .buffer, e.g.
+		numpy.frombuffer(batch.buffer, dtype=numpy.int16).reshape(-1, 3),
+		file.write(batch.buffer) or socket.send(batch.buffer). On Python 3.12+ the
+		batch itself also supports the buffer protocol (memoryview(batch)), but
+		.buffer works on every supported version.
+
+		:param data: array('h') of interleaved x, y, z values
+		:param timestamp: time (time.time()) of the last sample in the batch
+		:param rate: output data rate (Hz) the samples were taken at
+		:param scale: g per LSB of the raw values
+	"""
+	__slots__ = ('data', 'timestamp', 'rate', 'scale')
+
+	def __init__(self, data, timestamp=None, rate=None, scale=None):
+		object.__setattr__(self, 'data', data)
+		object.__setattr__(self, 'timestamp', timestamp)
+		object.__setattr__(self, 'rate', rate)
+		object.__setattr__(self, 'scale', scale)
+
+	@classmethod
+	def fromBytes(cls, data, timestamp=None, rate=None, scale=None):
+		"""
+			Builds a batch from little endian x0 x1 y0 y1 z0 z1 data register bytes
+
+			:return: the batch
+			:rtype: SampleBatch
+		"""
+		values = array('h')
+		values.frombytes(bytes(data))
+		if sys.byteorder == 'big':
+			values.byteswap()
+		return cls(values, timestamp, rate, scale)
+
+	@classmethod
+	def fromSamples(cls, samples, timestamp=None, rate=None, scale=None):
+		"""
+			Builds a batch from a sequence of (x, y, z) tuples
+
+			:return: the batch
+			:rtype: SampleBatch
+		"""
+		values = array('h')
+		for sample in samples:
+			values.extend(sample)
+		return cls(values, timestamp, rate, scale)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("SampleBatch is immutable")
+
+	def __len__(self):
+		return len(self.data) // 3
+
+	def __iter__(self):
+		values = iter(self.data)
+		return zip(values, values, values)
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(len(self)))]
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError("sample index out of range")
+		i = 3 * index
+		data = self.data
+		return (data[i], data[i + 1], data[i + 2])
+
+	def __buffer__(self, flags):
+		return memoryview(self.data)
+
+	def __repr__(self):
+		return "SampleBatch(%d samples, timestamp=%r, rate=%r, scale=%r)" % (len(self), self.timestamp, self.rate, self.scale)
+
+	@property
+	def buffer(self):
+		"""
+			The packed samples, as a memoryview of signed 16 bit values (native byte order)
+		"""
+		return memoryview(self.data)
+
+	@property
+	def x(self):
+		"""
+			Strided view of the x values (no copy). Not contiguous: use
+			numpy.asarray(batch.x) rather than numpy.frombuffer(), or columns()
+		"""
+		return memoryview(self.data)[0::3]
+
+	@property
+	def y(self):
+		"""
+			Strided view of the y values (no copy), see x
+		"""
+		return memoryview(self.data)[1::3]
+
+	@property
+	def z(self):
+		"""
+			Strided view of the z values (no copy), see x
+		"""
+		return memoryview(self.data)[2::3]
+
+	def columns(self):
+		"""
+			Copies the samples out into one contiguous array per axis, which
+			any buffer consumer (numpy.frombuffer() included) accepts
+
+			:return: (x, y, z) array('h') values
+			:rtype: tuple
+		"""
+		data = self.data
+		return (data[0::3], data[1::3], data[2::3])
+
+	def sampleTime(self, index):
+		"""
+			Time (time.time()) of a sample, from the batch timestamp and the data rate
+
+			:param index: index of the sample in the batch
+		"""
+		return self.timestamp - (len(self) - 1 - index) / self.rate
+
+	def timestamps(self):
+		"""
+			:return: time (time.time()) of every sample
+			:rtype: list
+		"""
+		return [self.sampleTime(i) for i in range(len(self))]
+
+	def tobytes(self):
+		"""
+			:return: the packed samples (native byte order)
+			:rtype: bytes
+		"""
+		return self.data.tobytes()
+
+	def samples(self):
+		"""
+			:return: every sample as a Sample object
+			:rtype: list
+		"""
+		return [Sample(x, y, z, self.sampleTime(i), self.scale) for i, (x, y, z) in enumerate(self)]
+
+class QwiicBusArbiter(object):
+	"""
+	QwiicBusArbiter
+
+		Wraps an I2C driver object so several qwiic devices (on one or more threads)
+		can share a bus. Pass the arbiter as i2c_driver to each device object.
+
+		Transfers are serialized and granted in priority order; a transfer already
+		on the bus is never interrupted, but queued high priority work (like a
+		FIFO drain) goes ahead of queued configuration traffic. Busy time,
+		transfers and bytes are accounted per device address.
+
+		Queued transfers are not merged with each other: reads of adjacent registers
+		are combined by the device code instead (readAccel(), snapshot() and FIFO
+		drains read their registers in one burst). Merging across callers would
+		reorder reads that have side effects, such as INT_SOURCE (cleared on read)
+		or the data registers (which pop the FIFO).
+
+			:param i2c_driver: An existing i2c driver object. If not provided
+							a driver object is created.
+	"""
+	PRIORITY_HIGH = 0
+	PRIORITY_NORMAL = 1
+	PRIORITY_LOW = 2
+
+	def __init__(self, i2c_driver=None):
+		self._i2c = i2c_driver if i2c_driver is not None else qwiic_i2c.getI2CDriver()
+		self._cond = threading.Condition()
+		self._waiters = []
+		self._sequence = itertools.count()
+		self._owner = None
+		self._depth = 0
+		self._local = threading.local()
+		self._stats = {}
+		self._startTime = time.monotonic()
+
+	# ----------------------------------
+	# transaction()
+	#
+	# Context manager holding the bus for a sequence of transfers
+	@contextlib.contextmanager
+	def transaction(self, priority=PRIORITY_NORMAL, address=None):
+		""" 
+			Context manager that holds the bus for a sequence of transfers.
+			Transactions are reentrant; transfers inside inherit its priority.
+
+			:param priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+			:param address: device address, for accounting only
+		"""
+		me = threading.current_thread().ident
+		with self._cond:
+			if self._owner == me:
+				self._depth += 1
+			else:
+				entry = (priority, next(self._sequence))
+				heapq.heappush(self._waiters, entry)
+				while self._owner is not None or self._waiters[0] != entry:
+					self._cond.wait()
+				heapq.heappop(self._waiters)
+				self._owner = me
+				self._depth = 1
+		previous = getattr(self._local, 'priority', self.PRIORITY_NORMAL)
+		self._local.priority = priority
+		try:
+			yield self
+		finally:
+			self._local.priority = previous
+			with self._cond:
+				self._depth -= 1
+				if self._depth == 0:
+					self._owner = None
+					self._cond.notify_all()
+
+	def _transfer(self, address, nBytes, function, *args):
+		priority = getattr(self._local, 'priority', self.PRIORITY_NORMAL)
+		with self.transaction(priority, address):
+			start = time.perf_counter()
+			result = function(address, *args)
+			elapsed = time.perf_counter() - start
+		stats = self._stats.get(address)
+		if stats is None:
+			stats = self._stats[address] = [0, 0, 0.0]
+		stats[0] += 1
+		stats[1] += nBytes
+		stats[2] += elapsed
+		return result
+
+	def readByte(self, address, commandCode=None):
+		if commandCode is None:
+			return self._transfer(address, 1, self._i2c.readByte)
+		return self._transfer(address, 1, self._i2c.readByte, commandCode)
+
+	def writeByte(self, address, commandCode, value):
+		return self._transfer(address, 1, self._i2c.writeByte, commandCode, value)
+
+	def readWord(self, address, commandCode):
+		return self._transfer(address, 2, self._i2c.readWord, commandCode)
+
+	def writeWord(self, address, commandCode, value):
+		return self._transfer(address, 2, self._i2c.writeWord, commandCode, value)
+
+	def readBlock(self, address, commandCode, nBytes):
+		return self._transfer(address, nBytes, self._i2c.readBlock, commandCode, nBytes)
+
+	def writeBlock(self, address, commandCode, value):
+		return self._transfer(address, len(value), self._i2c.writeBlock, commandCode, value)
+
+	def readBlocks(self, address, commandCode, nBytes, count):
+		readBlocks = getattr(self._i2c, 'readBlocks', None)
+		if readBlocks is not None:
+			return self._transfer(address, nBytes * count, readBlocks, commandCode, nBytes, count)
+		priority = getattr(self._local, 'priority', self.PRIORITY_NORMAL)
+		data = bytearray()
+		with self.transaction(priority, address):
+			for _ in range(count):
+				data.extend(self.readBlock(address, commandCode, nBytes))
+		return data
+
+	def isDeviceConnected(self, address):
+		isDeviceConnected = getattr(self._i2c, 'isDeviceConnected', None)
+		if isDeviceConnected is None:
+			return qwiic_i2c.isDeviceConnected(address)
+		return self._transfer(address, 0, isDeviceConnected)
+
+	def __getattr__(self, name):
+		# anything else the wrapped driver provides (scan(), writeCommand(), ...)
+		return getattr(self._i2c, name)
+
+	# ----------------------------------
+	# getUtilization()
+	#
+	# Bus usage accounted per device address
+	def getUtilization(self):
+		""" 
+			Bus usage per device address since the arbiter was created
+
+			:return: dictionary of address to (transfers, bytes, busy seconds, busy fraction)
+			:rtype: dict
+		"""
+		elapsed = max(time.monotonic() - self._startTime, 1e-9)
+		return dict((address, (stats[0], stats[1], stats[2], stats[2] / elapsed))
+					for address, stats in self._stats.items())
+
+#-----------------------------------------------------------------------------
+# Linux i2c-dev transport
+
+_I2C_RDWR = 0x0707				# ioctl: combined read/write transfer
+_I2C_M_RD = 0x0001				# i2c_msg flag: read
+_I2C_RDWR_IOCTL_MAX_MSGS = 42	# kernel limit of messages per I2C_RDWR
+
+class _I2cMsg(ctypes.Structure):
+	_fields_ = [('addr', ctypes.c_uint16),
+				('flags', ctypes.c_uint16),
+				('len', ctypes.c_uint16),
+				('buf', ctypes.c_void_p)]
+
+class _I2cRdwrIoctlData(ctypes.Structure):
+	_fields_ = [('msgs', ctypes.POINTER(_I2cMsg)),
+				('nmsgs', ctypes.c_uint32)]
+
+class QwiicLinuxI2C(object):
+	"""
+	QwiicLinuxI2C
+
+		I2C driver talking directly to a Linux /dev/i2c-N device with the I2C_RDWR
+		ioctl. Pass it as i2c_driver to a device object. Every register read is one
+		combined write-register-then-read transfer with no length limit, and
+		readBlocks() packs many register reads (e.g. a FIFO drain) into a single
+		ioctl. Message and data buffers are allocated once and reused; a lock keeps
+		transfers from different threads from sharing them at the same time.
+
+		Not every adapter accepts more than one write/read pair per ioctl (the
+		Raspberry Pi's i2c-bcm2835 fails them with EOPNOTSUPP). When a batched
+		transfer is rejected with EOPNOTSUPP or EINVAL, readBlocks() retries with
+		one pair per ioctl and keeps doing so for this adapter; pass
+		batchReads=False to skip the batched attempt altogether.
+
+			:param bus: I2C bus number (/dev/i2c-<bus>)
+			:param fd: an already open file descriptor to use instead of opening the bus
+			:param ioctl: ioctl function, defaults to fcntl.ioctl (can be replaced for testing)
+			:param batchReads: pack several register reads into one ioctl in readBlocks()
+	"""
+	def __init__(self, bus=1, fd=None, ioctl=None, batchReads=True):
+		if ioctl is None:
+			import fcntl
+			ioctl = fcntl.ioctl
+		self._ioctl = ioctl
+		self._fd = fd if fd is not None else os.open("/dev/i2c-%d" % bus, os.O_RDWR)
+		self._msgs = (_I2cMsg * _I2C_RDWR_IOCTL_MAX_MSGS)()
+		self._request = _I2cRdwrIoctlData(self._msgs, 0)
+		self._requestAddress = ctypes.addressof(self._request)
+		self._writeBuffer = ctypes.create_string_buffer(33)
+		self._readBuffer = ctypes.create_string_buffer(256)
+		self._pairsPerTransfer = _I2C_RDWR_IOCTL_MAX_MSGS // 2 if batchReads else 1
+		self._lock = threading.Lock()		# guards the shared message and data buffers
+
+	def close(self):
+		if self._fd is not None:
+			os.close(self._fd)
+			self._fd = None
+
+	def _getReadBuffer(self, size):
+		if len(self._readBuffer) < size:
+			self._readBuffer = ctypes.create_string_buffer(size)
+		return self._readBuffer
+
+	def _setMsg(self, index, address, flags, length, bufferAddress):
+		msg = self._msgs[index]
+		msg.addr = address
+		msg.flags = flags
+		msg.len = length
+		msg.buf = bufferAddress
+
+	def _transfer(self, nmsgs):
+		self._request.nmsgs = nmsgs
+		self._ioctl(self._fd, _I2C_RDWR, self._requestAddress)
+
+	def _read(self, address, commandCode, nBytes):
+		with self._lock:
+			readBuffer = self._getReadBuffer(nBytes)
+			nmsgs = 0
+			if commandCode is not None:
+				self._writeBuffer[0] = commandCode
+				self._setMsg(0, address, 0, 1, ctypes.addressof(self._writeBuffer))
+				nmsgs = 1
+			self._setMsg(nmsgs, address, _I2C_M_RD, nBytes, ctypes.addressof(readBuffer))
+			self._transfer(nmsgs + 1)
+			return readBuffer.raw[:nBytes]
+
+	def _write(self, address, data):
+		length = len(data)
+		with self._lock:
+			if len(self._writeBuffer) < length:
+				self._writeBuffer = ctypes.create_string_buffer(length)
+			ctypes.memmove(self._writeBuffer, bytes(bytearray(data)), length)
+			self._setMsg(0, address, 0, length, ctypes.addressof(self._writeBuffer))
+			self._transfer(1)
+
+	def readByte(self, address, commandCode=None):
+		return bytearray(self._read(address, commandCode, 1))[0]
+
+	def writeByte(self, address, commandCode, value):
+		self._write(address, (commandCode, value & 0xFF))
+
+	def readWord(self, address, commandCode):
+		data = bytearray(self._read(address, commandCode, 2))
+		return data[0] | (data[1] << 8)
+
+	def writeWord(self, address, commandCode, value):
+		self._write(address, (commandCode, value & 0xFF, (value >> 8) & 0xFF))
+
+	def readBlock(self, address, commandCode, nBytes):
+		return list(bytearray(self._read(address, commandCode, nBytes)))
+
+	def writeBlock(self, address, commandCode, value):
+		self._write(address, [commandCode] + list(value))
+
+	def writeCommand(self, address, commandCode):
+		self._write(address, (commandCode,))
+
+	# ----------------------------------
+	# readBlocks()
+	#
+	# Repeated reads of the same registers, batched into as few ioctls as possible
+	def readBlocks(self, address, commandCode, nBytes, count):
+		""" 
+			Reads the same nBytes starting at commandCode, count times (e.g. popping
+			FIFO entries), packing up to 21 write/read message pairs per ioctl. If
+			the adapter rejects multi-pair transfers, falls back to one pair per
+			ioctl (see the class docstring).
+
+			:return: the data of all reads, concatenated
+			:rtype: bytes
+		"""
+		with self._lock:
+			readBuffer = self._getReadBuffer(nBytes * count)
+			bufferAddress = ctypes.addressof(readBuffer)
+			self._writeBuffer[0] = commandCode
+			writeAddress = ctypes.addressof(self._writeBuffer)
+			done = 0
+			while done < count:
+				batch = min(self._pairsPerTransfer, count - done)
+				for i in range(batch):
+					self._setMsg(2 * i, address, 0, 1, writeAddress)
+					self._setMsg(2 * i + 1, address, _I2C_M_RD, nBytes, bufferAddress + (done + i) * nBytes)
+				try:
+					self._transfer(2 * batch)
+				except (IOError, OSError) as e:
+					if batch == 1 or e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+						raise
+					# The adapter can't do a repeated start across several pairs,
+					# retry this batch (and all later ones) one pair at a time
+					self._pairsPerTransfer = 1
+					continue
+				done += batch
+			return readBuffer.raw[:nBytes * count]
+
+	def isDeviceConnected(self, address):
+		try:
+			self._read(address, None, 1)
+			return True
+		except (IOError, OSError):
+			return False
+
+#-----------------------------------------------------------------------------
+# SPI transport
+
+class QwiicAdxl313Spi(object):
+	"""
+	QwiicAdxl313Spi
+
+		SPI driver with the same register interface as the I2C drivers, so it
+		can be passed as i2c_driver to QwiicAdxl313 (the address is ignored).
+		Multi-byte reads set the MB bit, so DATA_X0..DATA_Z1 come back in one
+		burst. Uses 4-wire SPI, mode 3.
+
+			:param bus: SPI bus number
+			:param device: chip select number on the bus
+			:param maxSpeed: SPI clock in Hz (the ADXL313 supports up to 5MHz). When
+				spi is given, leave this as None to keep the clock it was configured with
+			:param spi: an already configured spidev.SpiDev-like object
+	"""
+	SPI_READ_BIT = 0x80			# R/W bit of the command byte
+	SPI_MULTI_BYTE_BIT = 0x40	# MB bit, auto-increment the register address
+	FIFO_READ_DELAY_US = 5		# minimum gap between FIFO entry reads (datasheet page 16)
+
+	def __init__(self, bus=0, device=0, maxSpeed=None, spi=None):
+		if spi is None:
+			import spidev
+			spi = spidev.SpiDev()
+			spi.open(bus, device)
+			spi.mode = 3
+			spi.max_speed_hz = maxSpeed or 5000000
+			maxSpeed = None
+		self._spi = spi
+		self._speed = maxSpeed
+
+	def close(self):
+		self._spi.close()
+
+	def _read(self, commandCode, nBytes):
+		command = commandCode | self.SPI_READ_BIT
+		if nBytes > 1:
+			command |= self.SPI_MULTI_BYTE_BIT
+		return self._spi.xfer2([command] + [0] * nBytes)[1:]
+
+	def _write(self, commandCode, values):
+		command = commandCode
+		if len(values) > 1:
+			command |= self.SPI_MULTI_BYTE_BIT
+		self._spi.xfer2([command] + list(values))
+
+	def readByte(self, address, commandCode):
+		return self._read(commandCode, 1)[0]
+
+	def writeByte(self, address, commandCode, value):
+		self._write(commandCode, [value & 0xFF])
+
+	def readWord(self, address, commandCode):
+		data = self._read(commandCode, 2)
+		return data[0] | (data[1] << 8)
+
+	def writeWord(self, address, commandCode, value):
+		self._write(commandCode, [value & 0xFF, (value >> 8) & 0xFF])
+
+	def readBlock(self, address, commandCode, nBytes):
+		return list(self._read(commandCode, nBytes))
+
+	def writeBlock(self, address, commandCode, value):
+		self._write(commandCode, value)
+
+	# ----------------------------------
+	# readBlocks()
+	#
+	# Repeated burst reads of the same registers (e.g. a FIFO drain)
+	def readBlocks(self, address, commandCode, nBytes, count):
+		""" 
+			Reads the same nBytes starting at commandCode, count times (e.g. popping
+			FIFO entries), leaving the minimum gap between reads for the FIFO to pop.
+
+			:return: the data of all reads, concatenated
+			:rtype: bytes
+		"""
+		command = [commandCode | self.SPI_READ_BIT | self.SPI_MULTI_BYTE_BIT] + [0] * nBytes
+		# xfer2 needs a speed to take the delay, use the device's own unless one was given
+		speed = self._speed if self._speed is not None else self._spi.max_speed_hz
+		data = bytearray()
+		for _ in range(count):
+			data.extend(self._spi.xfer2(list(command), speed, self.FIFO_READ_DELAY_US)[1:])
+		return data
+
+	def isDeviceConnected(self, address):
+		try:
+			return self._read(QwiicAdxl313.ADXL313_DEVID_0, 1)[0] == QwiicAdxl313.ADXL313_DEVID_0_RSP_EXPECTED
+		except (IOError, OSError):
+			return False
+
+#-----------------------------------------------------------------------------
+# Orientation
+#
+# Pitch, roll and tilt (angle from vertical) derived from gravity, computed for a
+# whole batch of samples at once. Uses NumPy when it is available.
+
+class OrientationBatch(object):
+	"""
+	OrientationBatch
+
+		(pitch, roll, tilt) in degrees for every sample of a batch, with the batch
+		timing (see SampleBatch). With NumPy, angles is an (n, 3) float64 array and
+		pitch, roll and tilt are views of its columns; otherwise angles is a list of
+		tuples. Either way it behaves as a sequence of (pitch, roll, tilt) tuples.
+
+		:param angles: the angles, one row per sample
+		:param timestamp: time (time.time()) of the last sample, None if not known
+		:param rate: output data rate (Hz) of the samples, None if not known
+	"""
+	__slots__ = ('angles', 'timestamp', 'rate')
+
+	def __init__(self, angles, timestamp=None, rate=None):
+		self.angles = angles
+		self.timestamp = timestamp
+		self.rate = rate
+
+	def __len__(self):
+		return len(self.angles)
+
+	def __iter__(self):
+		if isinstance(self.angles, list):
+			return iter(self.angles)
+		return iter(map(tuple, self.angles.tolist()))
+
+	def __getitem__(self, index):
+		if isinstance(self.angles, list):
+			return self.angles[index]
+		return tuple(self.angles[index].tolist())
+
+	def __repr__(self):
+		return "OrientationBatch(%d samples, timestamp=%r, rate=%r)" % (len(self), self.timestamp, self.rate)
+
+	@property
+	def pitch(self):
+		return self._column(0)
+
+	@property
+	def roll(self):
+		return self._column(1)
+
+	@property
+	def tilt(self):
+		return self._column(2)
+
+	def _column(self, axis):
+		if isinstance(self.angles, list):
+			return [row[axis] for row in self.angles]
+		return self.angles[:, axis]
+
+	def sampleTime(self, index):
+		"""
+			Time (time.time()) of a sample, from the batch timestamp and the data rate
+
+			:param index: index of the sample in the batch
+		"""
+		return self.timestamp - (len(self) - 1 - index) / self.rate
+
+	def timestamps(self):
+		"""
+			:return: time (time.time()) of every sample; an array with NumPy
+			:rtype: list
+		"""
+		numpy = _numpy()
+		count = len(self)
+		if numpy is not None and not isinstance(self.angles, list):
+			return self.timestamp - (count - 1 - numpy.arange(count)) / self.rate
+		return [self.sampleTime(i) for i in range(count)]
+
+class OrientationFilter(object):
+	"""
+	OrientationFilter
+
+		Converts batches of raw samples to (pitch, roll, tilt) angles in degrees.
+		The optional low-pass (exponential, gravity estimate = gravity estimate +
+		alpha * (sample - gravity estimate)) rejects vibration; its state carries
+		over from one batch to the next. With NumPy the whole batch is computed with
+		array operations, the low-pass included.
+
+		:param alpha: low-pass coefficient (0-1], None disables the filter
+	"""
+	# samples per block of the vectorized low-pass
+	BLOCK = 64
+
+	def __init__(self, alpha=None):
+		if alpha is not None and not 0 < alpha <= 1:
+			raise ValueError("alpha must be in (0, 1]")
+		self.alpha = alpha
+		self._gravity = None
+		self._weights = {}
+
+	def reset(self):
+		"""
+			Forgets the low-pass state
+		"""
+		self._gravity = None
+
+	def process(self, samples):
+		"""
+			Computes the orientation of every sample in a batch
+
+			:param samples: SampleBatch, or sequence of (x, y, z) raw sample tuples
+
+			:return: the angles, with the batch timestamp and rate of a SampleBatch
+			:rtype: OrientationBatch
+		"""
+		numpy = _numpy()
+		timestamp = getattr(samples, 'timestamp', None)
+		rate = getattr(samples, 'rate', None)
+		if not len(samples):
+			return OrientationBatch(numpy.empty((0, 3)) if numpy is not None else [], timestamp, rate)
+		if numpy is not None:
+			return OrientationBatch(self._processNumpy(samples), timestamp, rate)
+
+		if self.alpha is not None:
+			samples = self._lowPass(samples)
+		atan2 = math.atan2
+		sqrt = math.sqrt
+		degrees = 180.0 / math.pi
+		out = []
+		for x, y, z in samples:
+			pitch = atan2(-x, sqrt(y * y + z * z))
+			roll = atan2(y, z)
+			tilt = atan2(sqrt(x * x + y * y), z)
+			out.append((pitch * degrees, roll * degrees, tilt * degrees))
+		return OrientationBatch(out, timestamp, rate)
+
+	def _processNumpy(self, samples):
+		numpy = _numpy()
+		if isinstance(samples, SampleBatch):
+			data = numpy.frombuffer(samples.data, dtype=numpy.int16).reshape(-1, 3).astype(numpy.float64)
+		else:
+			data = numpy.asarray(samples, dtype=numpy.float64).reshape(-1, 3)
+		if self.alpha is not None:
+			data = self._lowPassNumpy(data)
+		x = data[:, 0]
+		y = data[:, 1]
+		z = data[:, 2]
+		out = numpy.empty_like(data)
+		numpy.arctan2(-x, numpy.hypot(y, z), out=out[:, 0])
+		numpy.arctan2(y, z, out=out[:, 1])
+		numpy.arctan2(numpy.hypot(x, y), z, out=out[:, 2])
+		return numpy.degrees(out, out=out)
+
+	def _blockWeights(self, count):
+		# g[i] = sum over k <= i of alpha * (1 - alpha)^(i - k) * x[k] + (1 - alpha)^(i + 1) * g[-1]
+		weights = self._weights.get(count)
+		if weights is None:
+			numpy = _numpy()
+			keep = 1.0 - self.alpha
+			lag = numpy.subtract.outer(numpy.arange(count), numpy.arange(count))
+			matrix = numpy.where(lag >= 0, self.alpha * keep ** numpy.maximum(lag, 0), 0.0)
+			decay = keep ** numpy.arange(1, count + 1)
+			weights = self._weights[count] = (matrix, decay[:, None])
+		return weights
+
+	def _lowPassNumpy(self, data):
+		# the exponential low-pass recurrence, solved one block at a time with a
+		# matrix product (no negative powers, so it stays accurate for any alpha)
+		numpy = _numpy()
+		gravity = data[0] if self._gravity is None else numpy.asarray(self._gravity, dtype=numpy.float64)
+		filtered = numpy.empty_like(data)
+		for start in range(0, len(data), self.BLOCK):
+			block = data[start:start + self.BLOCK]
+			matrix, decay = self._blockWeights(len(block))
+			out = filtered[start:start + len(block)]
+			numpy.matmul(matrix, block, out=out)
+			out += decay * gravity
+			gravity = out[-1]
+		self._gravity = tuple(gravity.tolist())
+		return filtered
+
+	def _lowPass(self, samples):
+		alpha = self.alpha
+		gx, gy, gz = self._gravity if self._gravity is not None else samples[0]
+		filtered = []
+		for x, y, z in samples:
+			gx += alpha * (x - gx)
+			gy += alpha * (y - gy)
+			gz += alpha * (z - gz)
+			filtered.append((gx, gy, gz))
+		self._gravity = (gx, gy, gz)
+		return filtered
+
+def calculateOrientation(samples):
+	"""
+		Computes (pitch, roll, tilt) in degrees for a batch of raw samples,
+		without filtering. See OrientationFilter.
+
+		:param samples: SampleBatch, or sequence of (x, y, z) raw sample tuples
+
+		:return: the angles, with the batch timestamp and rate of a SampleBatch
+		:rtype: OrientationBatch
+	"""
+	return OrientationFilter().process(samples)
+
+#-----------------------------------------------------------------------------
+# Event detection
+#
+# The ADXL313 has no tap or free-fall engine, so these run on the sample batches
+# (e.g. each FIFO drain). State carries over from one batch to the next, and event
+# times are those of the samples involved (see SampleBatch.sampleTime()).
+# Thresholds are compared with the raw counts. Uses NumPy when it is available.
+
+def _runsAbove(values, threshold, continuing):
+	numpy = _numpy()
+	# (start, end) of each run of values above threshold, end exclusive; a run
+	# continuing from the previous batch starts at -1, one still going ends at None
+	if numpy is not None:
+		above = (numpy.asarray(values) > threshold).astype(numpy.int8)
+		edges = numpy.diff(above, prepend=1 if continuing else 0)
+		starts = numpy.flatnonzero(edges == 1).tolist()
+		ends = numpy.flatnonzero(edges == -1).tolist()
+	else:
+		starts = []
+		ends = []
+		previous = continuing
+		for index, value in enumerate(values):
+			current = value > threshold
+			if current and not previous:
+				starts.append(index)
+			elif previous and not current:
+				ends.append(index)
+			previous = current
+	if continuing:
+		starts.insert(0, -1)
+	if len(ends) < len(starts):
+		ends.append(None)
+	return zip(starts, ends)
+
+class TapEvent(object):
+	"""
+	TapEvent
+
+		A tap or double tap found by TapDetector.
+
+		:param kind: TapDetector.TAP or TapDetector.DOUBLE_TAP
+		:param sampleIndex: number of the sample (counted from the first batch
+							processed) at which the tap started
+		:param timestamp: time (time.time()) of that sample, None if the batch had no timestamp
+		:param peak: largest deviation from the resting acceleration during the tap (g)
+	"""
+	def __init__(self, kind, sampleIndex, timestamp, peak):
+		self.kind = kind
+		self.sampleIndex = sampleIndex
+		self.timestamp = timestamp
+		self.peak = peak
+
+	def __repr__(self):
+		return "TapEvent(%r, sampleIndex=%d, timestamp=%r, peak=%.3g)" % (self.kind, self.sampleIndex, self.timestamp, self.peak)
+
+def _median(values):
+	ordered = sorted(values)
+	middle = len(ordered) // 2
+	if len(ordered) % 2:
+		return float(ordered[middle])
+	return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+class TapDetector(object):
+	"""
+	TapDetector
+
+		Tap and double tap detection with the ADXL345 tap engine parameters. A tap
+		is an excursion of the acceleration from its resting value (tracked per
+		axis with a slow low-pass, so gravity is ignored) above threshold on any
+		enabled axis, lasting no longer than duration. The resting value starts
+		from the median of the first batch, and excursions short enough to be taps
+		are left out of it, so taps don't shift it (longer ones, e.g. a change of
+		orientation, still move it). As on the ADXL345/313, latency counts
+		from the end of a tap: a second tap starting after latency and within
+		window after that makes a double tap; taps starting during latency are
+		ignored (ringing). TAP is reported as soon as the tap ends, DOUBLE_TAP when
+		the second tap ends.
+
+		:param threshold: deviation from rest (g)
+		:param duration: longest time above threshold for a tap (s)
+		:param latency: time after the end of a tap during which other taps are ignored (s)
+		:param window: time after latency in which a second tap makes a double tap (s), 0 disables double taps
+		:param axes: enabled axes, e.g. 'xyz' or 'z'
+		:param restTime: time constant of the resting acceleration estimate (s)
+	"""
+	TAP = 'tap'
+	DOUBLE_TAP = 'double-tap'
+
+	def __init__(self, threshold=1.5, duration=0.02, latency=0.05, window=0.3, axes='xyz', restTime=1.0):
+		self.threshold = threshold
+		self.duration = duration
+		self.latency = latency
+		self.window = window
+		self.axes = [{'x': 0, 'y': 1, 'z': 2}[axis] for axis in axes]
+		self.restTime = restTime
+		self.reset()
+
+	def reset(self):
+		"""
+			Forgets the state carried between batches
+		"""
+		self.samples = 0			# samples processed
+		self._rest = None			# resting acceleration estimate, counts per axis
+		self._runStart = None		# sample number where the current excursion started
+		self._runPeak = 0
+		self._lastTap = None		# sample number where the tap a double tap could follow ended
+
+	def _deviation(self, batch):
+		numpy = _numpy()
+		# largest deviation from rest over the enabled axes, per sample (counts), and
+		# the enabled axes' values for _updateRest()
+		if numpy is not None:
+			values = numpy.frombuffer(batch.data, numpy.int16).reshape(-1, 3)[:, self.axes]
+			if self._rest is None:
+				self._rest = numpy.median(values, axis=0)
+			return numpy.abs(values - self._rest).max(axis=1), values
+		values = [[sample[axis] for axis in self.axes] for sample in batch]
+		if self._rest is None:
+			self._rest = [_median(axis) for axis in zip(*values)]
+		rest = self._rest
+		return [max(abs(value - base) for value, base in zip(sample, rest)) for sample in values], values
+
+	def _updateRest(self, values, excluded, rate):
+		numpy = _numpy()
+		# low-pass the rest estimate towards the batch mean, without the (start, stop) ranges excluded
+		if numpy is not None:
+			keep = numpy.ones(len(values), bool)
+			for start, stop in excluded:
+				keep[start:stop] = False
+			values = values[keep]
+		else:
+			for start, stop in reversed(excluded):
+				del values[start:stop]
+		count = len(values)
+		if not count:
+			return
+		alpha = 1.0 - math.exp(-count / ((rate or 100.0) * self.restTime))
+		if numpy is not None:
+			self._rest = self._rest + alpha * (values.mean(axis=0) - self._rest)
+		else:
+			mean = [sum(axis) / float(count) for axis in zip(*values)]
+			self._rest = [base + alpha * (value - base) for value, base in zip(mean, self._rest)]
+
+	def process(self, batch):
+		"""
+			Looks for taps in a batch
+
+			:param batch: the SampleBatch (with its scale, rate and timestamp)
+
+			:return: list of TapEvent, oldest first
+			:rtype: list
+		"""
+		count = len(batch)
+		if not count:
+			return []
+		scale = batch.scale or 1.0 / 1024
+		rate = batch.rate or 100.0
+		threshold = self.threshold / scale
+		maxDuration = self.duration * rate
+		latency = self.latency * rate
+		window = self.window * rate
+		first = self.samples
+		deviation, values = self._deviation(batch)
+		events = []
+		excluded = []		# excursions short enough (so far) to be taps, kept out of the rest estimate
+		for start, end in _runsAbove(deviation, threshold, self._runStart is not None):
+			if start < 0:
+				runStart, carried, start = self._runStart, self._runPeak, 0
+			else:
+				runStart, carried = first + start, 0
+			stop = end if end is not None else count
+			if first + stop - runStart <= maxDuration:
+				excluded.append((start, stop))
+			peak = max(carried, float(max(deviation[start:stop]))) if stop > start else carried
+			if end is None:
+				self._runStart = runStart
+				self._runPeak = peak
+				break
+			self._runStart = None
+			self._runPeak = 0
+			if first + end - runStart > maxDuration:
+				continue	# too long for a tap
+			timestamp = None
+			if batch.timestamp is not None:
+				timestamp = batch.timestamp - (first + count - 1 - runStart) / rate
+			if self._lastTap is not None:
+				gap = runStart - self._lastTap
+				if gap <= latency:
+					continue
+				if gap <= latency + window:
+					events.append(TapEvent(self.DOUBLE_TAP, runStart, timestamp, peak * scale))
+					self._lastTap = None
+					continue
+			events.append(TapEvent(self.TAP, runStart, timestamp, peak * scale))
+			self._lastTap = first + end if self.window > 0 else None
+		self._updateRest(values, excluded, rate)
+		self.samples += count
+		return events
+
+class MotionEvent(object):
+	"""
+	MotionEvent
+
+		A free fall or impact found by FreeFallDetector.
+
+		:param kind: FreeFallDetector.FREE_FALL or FreeFallDetector.IMPACT
+		:param sampleIndex: number of the sample (counted from the first batch
+							processed) at which the event started
+		:param timestamp: time (time.time()) of that sample, None if the batch had no timestamp
+		:param duration: time below (free fall) or above (impact) the threshold seen so
+						 far (s); in low latency mode, the minimum that triggered the event
+		:param peak: smallest (free fall) or largest (impact) magnitude seen (g)
+		:param window: SampleBatch of the samples from preEventTime before the event up
+					   to the sample that completed it
+	"""
+	def __init__(self, kind, sampleIndex, timestamp, duration, peak, window):
+		self.kind = kind
+		self.sampleIndex = sampleIndex
+		self.timestamp = timestamp
+		self.duration = duration
+		self.peak = peak
+		self.window = window
+
+	def __repr__(self):
+		return "MotionEvent(%r, sampleIndex=%d, timestamp=%r, duration=%.3g, peak=%.3g, %d window samples)" % (
+			self.kind, self.sampleIndex, self.timestamp, self.duration, self.peak, len(self.window))
+
+class FreeFallDetector(object):
+	"""
+	FreeFallDetector
+
+		Free fall and impact (drop) detection. Free fall is the acceleration magnitude
+		staying below freeFallThreshold for at least freeFallTime; an impact is the
+		magnitude going above impactThreshold. Squared magnitudes of the raw counts are
+		compared with thresholds squared in counts (recomputed only when the scale
+		changes), so no per-sample float or square root work is done.
+
+		By default an event is reported when it ends, with its full duration and
+		peak. In lowLatency mode it is reported from the batch in which it is first
+		recognised (free fall after freeFallTime, impact on its first sample); use it
+		with a small FIFO watermark (see QwiicAdxl313.planAcquisition()) and read each
+		batch as soon as it lands. Note impacts beyond the range saturate at full scale.
+
+		:param freeFallThreshold: magnitude below which the device is falling (g)
+		:param freeFallTime: shortest free fall (s)
+		:param impactThreshold: magnitude above which there is an impact (g)
+		:param preEventTime: samples kept before each event for its window (s)
+		:param lowLatency: report events as soon as they are recognised
+		:param maxWindowTime: longest event window kept (s), bounds the memory used
+	"""
+	FREE_FALL = 'free-fall'
+	IMPACT = 'impact'
+
+	def __init__(self, freeFallThreshold=0.3, freeFallTime=0.1, impactThreshold=3.0, preEventTime=0.5,
+				 lowLatency=False, maxWindowTime=5.0):
+		self.freeFallThreshold = freeFallThreshold
+		self.freeFallTime = freeFallTime
+		self.impactThreshold = impactThreshold
+		self.preEventTime = preEventTime
+		self.lowLatency = lowLatency
+		self.maxWindowTime = maxWindowTime
+		self._scale = None
+		self.reset()
+
+	def reset(self):
+		"""
+			Forgets the state carried between batches
+		"""
+		self.samples = 0					# samples processed
+		self._history = collections.deque()	# (first sample number, SampleBatch), for event windows
+		# [start sample number, peak magnitude squared, reported] of the run in progress
+		self._runs = {self.FREE_FALL: None, self.IMPACT: None}
+
+	def _setScale(self, scale):
+		# thresholds as squared magnitudes in counts
+		self._scale = scale
+		self._freeFall2 = int((self.freeFallThreshold / scale) ** 2)
+		self._impact2 = int(math.ceil((self.impactThreshold / scale) ** 2))
+
+	def _magnitude2(self, batch):
+		numpy = _numpy()
+		if numpy is not None:
+			values = numpy.frombuffer(batch.data, numpy.int16).reshape(-1, 3).astype(numpy.int64)
+			return numpy.einsum('ij,ij->i', values, values)
+		return [x * x + y * y + z * z for x, y, z in batch]
+
+	def _window(self, start, end, rate, scale):
+		# samples start..end (sample numbers, end inclusive) from the history
+		data = array('h')
+		for first, batch in self._history:
+			lo = max(start - first, 0)
+			hi = min(end + 1 - first, len(batch))
+			if lo < hi:
+				data.extend(batch.data[3 * lo:3 * hi])
+		last = self._history[-1][1]
+		timestamp = None
+		if last.timestamp is not None:
+			timestamp = last.timestamp - (self.samples - 1 - end) / rate
+		return SampleBatch(data, timestamp, rate, scale)
+
+	def process(self, batch):
+		"""
+			Looks for free falls and impacts in a batch
+
+			:param batch: the SampleBatch (with its scale, rate and timestamp)
+
+			:return: list of MotionEvent, oldest first
+			:rtype: list
+		"""
+		numpy = _numpy()
+		count = len(batch)
+		if not count:
+			return []
+		scale = batch.scale or 1.0 / 1024
+		if scale != self._scale:
+			self._setScale(scale)
+		rate = batch.rate or 100.0
+		first = self.samples
+		self._history.append((first, batch))
+		self.samples += count
+		magnitude2 = self._magnitude2(batch)
+		if numpy is not None:
+			negated = -magnitude2
+		else:
+			negated = [-value for value in magnitude2]
+
+		events = []
+		minFall = max(int(math.ceil(self.freeFallTime * rate)), 1)
+		for kind, values, threshold, needed in ((self.FREE_FALL, negated, -self._freeFall2, minFall),
+											   (self.IMPACT, magnitude2, self._impact2, 1)):
+			run = self._runs[kind]
+			for start, end in _runsAbove(values, threshold, run is not None):
+				if start < 0:
+					start = 0
+				else:
+					run = [first + start, None, False]
+				stop = end if end is not None else count
+				if stop > start:
+					peak = int(max(values[start:stop]))
+					run[1] = peak if run[1] is None else max(run[1], peak)
+				length = first + stop - run[0]
+				if not run[2] and length >= needed and (end is not None or self.lowLatency):
+					if self.lowLatency:
+						length = needed
+					last = run[0] + length - 1
+					peak = math.sqrt(abs(run[1])) * scale
+					timestamp = None
+					if batch.timestamp is not None:
+						timestamp = batch.timestamp - (first + count - 1 - run[0]) / rate
+					window = self._window(run[0] - int(self.preEventTime * rate), last, rate, scale)
+					events.append(MotionEvent(kind, run[0], timestamp, length / rate, peak, window))
+					run[2] = True
+				if end is not None:
+					run = None
+			self._runs[kind] = run
+
+		# keep preEventTime of samples, and the runs in progress (up to maxWindowTime)
+		keep = self.samples - int(self.preEventTime * rate)
+		for run in self._runs.values():
+			if run is not None:
+				keep = min(keep, run[0] - int(self.preEventTime * rate))
+		keep = max(keep, self.samples - int((self.preEventTime + self.maxWindowTime) * rate))
+		while self._history and self._history[0][0] + len(self._history[0][1]) <= keep:
+			self._history.popleft()
+		events.sort(key=lambda event: event.sampleIndex)
+		return events
+
+#-----------------------------------------------------------------------------
+# Sample stream codec
+#
+# Lossless compression for raw ADXL313 samples (signed 16 bit x, y, z triplets).
+# Samples are encoded in blocks (ideally one block per FIFO batch). Each axis is
+# replaced by its prediction residual (order 1 = delta, order 2 = linear
+# prediction), zig-zag mapped to an unsigned value and bit-packed at the smallest
+# width that fits the block. Every block is prefixed with its length, so blocks
+# can be skipped without decoding them.
+#
+# Block layout:
+#	varint	length of the rest of the block
+#	varint	number of samples in the block
+#	byte	prediction order
+#	3 bytes	bit width of the x, y and z residuals
+#	...		packed x residuals, then y, then z (each padded to a whole byte)
+
+def _zigzag(value):
+	return (value << 1) if value >= 0 else (((-value) << 1) - 1)
+
+def _unzigzag(value):
+	return (value >> 1) if not (value & 1) else -((value + 1) >> 1)
+
+def _writeVarint(out, value):
+	while value > 0x7F:
+		out.append((value & 0x7F) | 0x80)
+		value >>= 7
+	out.append(value)
+
+def _readVarint(data, offset):
+	value = 0
+	shift = 0
+	while True:
+		byte = data[offset]
+		offset += 1
+		value |= (byte & 0x7F) << shift
+		if not (byte & 0x80):
+			return value, offset
+		shift += 7
+
+def _packBits(out, values, width):
+	if width == 0:
+		return
+	acc = 0
+	nbits = 0
+	for value in values:
+		acc |= value << nbits
+		nbits += width
+		while nbits >= 8:
+			out.append(acc & 0xFF)
+			acc >>= 8
+			nbits -= 8
+	if nbits:
+		out.append(acc & 0xFF)
+
+def _unpackBits(data, offset, count, width):
+	if width == 0:
+		return [0] * count, offset
+	values = []
+	mask = (1 << width) - 1
+	acc = 0
+	nbits = 0
+	for _ in range(count):
+		while nbits < width:
+			acc |= data[offset] << nbits
+			offset += 1
+			nbits += 8
+		values.append(acc & mask)
+		acc >>= width
+		nbits -= width
+	return values, offset
+
+def _residuals(values, order):
+	out = []
+	prev1 = 0
+	prev2 = 0
+	for value in values:
+		if order == 2:
+			out.append(_zigzag(value - (2 * prev1 - prev2)))
+		else:
+			out.append(_zigzag(value - prev1))
+		prev2 = prev1
+		prev1 = value
+	return out
+
+def _unresiduals(values, order):
+	out = []
+	prev1 = 0
+	prev2 = 0
+	for value in values:
+		if order == 2:
+			value = _unzigzag(value) + (2 * prev1 - prev2)
+		else:
+			value = _unzigzag(value) + prev1
+		out.append(value)
+		prev2 = prev1
+		prev1 = value
+	return out
+
+def encodeSamples(samples, order=1):
+	"""
+		Losslessly compresses a block of raw samples.
+
+		:param samples: sequence of (x, y, z) raw sample tuples
+		:param order: prediction order, 1 (delta) or 2 (linear prediction)
+
+		:return: the encoded block
+		:rtype: bytes
+	"""
+	if order not in (1, 2):
+		raise ValueError("order must be 1 or 2")
+	body = bytearray()
+	_writeVarint(body, len(samples))
+	body.append(order)
+	axes = [_residuals([sample[axis] for sample in samples], order) for axis in range(3)]
+	widths = [max(values).bit_length() if values else 0 for values in axes]
+	body.extend(widths)
+	for values, width in zip(axes, widths):
+		_packBits(body, values, width)
+
+	block = bytearray()
+	_writeVarint(block, len(body))
+	block.extend(body)
+	return bytes(block)
+
+def decodeSamples(data, offset=0):
+	"""
+		Decodes one block produced by encodeSamples(). Raises ValueError if the
+		block is cut short.
+
+		:param data: buffer holding one or more encoded blocks
+		:param offset: byte offset of the block to decode
+
+		:return: list of (x, y, z) tuples and the offset of the next block
+		:rtype: tuple
+	"""
+	try:
+		length, offset = _readVarint(data, offset)
+	except IndexError:
+		raise ValueError("truncated block header")
+	end = offset + length
+	if end > len(data):
+		raise ValueError("truncated block")
+	count, offset = _readVarint(data, offset)
+	order = data[offset]
+	widths = data[offset + 1:offset + 4]
+	offset += 4
+	axes = []
+	for width in widths:
+		values, offset = _unpackBits(data, offset, count, width)
+		axes.append(_unresiduals(values, order))
+	return list(zip(*axes)), end
+
+class SampleEncoder(object):
+	"""
+	SampleEncoder
+
+		Streaming encoder that writes blocks of samples to a binary stream and
+		keeps an index of where each block starts, for random access.
+
+		:param stream: writable binary file-like object
+		:param blockSize: samples per block (32 matches a full FIFO)
+		:param order: prediction order, 1 (delta) or 2 (linear prediction)
+	"""
+	def __init__(self, stream, blockSize=32, order=1):
+		self.stream = stream
+		self.blockSize = blockSize
+		self.order = order
+		self.index = []		# (index of the first sample, byte offset) of every block
+		self.samplesWritten = 0
+		self.bytesWritten = 0
+		self._pending = []
+
+	def write(self, samples):
+		"""
+			Queues samples, writing out every block that fills up
+
+			:param samples: sequence of (x, y, z) raw sample tuples
+		"""
+		self._pending.extend(samples)
+		while len(self._pending) >= self.blockSize:
+			self._writeBlock(self._pending[:self.blockSize])
+			del self._pending[:self.blockSize]
+
+	def flush(self):
+		"""
+			Writes out any queued samples as a (short) final block
+		"""
+		if self._pending:
+			self._writeBlock(self._pending)
+			self._pending = []
+		self.stream.flush()
+
+	def _writeBlock(self, samples):
+		block = encodeSamples(samples, self.order)
+		self.index.append((self.samplesWritten, self.bytesWritten))
+		self.stream.write(block)
+		self.samplesWritten += len(samples)
+		self.bytesWritten += len(block)
+
+class SampleDecoder(object):
+	"""
+	SampleDecoder
+
+		Decodes a stream written by SampleEncoder. A stream cut short (e.g. by a
+		crash while writing) raises ValueError when its last block is reached.
+
+		:param data: bytes-like object holding the encoded stream
+	"""
+	def __init__(self, data):
+		self.data = data
+
+	def __iter__(self):
+		offset = 0
+		while offset < len(self.data):
+			samples, offset = decodeSamples(self.data, offset)
+			for sample in samples:
+				yield sample
+
+	def buildIndex(self):
+		"""
+			Scans the block headers (without decoding) to build a block index
+
+			:return: list of (index of the first sample, byte offset) per block
+			:rtype: list
+		"""
+		index = []
+		offset = 0
+		sampleIndex = 0
+		while offset < len(self.data):
+			try:
+				length, bodyOffset = _readVarint(self.data, offset)
+				count, _ = _readVarint(self.data, bodyOffset)
+			except IndexError:
+				raise ValueError("truncated block header")
+			if bodyOffset + length > len(self.data):
+				raise ValueError("truncated block")
+			index.append((sampleIndex, offset))
+			sampleIndex += count
+			offset = bodyOffset + length
+		return index
+
+	def getSample(self, sampleIndex, index=None):
+		"""
+			Random access to a single sample, decoding only the block holding it
+
+			:param sampleIndex: index of the sample in the stream
+			:param index: block index (from SampleEncoder.index or buildIndex())
+
+			:return: the (x, y, z) sample
+			:rtype: tuple
+		"""
+		if sampleIndex < 0:
+			raise IndexError("sample index out of range")
+		if index is None:
+			index = self.buildIndex()
+		if not index:
+			raise IndexError("sample index out of range")
+		lo = 0
+		hi = len(index)
+		while hi - lo > 1:
+			mid = (lo + hi) // 2
+			if index[mid][0] <= sampleIndex:
+				lo = mid
+			else:
+				hi = mid
+		first, offset = index[lo]
+		samples, _ = decodeSamples(self.data, offset)
+		return samples[sampleIndex - first]
+
+#-----------------------------------------------------------------------------
+# Recorder
+#
+# Segment files hold a sequence of records, one per SampleBatch:
+#	4 bytes		magic, b'AXL1'
+#	uint32		number of samples
+#	double		timestamp (time.time()) of the last sample
+#	float		output data rate (Hz)
+#	float		scale (g per LSB)
+#	...			samples, int16 x, y, z little endian
+# Segments are named adxl313-<sequence>-<timestamp of the first sample, us>.seg
+
+_RECORD_MAGIC = b'AXL1'
+_RECORD_HEADER = struct.Struct('<4sIdff')
+_SEGMENT_NAME = "adxl313-%08d-%016d.seg"
+
+def _packRecord(batch):
+	data = batch.data
+	if sys.byteorder == 'big':
+		data = array('h', data)
+		data.byteswap()
+	return _RECORD_HEADER.pack(_RECORD_MAGIC, len(batch), batch.timestamp or 0.0, batch.rate or 0.0,
+							   batch.scale or 0.0) + data.tobytes()
+
+class SampleRecorder(object):
+	"""
+	SampleRecorder
+
+		Records sample batches to a directory of fixed size segment files, from a
+		background thread. record() only queues the batch, and never blocks: when
+		the queue is full the batch is dropped (and counted), so a slow disk never
+		delays the acquisition loop. Old segments are deleted to keep the recording
+		within a total disk budget.
+
+		:param directory: directory for the segment files (created if needed)
+		:param segmentBytes: size at which a new segment is started
+		:param maxBytes: total size of all segments, oldest segments are deleted above it
+		:param fsync: when to fsync: 'never', 'segment' (when a segment is closed),
+						'batch' (after every batch) or a number of seconds between fsyncs
+		:param queueSize: batches that can wait for the writer
+	"""
+	def __init__(self, directory, segmentBytes=4 << 20, maxBytes=256 << 20, fsync='segment', queueSize=256):
+		self.directory = directory
+		self.segmentBytes = segmentBytes
+		self.maxBytes = maxBytes
+		self.fsync = fsync
+		if not os.path.isdir(directory):
+			os.makedirs(directory)
+		self._queue = queue.Queue(queueSize)
+		self._segments = sorted(name for name in os.listdir(directory) if name.startswith("adxl313-") and name.endswith(".seg"))
+		self._sequence = int(self._segments[-1].split('-')[1]) + 1 if self._segments else 0
+		self._file = None
+		self._fileBytes = 0
+		self._lastFsync = time.monotonic()
+		self.batchesWritten = 0
+		self.bytesWritten = 0
+		self.batchesDropped = 0
+		self.segmentsDeleted = 0
+		self.lag = 0.0
+		self.maxLag = 0.0
+		self.error = None
+		self._thread = threading.Thread(target=self._run, name="SampleRecorder")
+		self._thread.daemon = True
+		self._thread.start()
+
+	def record(self, batch):
+		"""
+			Queues a batch for writing, without blocking
+
+			:param batch: the SampleBatch
+
+			:return: True if queued, False if the queue was full and the batch dropped
+			:rtype: bool
+		"""
+		try:
+			self._queue.put_nowait(batch)
+			return True
+		except queue.Full:
+			self.batchesDropped += 1
+			return False
+
+	def close(self):
+		"""
+			Writes everything queued, closes the current segment and stops the writer thread
+		"""
+		self._queue.put(None)
+		self._thread.join()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def stats(self):
+		"""
+			:return: dictionary with 'queued', 'batchesWritten', 'bytesWritten', 'batchesDropped',
+					 'segments', 'segmentsDeleted', 'lag' and 'maxLag' (seconds between the last
+					 sample of a batch and its write)
+			:rtype: dict
+		"""
+		return {'queued': self._queue.qsize(), 'batchesWritten': self.batchesWritten,
+				'bytesWritten': self.bytesWritten, 'batchesDropped': self.batchesDropped,
+				'segments': len(self._segments), 'segmentsDeleted': self.segmentsDeleted,
+				'lag': self.lag, 'maxLag': self.maxLag}
+
+	def _run(self):
+		while True:
+			batch = self._queue.get()
+			if batch is None:
+				break
+			try:
+				self._write(batch)
+			except (IOError, OSError) as error:
+				self.error = error
+				self.batchesDropped += 1
+		if self._file is not None:
+			self._closeSegment()
+
+	def _write(self, batch):
+		if self._file is None or self._fileBytes >= self.segmentBytes:
+			if self._file is not None:
+				self._closeSegment()
+			self._openSegment(batch)
+		record = _packRecord(batch)
+		self._file.write(record)
+		self._fileBytes += len(record)
+		self.bytesWritten += len(record)
+		self.batchesWritten += 1
+		if self.fsync == 'batch':
+			self._sync()
+		elif not isinstance(self.fsync, str) and time.monotonic() - self._lastFsync >= self.fsync:
+			self._sync()
+		if batch.timestamp:
+			self.lag = time.time() - batch.timestamp
+			self.maxLag = max(self.maxLag, self.lag)
+
+	def _sync(self):
+		self._file.flush()
+		os.fsync(self._file.fileno())
+		self._lastFsync = time.monotonic()
+
+	def _openSegment(self, batch):
+		first = batch.sampleTime(0) if batch.timestamp and batch.rate else time.time()
+		name = _SEGMENT_NAME % (self._sequence, int(first * 1e6))
+		self._sequence += 1
+		self._file = open(os.path.join(self.directory, name), 'wb')
+		self._fileBytes = 0
+		self._segments.append(name)
+		self._prune()
+
+	def _closeSegment(self):
+		if self.fsync != 'never':
+			self._sync()
+		self._file.close()
+		self._file = None
+
+	def _prune(self):
+		sizes = []
+		for name in self._segments[:-1]:
+			try:
+				sizes.append(os.path.getsize(os.path.join(self.directory, name)))
+			except OSError:
+				sizes.append(0)
+		total = sum(sizes)
+		# the budget includes room for the segment just started
+		while self._segments[:-1] and total + self.segmentBytes > self.maxBytes:
+			name = self._segments.pop(0)
+			total -= sizes.pop(0)
+			try:
+				os.remove(os.path.join(self.directory, name))
+			except OSError:
+				pass
+			self.segmentsDeleted += 1
+
+class RecordingReader(object):
+	"""
+	RecordingReader
+
+		Reads a SampleRecorder directory lazily. Segment names give the time of
+		their first sample, so seeking to a time only opens one segment, and within
+		it only the record headers are read until the time is reached. Memory use is
+		bounded by the chunk size, however long the recording.
+
+		:param directory: the SampleRecorder directory
+	"""
+	def __init__(self, directory):
+		self.directory = directory
+		self.segments = sorted(name for name in os.listdir(directory) if name.startswith("adxl313-") and name.endswith(".seg"))
+		self._segmentTimes = [int(name[:-4].split('-')[2]) / 1e6 for name in self.segments]
+
+	def _headers(self, file, segment):
+		# (count, timestamp, rate, scale) of each complete record, leaving the file
+		# at the record's data; data not read by the caller is skipped
+		size = os.fstat(file.fileno()).st_size
+		offset = 0
+		while offset + _RECORD_HEADER.size <= size:
+			file.seek(offset)
+			magic, count, timestamp, rate, scale = _RECORD_HEADER.unpack(file.read(_RECORD_HEADER.size))
+			if magic != _RECORD_MAGIC:
+				raise ValueError("%s: bad record at offset %d" % (segment, offset))
+			offset += _RECORD_HEADER.size + 6 * count
+			if offset > size:
+				return	# still being written
+			yield count, timestamp, rate, scale
+
+	def _records(self, segment, start=None):
+		# complete records of a segment; the data of records ending before start is not read
+		with open(os.path.join(self.directory, segment), 'rb') as file:
+			for count, timestamp, rate, scale in self._headers(file, segment):
+				if start is None or timestamp >= start:
+					yield count, timestamp, rate, scale, file.read(6 * count)
+
+	def timeRange(self):
+		"""
+			:return: (time of the first sample, time of the last sample), or None if empty
+			:rtype: tuple
+		"""
+		for segment in reversed(self.segments):
+			last = None
+			with open(os.path.join(self.directory, segment), 'rb') as file:
+				for count, timestamp, rate, scale in self._headers(file, segment):
+					last = timestamp
+			if last is not None:
+				return (self._segmentTimes[0], last)
+		return None
+
+	def batches(self, start=None, end=None):
+		"""
+			Iterates the recorded batches, trimmed to a time range
+
+			:param start: time (time.time()) of the first sample wanted, None for the beginning
+			:param end: time after the last sample wanted, None for the end
+
+			:return: iterator of SampleBatch
+		"""
+		first = 0
+		if start is not None:
+			first = max(bisect.bisect_right(self._segmentTimes, start) - 1, 0)
+		for index in range(first, len(self.segments)):
+			if end is not None and self._segmentTimes[index] >= end:
+				return
+			for count, timestamp, rate, scale, data in self._records(self.segments[index], start):
+				batch = SampleBatch.fromBytes(data, timestamp, rate, scale)
+				if (start is not None or end is not None) and rate:
+					# sample i is at timestamp - (count - 1 - i) / rate
+					lo = 0 if start is None else max(0, int(math.ceil(count - 1 - (timestamp - start) * rate - 1e-9)))
+					hi = count if end is None else min(count, int(math.ceil(count - 1 - (timestamp - end) * rate - 1e-9)))
+					if hi <= lo:
+						if end is not None and hi <= 0:
+							return
+						continue
+					if lo > 0 or hi < count:
+						batch = SampleBatch(batch.data[3 * lo:3 * hi], batch.sampleTime(hi - 1), rate, scale)
+				yield batch
+
+	def chunks(self, chunkSize=1 << 16, start=None, end=None, scaled=True, dataframe=False):
+		"""
+			Iterates the recording in chunks of chunkSize samples (the last one may be
+			shorter). Needs numpy (and pandas for dataframe=True).
+
+			:param chunkSize: samples per chunk
+			:param start: time (time.time()) of the first sample wanted, None for the beginning
+			:param end: time after the last sample wanted, None for the end
+			:param scaled: apply the scale (float32 g), or keep the raw int16 counts
+			:param dataframe: yield pandas DataFrames with timestamp, x, y and z columns
+
+			:return: iterator of (timestamps, samples) tuples, float64 time.time() values and
+					 an (n, 3) array; or of DataFrames
+		"""
+		numpy = _numpy()
+		if numpy is None:
+			raise ImportError("RecordingReader.chunks() needs numpy")
+		if dataframe:
+			import pandas
+		dtype = numpy.float32 if scaled else numpy.int16
+		def newChunk():
+			return numpy.empty(chunkSize, numpy.float64), numpy.empty((chunkSize, 3), dtype)
+		def output(timestamps, samples):
+			if not dataframe:
+				return timestamps, samples
+			return pandas.DataFrame({'timestamp': timestamps, 'x': samples[:, 0], 'y': samples[:, 1], 'z': samples[:, 2]})
+		timestamps, samples = newChunk()
+		filled = 0
+		for batch in self.batches(start, end):
+			values = numpy.frombuffer(batch.data, numpy.int16).reshape(-1, 3)
+			count = len(values)
+			if batch.rate:
+				times = batch.timestamp - (count - 1 - numpy.arange(count)) / batch.rate
+			else:
+				times = numpy.full(count, batch.timestamp)
+			used = 0
+			while used < count:
+				take = min(count - used, chunkSize - filled)
+				timestamps[filled:filled + take] = times[used:used + take]
+				if scaled:
+					numpy.multiply(values[used:used + take], batch.scale, out=samples[filled:filled + take], casting='unsafe')
+				else:
+					samples[filled:filled + take] = values[used:used + take]
+				filled += take
+				used += take
+				if filled == chunkSize:
+					yield output(timestamps, samples)
+					timestamps, samples = newChunk()
+					filled = 0
+		if filled:
+			yield output(timestamps[:filled], samples[:filled])
+
+#-----------------------------------------------------------------------------
+# Sinks
+
+class SampleSink(object):
+	"""
+	SampleSink
+
+		Delivers sample batches to a consumer function from its own thread, through
+		its own bounded queue, so a slow consumer never slows down acquisition or the
+		other sinks of a SampleFanout. What happens when the queue is full is set by
+		the backpressure policy:
+		DROP_OLDEST discards the oldest queued batch, DROP_NEWEST discards the new
+		batch, and BLOCK waits up to timeout for room, then discards the new batch.
+
+		:param consumer: function called with a list of up to batchSize SampleBatch objects
+		:param maxBatches: queue length
+		:param policy: DROP_OLDEST, DROP_NEWEST or BLOCK
+		:param timeout: seconds BLOCK waits for room
+		:param batchSize: most batches handed to the consumer per call
+		:param name: name for the sink (and its thread), defaults to the consumer's
+			__name__ with a number appended, e.g. '<lambda>-3'
+	"""
+	DROP_OLDEST = 'drop-oldest'
+	DROP_NEWEST = 'drop-newest'
+	BLOCK = 'block'
+
+	_sinkNumbers = itertools.count(1)
+
+	def __init__(self, consumer, maxBatches=64, policy=DROP_OLDEST, timeout=0.1, batchSize=1, name=None):
+		if policy not in (self.DROP_OLDEST, self.DROP_NEWEST, self.BLOCK):
+			raise ValueError("unknown policy %r" % policy)
+		self.consumer = consumer
+		self.maxBatches = maxBatches
+		self.policy = policy
+		self.timeout = timeout
+		self.batchSize = batchSize
+		if not name:
+			name = '%s-%d' % (getattr(consumer, '__name__', 'SampleSink'), next(self._sinkNumbers))
+		self.name = name
+		self._queue = collections.deque()
+		self._cond = threading.Condition()
+		self._closed = False
+		self.batchesIn = 0
+		self.batchesDelivered = 0
+		self.samplesDelivered = 0
+		self.batchesDropped = 0
+		self.errors = 0
+		self._startTime = time.monotonic()
+		self._thread = threading.Thread(target=self._run, name=self.name)
+		self._thread.daemon = True
+		self._thread.start()
+
+	def offer(self, batch):
+		"""
+			Queues a batch for the consumer, applying the backpressure policy.
+			Batches offered after close() are dropped.
+
+			:param batch: the SampleBatch
+
+			:return: True if the batch was queued
+			:rtype: bool
+		"""
+		with self._cond:
+			self.batchesIn += 1
+			if self._closed:
+				self.batchesDropped += 1
+				return False
+			if len(self._queue) >= self.maxBatches:
+				if self.policy == self.DROP_OLDEST:
+					self._queue.popleft()
+					self.batchesDropped += 1
+				elif self.policy == self.DROP_NEWEST:
+					self.batchesDropped += 1
+					return False
+				else:
+					deadline = time.monotonic() + self.timeout
+					while len(self._queue) >= self.maxBatches and not self._closed:
+						remaining = deadline - time.monotonic()
+						if remaining <= 0:
+							break
+						self._cond.wait(remaining)
+					if len(self._queue) >= self.maxBatches or self._closed:
+						self.batchesDropped += 1
+						return False
+			self._queue.append(batch)
+			self._cond.notify_all()
+			return True
+
+	def close(self):
+		"""
+			Delivers everything queued, then stops the sink thread
+		"""
+		with self._cond:
+			self._closed = True
+			self._cond.notify_all()
+		self._thread.join()
+
+	def stats(self):
+		"""
+			:return: dictionary with 'queued', 'batchesIn', 'batchesDelivered', 'samplesDelivered',
+					 'batchesDropped', 'errors' and 'throughput' (samples per second delivered)
+			:rtype: dict
+		"""
+		elapsed = max(time.monotonic() - self._startTime, 1e-9)
+		return {'queued': len(self._queue), 'batchesIn': self.batchesIn,
+				'batchesDelivered': self.batchesDelivered, 'samplesDelivered': self.samplesDelivered,
+				'batchesDropped': self.batchesDropped, 'errors': self.errors,
+				'throughput': self.samplesDelivered / elapsed}
+
+	def _run(self):
+		while True:
+			with self._cond:
+				while not self._queue and not self._closed:
+					self._cond.wait()
+				if not self._queue:
+					return
+				batches = [self._queue.popleft() for _ in range(min(self.batchSize, len(self._queue)))]
+				self._cond.notify_all()
+			try:
+				self.consumer(batches)
+			except Exception:
+				self.errors += 1
+			self.batchesDelivered += len(batches)
+			self.samplesDelivered += sum(len(batch) for batch in batches)
+
+class SampleFanout(object):
+	"""
+	SampleFanout
+
+		Hands every published batch to a set of SampleSink objects.
+
+		:param sinks: the sinks
+	"""
+	def __init__(self, sinks=()):
+		self.sinks = list(sinks)
+
+	def add(self, sink):
+		"""
+			Adds a sink, and returns it
+		"""
+		self.sinks.append(sink)
+		return sink
+
+	def publish(self, batch):
+		"""
+			Offers a batch to every sink (only BLOCK sinks can make this wait, up to their timeout)
+
+			:param batch: the SampleBatch
+		"""
+		for sink in self.sinks:
+			sink.offer(batch)
+
+	def close(self):
+		"""
+			Closes every sink
+		"""
+		for sink in self.sinks:
+			sink.close()
+
+	def stats(self):
+		"""
+			:return: dictionary of sink name to its stats(); sinks sharing a name
+					 get '#2', '#3', ... appended
+			:rtype: dict
+		"""
+		stats = {}
+		for sink in self.sinks:
+			name = sink.name
+			number = 1
+			while name in stats:
+				number += 1
+				name = '%s#%d' % (sink.name, number)
+			stats[name] = sink.stats()
+		return stats
+
+#-----------------------------------------------------------------------------
+# Metrics
+#
+# Collected here, on the read path; rendered and served in the Prometheus text
+# format by qwiic_adxl313_metrics.
+
+class AcquisitionMetrics(object):
+	"""
+	AcquisitionMetrics
+
+		Metrics of one QwiicAdxl313 (see QwiicAdxl313.enableMetrics()). The read
+		path only updates a few counters and histogram buckets; everything else is
+		read from the driver when the metrics are rendered (see
+		qwiic_adxl313_metrics.renderMetrics()). Rendering keeps no state: counts
+		are exported as monotonic _total counters, so any number of scrapers can
+		read them and derive rates with PromQL rate().
+
+		A full FIFO at drain time is the only overrun evidence readFifo() has (it
+		does not read INT_SOURCE), so it is exported as full drains, not overruns.
+
+		:param device: the QwiicAdxl313
+		:param latencyBuckets: upper bounds (seconds) of the drain latency histogram
+		:param transactionBuckets: upper bounds (seconds) of the bus transaction latency histogram
+	"""
+	LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+	TRANSACTION_BUCKETS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01)
+	FILL_BUCKETS = (1, 4, 8, 16, 24, 31, 32)
+
+	def __init__(self, device, latencyBuckets=LATENCY_BUCKETS, transactionBuckets=TRANSACTION_BUCKETS):
+		self.device = device
+		self.latencyBuckets = tuple(latencyBuckets)
+		self.transactionBuckets = tuple(transactionBuckets)
+		self.drains = 0
+		self.samples = 0
+		self.fullDrains = 0
+		self.latencySum = 0.0
+		self.transactions = 0
+		self.transactionLatencySum = 0.0
+		self._latencyCounts = [0] * (len(self.latencyBuckets) + 1)
+		self._transactionCounts = [0] * (len(self.transactionBuckets) + 1)
+		self._fillCounts = [0] * (len(self.FILL_BUCKETS) + 1)
+
+	def observeDrain(self, entries, latency):
+		"""
+			Records one FIFO drain
+
+			:param entries: FIFO entries read
+			:param latency: seconds spent on the bus
+		"""
+		self.drains += 1
+		self.samples += entries
+		self.latencySum += latency
+		if entries >= QwiicAdxl313.ADXL313_FIFO_SIZE:
+			# a full FIFO in stream mode has probably dropped samples
+			self.fullDrains += 1
+		self._latencyCounts[bisect.bisect_left(self.latencyBuckets, latency)] += 1
+		self._fillCounts[bisect.bisect_left(self.FILL_BUCKETS, entries)] += 1
+
+	def observeTransaction(self, latency):
+		"""
+			Records one bus call (a register access, or a batched FIFO read)
+
+			:param latency: seconds the call took
+		"""
+		self.transactions += 1
+		self.transactionLatencySum += latency
+		self._transactionCounts[bisect.bisect_left(self.transactionBuckets, latency)] += 1
+
+	@staticmethod
+	def _histogram(labels, bounds, counts, total):
+		samples = []
+		cumulative = 0
+		for bound, count in zip(bounds, counts):
+			cumulative += count
+			samples.append(('_bucket', '%s,le="%s"' % (labels, bound), cumulative))
+		cumulative += counts[-1]
+		samples.append(('_bucket', '%s,le="+Inf"' % labels, cumulative))
+		samples.append(('_sum', labels, total))
+		samples.append(('_count', labels, cumulative))
+		return samples
+
+	def families(self):
+		"""
+			Reads the metrics
+
+			:return: (name, type, help, samples) for each metric family, samples being
+					 (name suffix, labels, value) tuples
+			:rtype: list
+		"""
+		device = self.device
+		labels = 'address="0x%.2X"' % device.address
+		def single(name, kind, help, value):
+			return (name, kind, help, [('', labels, value)])
+		return [
+			single('adxl313_samples_total', 'counter', "Samples read from the FIFO.", self.samples),
+			single('adxl313_output_data_rate_hz', 'gauge', "Configured output data rate.",
+				   device.getConfiguredDataRate()),
+			single('adxl313_fifo_drains_total', 'counter', "FIFO drains (readFifo() calls).", self.drains),
+			single('adxl313_fifo_full_drains_total', 'counter',
+				   "FIFO drains that found the FIFO full (samples were probably lost before them).",
+				   self.fullDrains),
+			single('adxl313_i2c_transactions_total', 'counter', "Bus transactions.", device.busTransactions),
+			single('adxl313_i2c_bytes_total', 'counter', "Bytes read or written on the bus.", device.busBytes),
+			single('adxl313_i2c_errors_total', 'counter', "Failed bus transactions.", device.i2cErrors),
+			single('adxl313_asleep', 'gauge', "1 while the sensor is believed to be autosleeping.",
+				   int(device.asleep)),
+			('adxl313_power_state', 'gauge', "Power state, from the configuration written.",
+			 [('', '%s,state="%s"' % (labels, state), int(device.getPowerState() == state))
+			  for state in ('standby', 'measure', 'lowpower', 'autosleep')]),
+			('adxl313_fifo_fill_entries', 'histogram', "FIFO entries found at each drain.",
+			 self._histogram(labels, self.FILL_BUCKETS, self._fillCounts, self.samples)),
+			('adxl313_drain_latency_seconds', 'histogram', "Time spent on the bus per FIFO drain.",
+			 self._histogram(labels, self.latencyBuckets, self._latencyCounts, self.latencySum)),
+			('adxl313_i2c_transaction_latency_seconds', 'histogram',
+			 "Time per bus call (one register access, or one batched FIFO read).",
+			 self._histogram(labels, self.transactionBuckets, self._transactionCounts, self.transactionLatencySum)),
+		]
+
+#-----------------------------------------------------------------------------
+# Simulated device
+
+class QwiicAdxl313Simulator(object):
+	"""
+	QwiicAdxl313Simulator
+
+		Simulated ADXL313 with the same interface as the I2C drivers, for dry runs
+		without hardware: QwiicAdxl313(i2c_driver=QwiicAdxl313Simulator()).
+		Samples (gravity on z plus a sine vibration on x and y) are produced in real
+		time at the configured output data rate, and the FIFO, its modes, the
+		watermark, overrun and data ready sources behave as on the real sensor.
+		Activity detection (DC or AC coupled, THRESH_ACT and ACT_INACT_CTL axes) sets
+		the activity source and fires the FIFO trigger when the activity interrupt is
+		mapped to the trigger pin; bump() makes the samples move enough to cause one.
+
+			:param vibration: vibration amplitude in g
+			:param frequency: vibration frequency in Hz
+	"""
+	def __init__(self, vibration=0.25, frequency=5.0):
+		self.vibration = vibration
+		self.frequency = frequency
+		self.regs = bytearray(0x40)
+		self.regs[QwiicAdxl313.ADXL313_DEVID_0] = QwiicAdxl313.ADXL313_DEVID_0_RSP_EXPECTED
+		self.regs[QwiicAdxl313.ADXL313_DEVID_1] = QwiicAdxl313.ADXL313_DEVID_1_RSP_EXPECTED
+		self.regs[QwiicAdxl313.ADXL313_PARTID] = QwiicAdxl313.ADXL313_PARTID_RSP_EXPECTED
+		self.regs[QwiicAdxl313.ADXL313_BW_RATE] = QwiicAdxl313.ADXL313_BW_RATE_RESET
+		self._fifo = []
+		self._current = (0, 0, 0)
+		self._produced = 0
+		self._dataReady = False
+		self._overrun = False
+		self._triggered = False
+		self._activity = False
+		self._activityReference = None		# AC coupled activity reference (g), taken at the first sample
+		self._bump = (0.0, 0)				# (g, samples) added by bump()
+		self._lastTime = time.monotonic()
+		self._phase = 0.0
+
+	ACTIVITY_SCALE = 0.0625		# g/LSB of THRESH_ACT, as documented for setActivityThreshold()
+
+	def bump(self, magnitude=2.0, samples=4):
+		"""
+			Adds magnitude (g) to every axis of the next samples samples, e.g. to cause
+			an activity event
+
+			:param magnitude: acceleration added, in g
+			:param samples: number of samples affected
+		"""
+		self._advance()
+		self._bump = (magnitude, samples)
+
+	def _rate(self):
+		return 6.25 * (2 ** ((self.regs[QwiicAdxl313.ADXL313_BW_RATE] & 0x0F) - QwiicAdxl313.ADXL313_BW_3_125))
+
+	def _sample(self):
+		dataFormat = self.regs[QwiicAdxl313.ADXL313_DATA_FORMAT]
+		if (dataFormat >> QwiicAdxl313.ADXL313_FULL_RES_BIT) & 1:
+			lsbPerG = 1024
+		else:
+			lsbPerG = 1024 >> (dataFormat & 0b00000011)
+		limit = 512 * lsbPerG * (1 << (dataFormat & 0b00000011)) // 1024 - 1
+		self._phase += 2 * math.pi * self.frequency / self._rate()
+		values = (self.vibration * math.sin(self._phase), self.vibration * math.cos(self._phase), 1.0)
+		magnitude, remaining = self._bump
+		if remaining > 0:
+			values = tuple(value + magnitude for value in values)
+			self._bump = (magnitude, remaining - 1)
+		sample = tuple(max(-limit - 1, min(limit, int(round(value * lsbPerG)))) for value in values)
+		self._detectActivity(tuple(value / float(lsbPerG) for value in sample))
+		return sample
+
+	def _detectActivity(self, values):
+		if not (self.regs[QwiicAdxl313.ADXL313_INT_ENABLE] >> QwiicAdxl313.ADXL313_INT_ACTIVITY_BIT) & 1:
+			self._activityReference = None
+			return
+		control = self.regs[QwiicAdxl313.ADXL313_ACT_INACT_CTL]
+		if (control >> 7) & 1:
+			if self._activityReference is None:
+				self._activityReference = values
+				return
+			values = tuple(value - reference for value, reference in zip(values, self._activityReference))
+		threshold = self.regs[QwiicAdxl313.ADXL313_THRESH_ACT] * self.ACTIVITY_SCALE
+		if threshold <= 0:
+			return
+		# ACT_INACT_CTL bits 6, 5, 4 enable x, y, z
+		if any((control >> (6 - axis)) & 1 and abs(value) > threshold for axis, value in enumerate(values)):
+			if not self._activity:
+				self._activity = True
+				self._fireTrigger(QwiicAdxl313.ADXL313_INT_ACTIVITY_BIT)
+
+	def _fireTrigger(self, sourceBit):
+		# trigger mode: an event on the trigger pin keeps the newest samples-bits entries
+		fifoCtl = self.regs[QwiicAdxl313.ADXL313_FIFO_CTL]
+		pin = (self.regs[QwiicAdxl313.ADXL313_INT_MAP] >> sourceBit) & 1
+		if (fifoCtl >> 6) != QwiicAdxl313.ADXL313_FIFO_MODE_TRIGGER or self._triggered \
+				or pin != (fifoCtl >> QwiicAdxl313.ADXL313_FIFO_TRIGGER_BIT) & 1:
+			return
+		self._triggered = True
+		keep = fifoCtl & 0b00011111
+		self._fifo = self._fifo[len(self._fifo) - keep:] if keep else []
+
+	def _advance(self):
+		now = time.monotonic()
+		if not (self.regs[QwiicAdxl313.ADXL313_POWER_CTL] >> QwiicAdxl313.ADXL313_MEASURE_BIT) & 1:
+			self._lastTime = now
+			return
+		period = 1.0 / self._rate()
+		count = int((now - self._lastTime) / period)
+		if count <= 0:
+			return
+		self._lastTime += count * period
+		fifoCtl = self.regs[QwiicAdxl313.ADXL313_FIFO_CTL]
+		mode = fifoCtl >> 6
+		# only the newest samples can matter, the FIFO holds 32 (+1 in the data registers)
+		for _ in range(min(count, 64)):
+			sample = self._sample()
+			self._produced += 1
+			self._dataReady = True
+			if mode == QwiicAdxl313.ADXL313_FIFO_MODE_BYPASS:
+				self._current = sample
+			elif len(self._fifo) < QwiicAdxl313.ADXL313_FIFO_SIZE:
+				self._fifo.append(sample)
+			elif mode == QwiicAdxl313.ADXL313_FIFO_MODE_STREAM or \
+					(mode == QwiicAdxl313.ADXL313_FIFO_MODE_TRIGGER and not self._triggered):
+				self._fifo.pop(0)
+				self._fifo.append(sample)
+				self._overrun = True
+			else:
+				self._overrun = True
+		if count > 64:
+			self._overrun = True
+
+	def isDeviceConnected(self, address):
+		return True
+
+	def readByte(self, address, commandCode):
+		self._advance()
+		if commandCode == QwiicAdxl313.ADXL313_FIFO_STATUS:
+			return (self._triggered << QwiicAdxl313.ADXL313_FIFO_TRIG_BIT) | len(self._fifo)
+		if commandCode == QwiicAdxl313.ADXL313_INT_SOURCE:
+			watermark = self.regs[QwiicAdxl313.ADXL313_FIFO_CTL] & 0b00011111
+			source = 0
+			if self._dataReady:
+				source |= 1 << QwiicAdxl313.ADXL313_INT_DATA_READY_BIT
+			if self._fifo and len(self._fifo) >= watermark:
+				source |= 1 << QwiicAdxl313.ADXL313_INT_WATERMARK_BIT
+			if self._overrun:
+				source |= 1 << QwiicAdxl313.ADXL313_INT_OVERRUN_BIT
+			if self._activity:
+				source |= 1 << QwiicAdxl313.ADXL313_INT_ACTIVITY_BIT
+				self._activity = False		# cleared by reading INT_SOURCE
+			return source
+		return self.regs[commandCode]
+
+	def writeByte(self, address, commandCode, value):
+		self._advance()
+		self.regs[commandCode] = value & 0xFF
+		if commandCode == QwiicAdxl313.ADXL313_FIFO_CTL and (value >> 6) == QwiicAdxl313.ADXL313_FIFO_MODE_BYPASS:
+			self._fifo = []
+			self._overrun = False
+			self._triggered = False
+		if commandCode == QwiicAdxl313.ADXL313_POWER_CTL:
+			self._lastTime = time.monotonic()
+
+	def readBlock(self, address, commandCode, nBytes):
+		self._advance()
+		out = []
+		for register in range(commandCode, commandCode + nBytes):
+			if register == QwiicAdxl313.ADXL313_DATA_X0:
+				if self._fifo:
+					self._current = self._fifo.pop(0)
+					self._overrun = False
+				self._dataReady = bool(self._fifo)
+			if QwiicAdxl313.ADXL313_DATA_X0 <= register <= QwiicAdxl313.ADXL313_DATA_Z1:
+				value = self._current[(register - QwiicAdxl313.ADXL313_DATA_X0) // 2]
+				out.append(((value & 0xFFFF) >> (8 * ((register - QwiicAdxl313.ADXL313_DATA_X0) % 2))) & 0xFF)
+			else:
+				out.append(self.readByte(address, register))
+		return out
+
+if __name__ == '__main__':
+	# python -m qwiic_adxl313 runs the command line tool (qwiic_adxl313_cli). Register
+	# this module under its own name first, so the tool's import of qwiic_adxl313
+	# reuses it instead of loading a second copy with distinct classes.
+	sys.modules.setdefault('qwiic_adxl313', sys.modules[__name__])
+	from qwiic_adxl313_cli import main
+	sys.exit(main())
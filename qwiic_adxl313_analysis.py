@@ -0,0 +1,164 @@
+#-----------------------------------------------------------------------------
+# qwiic_adxl313_analysis.py
+#
+# Parallel offline analysis of qwiic_adxl313 SampleRecorder recordings.
+#
+# https://www.sparkfun.com/products/17241
+#
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2020
+# 
+# This python library supports the SparkFun Electroncis qwiic 
+# qwiic sensor/board ecosystem 
+#
+# More information on qwiic is at https:# www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2020 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+
+"""
+qwiic_adxl313_analysis
+======================
+Runs analysis functions over SampleRecorder recordings on a process pool (needs NumPy).
+"""
+#-----------------------------------------------------------------------------
+
+import concurrent.futures
+import importlib.util
+import math
+import os
+import pickle
+
+from qwiic_adxl313 import RecordingReader
+
+def _analyzeChunk(directory, function, start, end, overlap, scaled):
+	# process pool worker: one chunk of a recording, with overlap seconds of context before it
+	import numpy
+	timestamps = []
+	samples = []
+	for chunkTimes, chunkSamples in RecordingReader(directory).chunks(1 << 16, start - overlap, end, scaled):
+		timestamps.append(chunkTimes)
+		samples.append(chunkSamples)
+	if timestamps:
+		timestamps = numpy.concatenate(timestamps)
+		samples = numpy.concatenate(samples)
+	else:
+		timestamps = numpy.empty(0, numpy.float64)
+		samples = numpy.empty((0, 3), numpy.float32 if scaled else numpy.int16)
+	return start, function(timestamps, samples, start, end)
+
+def analyzeRecording(directory, function, chunkDuration=60.0, overlap=0.0, workers=None, progress=None,
+					 checkpoint=None, scaled=True):
+	"""
+		Runs an analysis over a SampleRecorder recording in parallel, one chunk of
+		time per task on a process pool, and returns the results in time order
+		whatever order the chunks finish in.
+
+		Chunks are aligned to multiples of chunkDuration, so they stay the same when
+		a recording grows. Each chunk also gets the overlap seconds before it, for
+		windowed operations (filters, spectra); function should only report results
+		for times in [start, end) so nothing is counted twice.
+
+		:param directory: the SampleRecorder directory
+		:param function: function(timestamps, samples, start, end) returning a picklable
+						 result; it must be defined at module level (it is sent to the workers)
+		:param chunkDuration: seconds per chunk
+		:param overlap: seconds of context before each chunk
+		:param workers: worker processes (default: one per CPU)
+		:param progress: function(done, total) called as chunks complete
+		:param checkpoint: file to keep completed results in, by chunk start time; a
+						   run with the same file skips the chunks it already holds, except
+						   the chunk that was the last one of the checkpointed run (it may
+						   have grown since). Results for chunks whose segments have been
+						   deleted since are left out.
+		:param scaled: samples in g (float32) rather than raw int16 counts
+
+		:return: list of (chunk start time, result), oldest first
+		:rtype: list
+	"""
+	if importlib.util.find_spec('numpy') is None:
+		raise ImportError("analyzeRecording() needs numpy")
+	timeRange = RecordingReader(directory).timeRange()
+	if timeRange is None:
+		return []
+	first = int(math.floor(timeRange[0] / chunkDuration))
+	last = int(math.floor(timeRange[1] / chunkDuration))
+	starts = [index * chunkDuration for index in range(first, last + 1)]
+
+	# checkpoint file: (key, start of the last chunk), then one (chunk start, result) record per chunk
+	results = {}
+	key = (os.path.abspath(directory), getattr(function, '__module__', None), getattr(function, '__qualname__', None),
+		   chunkDuration, overlap, scaled)
+	checkpointFile = None
+	if checkpoint is not None:
+		if os.path.exists(checkpoint):
+			lastStart = None
+			with open(checkpoint, 'rb') as file:
+				try:
+					header = pickle.load(file)
+					if not isinstance(header, tuple) or len(header) != 2 or header[0] != key:
+						raise ValueError("checkpoint %s is for a different analysis" % checkpoint)
+					lastStart = header[1]
+					while True:
+						start, result = pickle.load(file)
+						results[start] = result
+				except (EOFError, pickle.UnpicklingError):
+					pass	# end of file; a record cut short by an interruption ends the valid ones
+			# the chunk still being recorded when the checkpoint was written may have grown since
+			results.pop(lastStart, None)
+			# and chunks whose segments were pruned are no longer part of the recording
+			current = set(starts)
+			results = dict((start, result) for start, result in results.items() if start in current)
+		# rewrite the kept results beside the checkpoint and swap it in, so an
+		# interruption here leaves the previous checkpoint whole
+		with open(checkpoint + '.tmp', 'wb') as file:
+			pickle.dump((key, starts[-1]), file)
+			for start in sorted(results):
+				pickle.dump((start, results[start]), file)
+			file.flush()
+			os.fsync(file.fileno())
+		os.replace(checkpoint + '.tmp', checkpoint)
+		checkpointFile = open(checkpoint, 'ab')
+
+	total = len(starts)
+	if progress is not None:
+		progress(len(results), total)
+	try:
+		pending = [start for start in starts if start not in results]
+		if pending:
+			with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+				futures = [pool.submit(_analyzeChunk, directory, function, start, start + chunkDuration,
+									   overlap, scaled) for start in pending]
+				for future in concurrent.futures.as_completed(futures):
+					start, result = future.result()
+					results[start] = result
+					if checkpointFile is not None:
+						pickle.dump((start, result), checkpointFile)
+						checkpointFile.flush()
+					if progress is not None:
+						progress(len(results), total)
+	finally:
+		if checkpointFile is not None:
+			checkpointFile.close()
+	return [(start, results[start]) for start in starts]
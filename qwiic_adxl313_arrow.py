@@ -0,0 +1,179 @@
+#-----------------------------------------------------------------------------
+# qwiic_adxl313_arrow.py
+#
+# Apache Arrow / Parquet export for qwiic_adxl313 sample batches.
+#
+# https://www.sparkfun.com/products/17241
+#
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2020
+# 
+# This python library supports the SparkFun Electroncis qwiic 
+# qwiic sensor/board ecosystem 
+#
+# More information on qwiic is at https:# www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2020 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+
+"""
+qwiic_adxl313_arrow
+===================
+ArrowExporter streams SampleBatches to Arrow IPC streams or Parquet files (needs pyarrow).
+"""
+#-----------------------------------------------------------------------------
+
+import math
+import os
+from array import array
+
+class ArrowExporter(object):
+	"""
+	ArrowExporter
+
+		Streams sample batches to an Arrow IPC stream or a Parquet file, with int16
+		x, y and z columns, a float64 timestamp (time.time() seconds) and a float32
+		scale (g per LSB) column. The range, output data rate and device address are
+		stored in the schema metadata. Memory stays flat however long the capture:
+		IPC writes one record batch per sample batch, Parquet one row group per
+		rowGroupSize samples. pyarrow (and numpy, used for the timestamps when
+		installed) is only imported when an exporter is created.
+
+		Each column is de-interleaved from the packed batch in one C level copy and
+		handed to Arrow without a further copy.
+
+		:param path: output file path, or a writable binary file (which close() leaves open)
+		:param format: 'ipc' (Arrow IPC stream, .arrows) or 'parquet'
+		:param device: QwiicAdxl313 to take the metadata from (optional)
+		:param metadata: extra schema metadata (dict of str)
+		:param rowGroupSize: samples per Parquet row group
+		:param compression: Parquet compression codec
+	"""
+	def __init__(self, path, format='ipc', device=None, metadata=None, rowGroupSize=1 << 20, compression='zstd'):
+		try:
+			import pyarrow
+		except ImportError:
+			raise ImportError("ArrowExporter needs pyarrow (pip install pyarrow)")
+		self._pa = pyarrow
+		try:
+			import numpy
+		except ImportError:
+			numpy = None
+		self._numpy = numpy
+		if format not in ('ipc', 'parquet'):
+			raise ValueError("format must be 'ipc' or 'parquet'")
+		self.format = format
+		self.rowGroupSize = rowGroupSize
+		self.samplesWritten = 0
+
+		meta = {}
+		if device is not None:
+			meta['range'] = str(device.getConfiguredRange())
+			meta['odr'] = str(device.getConfiguredDataRate())
+			meta['address'] = "0x%.2X" % device.address
+		meta.update(metadata or {})
+		self.schema = pyarrow.schema([
+			('x', pyarrow.int16()), ('y', pyarrow.int16()), ('z', pyarrow.int16()),
+			('timestamp', pyarrow.float64()), ('scale', pyarrow.float32())], metadata=meta)
+
+		if format == 'parquet':
+			import pyarrow.parquet
+			self._writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression=compression)
+			self._pending = []
+			self._pendingRows = 0
+		else:
+			# only a file opened here is closed by close(), the caller owns the others
+			self._ownsSink = isinstance(path, (str, os.PathLike))
+			self._sink = pyarrow.OSFile(os.fspath(path), 'wb') if self._ownsSink else path
+			self._writer = pyarrow.ipc.new_stream(self._sink, self.schema)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def _column(self, data, count, dtype):
+		return self._pa.Array.from_buffers(dtype, count, [None, self._pa.py_buffer(data)])
+
+	def recordBatch(self, batch):
+		"""
+			Converts a SampleBatch
+
+			:return: the Arrow record batch
+			:rtype: pyarrow.RecordBatch
+		"""
+		numpy = self._numpy
+		pa = self._pa
+		count = len(batch)
+		# Arrow buffers are in native byte order, as batch.data is
+		data = batch.data
+		if batch.timestamp is not None and batch.rate:
+			if numpy is not None:
+				timestamps = batch.timestamp - (count - 1 - numpy.arange(count)) / batch.rate
+			else:
+				timestamps = array('d', batch.timestamps())
+		else:
+			timestamps = array('d', [batch.timestamp if batch.timestamp is not None else math.nan]) * count
+		columns = [self._column(data[axis::3], count, pa.int16()) for axis in range(3)]
+		columns.append(self._column(timestamps, count, pa.float64()))
+		columns.append(self._column(array('f', [batch.scale or 0.0]) * count, count, pa.float32()))
+		return pa.RecordBatch.from_arrays(columns, schema=self.schema)
+
+	def write(self, batch):
+		"""
+			Writes a SampleBatch
+
+			:param batch: the SampleBatch
+		"""
+		if not len(batch):
+			return
+		recordBatch = self.recordBatch(batch)
+		self.samplesWritten += len(batch)
+		if self.format == 'ipc':
+			self._writer.write_batch(recordBatch)
+			return
+		self._pending.append(recordBatch)
+		self._pendingRows += len(batch)
+		if self._pendingRows >= self.rowGroupSize:
+			self._flushRowGroup()
+
+	def _flushRowGroup(self):
+		if self._pending:
+			self._writer.write_table(self._pa.Table.from_batches(self._pending), row_group_size=self._pendingRows)
+			self._pending = []
+			self._pendingRows = 0
+
+	def close(self):
+		"""
+			Finishes the file, and closes it if the exporter opened it from a path
+		"""
+		if self._writer is None:
+			return
+		if self.format == 'parquet':
+			self._flushRowGroup()
+		self._writer.close()
+		if self.format == 'ipc' and self._ownsSink:
+			self._sink.close()
+		self._writer = None
@@ -0,0 +1,318 @@
+#-----------------------------------------------------------------------------
+# qwiic_adxl313_cli.py
+#
+# Command line tool for the qwiic_adxl313 driver.
+#
+# https://www.sparkfun.com/products/17241
+#
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2020
+# 
+# This python library supports the SparkFun Electroncis qwiic 
+# qwiic sensor/board ecosystem 
+#
+# More information on qwiic is at https:# www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2020 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+
+"""
+qwiic_adxl313_cli
+=================
+python -m qwiic_adxl313_cli (or python -m qwiic_adxl313) {capture,dump-registers,bench,stats} ...
+"""
+#-----------------------------------------------------------------------------
+
+import math
+import mmap
+import sys
+import time
+from array import array
+
+from qwiic_adxl313 import (QwiicAdxl313, QwiicAdxl313Simulator, QwiicAdxl313Spi, QwiicLinuxI2C,
+						   RegisterSnapshot, SampleBatch, SampleEncoder, SampleDecoder)
+from qwiic_adxl313_metrics import MetricsServer
+
+_RANGE_CODES = {'0.5': QwiicAdxl313.ADXL313_RANGE_05_G, '1': QwiicAdxl313.ADXL313_RANGE_1_G,
+				'2': QwiicAdxl313.ADXL313_RANGE_2_G, '4': QwiicAdxl313.ADXL313_RANGE_4_G}
+
+def _rateCode(rate):
+	# output data rate (Hz) to BW_RATE code
+	for code in range(QwiicAdxl313.ADXL313_BW_3_125, QwiicAdxl313.ADXL313_BW_1600 + 1):
+		if abs(6.25 * (2 ** (code - QwiicAdxl313.ADXL313_BW_3_125)) - rate) < 1e-6:
+			return code
+	raise ValueError("unsupported output data rate %g Hz (6.25 to 3200, powers of 2)" % rate)
+
+def _openDevice(args):
+	if args.simulate:
+		driver = QwiicAdxl313Simulator()
+	elif args.spi is not None:
+		driver = QwiicAdxl313Spi(*[int(part) for part in args.spi.split('.')])
+	elif args.bus is not None:
+		driver = QwiicLinuxI2C(args.bus)
+	else:
+		driver = None
+	device = QwiicAdxl313(args.address, driver)
+	if not device.begin():
+		raise SystemExit("The Qwiic ADXL313 device isn't connected to the system.")
+	return device
+
+def _configureStream(device, rate, rangeCode, watermark):
+	device.standby()
+	device.setRange(rangeCode)
+	device.setBandwidth(_rateCode(rate))
+	device.setFifoMode(device.ADXL313_FIFO_MODE_STREAM)
+	device.setFifoSamplesThreshhold(watermark)
+	device.clearFifo()
+	device.measureModeOn()
+
+class _TextWriter(object):
+	def __init__(self, stream):
+		self.stream = stream
+
+	def write(self, batch):
+		self.stream.write("".join("%d\t%d\t%d\n" % sample for sample in batch).encode('ascii'))
+
+	def flush(self):
+		self.stream.flush()
+
+class _RawWriter(object):
+	def __init__(self, stream):
+		self.stream = stream
+
+	def write(self, batch):
+		data = batch.data
+		if sys.byteorder == 'big':
+			data = array('h', data)
+			data.byteswap()
+		self.stream.write(memoryview(data).cast('B'))
+
+	def flush(self):
+		self.stream.flush()
+
+class _CodecWriter(object):
+	def __init__(self, stream):
+		self.encoder = SampleEncoder(stream)
+
+	def write(self, batch):
+		self.encoder.write(batch)
+
+	def flush(self):
+		self.encoder.flush()
+
+_WRITERS = {'raw': _RawWriter, 'text': _TextWriter, 'codec': _CodecWriter}
+
+def _captureCommand(args):
+	device = _openDevice(args)
+	_configureStream(device, args.rate, _RANGE_CODES[args.range], args.watermark)
+	out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb', buffering=1 << 16)
+	writer = _WRITERS[args.format](out)
+	metricsServer = None
+	if args.metrics_port is not None:
+		metricsServer = MetricsServer(device.enableMetrics(), args.metrics_port)
+	received = 0
+	overruns = 0		# drains that found the FIFO full: samples were lost before them
+	start = time.monotonic()
+	lastReport = start
+	try:
+		while args.duration is None or time.monotonic() - start < args.duration:
+			entries = device.waitForWatermark(timeout=0.5)
+			if entries is None:
+				continue
+			if entries >= device.ADXL313_FIFO_SIZE:
+				overruns += 1
+			batch = device.readFifo(entries)
+			writer.write(batch)
+			received += len(batch)
+			now = time.monotonic()
+			if not args.quiet and now - lastReport >= 1.0:
+				elapsed = now - start
+				sys.stderr.write("\r%d samples, %.1f Hz achieved, %d overruns (FIFO full when drained) " % (
+					received, received / elapsed, overruns))
+				sys.stderr.flush()
+				lastReport = now
+	except KeyboardInterrupt:
+		pass
+	finally:
+		writer.flush()
+		if out is not sys.stdout.buffer:
+			out.close()
+		device.standby()
+		if metricsServer is not None:
+			metricsServer.close()
+	if not args.quiet:
+		sys.stderr.write("\n")
+	return 0
+
+def _dumpRegistersCommand(args):
+	snapshot = _openDevice(args).snapshot(args.int_source)
+	for name in sorted(name for name, value in vars(RegisterSnapshot).items() if isinstance(value, property)):
+		print("%-22s %s" % (name, getattr(snapshot, name)))
+	print()
+	for register in sorted(snapshot.registers):
+		print("0x%.2X  0x%.2X" % (register, snapshot.registers[register]))
+	return 0
+
+def _benchCommand(args):
+	device = _openDevice(args)
+	_configureStream(device, args.rate, device.ADXL313_RANGE_4_G, args.watermark)
+	start = time.perf_counter()
+	reads = 0
+	while time.perf_counter() - start < args.duration:
+		device.readAccel()
+		reads += 1
+	elapsed = time.perf_counter() - start
+	print("readAccel: %d reads in %.2fs, %.1f us/read" % (reads, elapsed, 1e6 * elapsed / reads))
+
+	device.clearFifo()
+	start = time.perf_counter()
+	samples = 0
+	drainTime = 0.0
+	while time.perf_counter() - start < args.duration:
+		entries = device.waitForWatermark(timeout=1.0)
+		if entries:
+			drainStart = time.perf_counter()
+			samples += len(device.readFifo(entries))
+			drainTime += time.perf_counter() - drainStart
+	elapsed = time.perf_counter() - start
+	print("readFifo: %d samples in %.2fs (%.1f Hz), %.1f us/sample draining" % (
+		samples, elapsed, samples / elapsed, 1e6 * drainTime / max(samples, 1)))
+	stats = device.getEnergyStats()
+	print("bus: %d transactions, %d bytes, %d wake ups, %d errors" % (
+		stats['busTransactions'], stats['busBytes'], stats['wakeups'], device.i2cErrors))
+	device.standby()
+	return 0
+
+class _AxisStats(object):
+	# running min, max, mean and variance (Welford) and mean square of one axis
+	def __init__(self):
+		self.count = 0
+		self.min = None
+		self.max = None
+		self.mean = 0.0
+		self.m2 = 0.0
+		self.squares = 0.0
+
+	def add(self, value):
+		self.count += 1
+		if self.min is None or value < self.min:
+			self.min = value
+		if self.max is None or value > self.max:
+			self.max = value
+		delta = value - self.mean
+		self.mean += delta / self.count
+		self.m2 += delta * (value - self.mean)
+		self.squares += value * value
+
+def _readSamples(f, fileFormat):
+	# yields the samples of a capture file without loading it whole
+	if fileFormat == 'text':
+		for line in f:
+			if line.strip():
+				yield tuple(int(value) for value in line.split())
+	elif fileFormat == 'codec':
+		if f.seek(0, 2) == 0:
+			return
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+			for sample in SampleDecoder(data):
+				yield sample
+	else:
+		f.seek(0)
+		while True:
+			data = f.read(6 * 4096)
+			if len(data) < 6:
+				return
+			for sample in SampleBatch.fromBytes(data[:len(data) - len(data) % 6]):
+				yield sample
+
+def _statsCommand(args):
+	axes = [_AxisStats() for _ in range(3)]
+	with open(args.input, 'rb') as f:
+		for sample in _readSamples(f, args.format):
+			for axis, value in enumerate(sample):
+				axes[axis].add(value)
+	count = axes[0].count
+	print("samples: %d" % count)
+	if not count:
+		return 0
+	for stats, name in zip(axes, 'xyz'):
+		print("%s: min %d max %d mean %.2f std %.2f rms %.2f" % (name, stats.min, stats.max, stats.mean,
+			  math.sqrt(stats.m2 / count), math.sqrt(stats.squares / count)))
+	return 0
+
+def main(argv=None):
+	"""
+		Command line tool: python -m qwiic_adxl313 {capture,dump-registers,bench,stats} ...
+		Use --simulate to run against QwiicAdxl313Simulator instead of a sensor.
+
+		:param argv: arguments (defaults to sys.argv[1:])
+
+		:return: exit status
+		:rtype: int
+	"""
+	import argparse
+
+	device = argparse.ArgumentParser(add_help=False)
+	device.add_argument('--address', type=lambda value: int(value, 0), default=None, help="I2C address (default 0x1D)")
+	device.add_argument('--bus', type=int, default=None, help="use /dev/i2c-BUS directly (QwiicLinuxI2C)")
+	device.add_argument('--spi', default=None, metavar='BUS.DEVICE', help="use SPI (e.g. 0.0)")
+	device.add_argument('--simulate', action='store_true', help="use a simulated sensor")
+
+	parser = argparse.ArgumentParser(prog='python -m qwiic_adxl313', description="SparkFun Qwiic ADXL313 tool")
+	commands = parser.add_subparsers(dest='command')
+	commands.required = True
+
+	capture = commands.add_parser('capture', parents=[device], help="capture samples to a file")
+	capture.add_argument('--rate', type=float, default=100, help="output data rate in Hz (default 100)")
+	capture.add_argument('--range', choices=sorted(_RANGE_CODES), default='4', help="range in g (default 4)")
+	capture.add_argument('--duration', type=float, default=None, help="seconds (default: until Ctrl-C)")
+	capture.add_argument('--watermark', type=int, default=24, help="FIFO watermark (default 24)")
+	capture.add_argument('--format', choices=sorted(_WRITERS), default='raw',
+						 help="raw (int16 x,y,z little endian), codec (SampleEncoder) or text (tab separated)")
+	capture.add_argument('--quiet', action='store_true', help="no progress output")
+	capture.add_argument('--metrics-port', type=int, default=None,
+						 help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+	capture.add_argument('output', help="output file, - for stdout")
+	capture.set_defaults(function=_captureCommand)
+
+	dump = commands.add_parser('dump-registers', parents=[device], help="print the decoded register map")
+	dump.add_argument('--int-source', action='store_true', help="also read INT_SOURCE (clears activity events)")
+	dump.set_defaults(function=_dumpRegistersCommand)
+
+	bench = commands.add_parser('bench', parents=[device], help="measure read throughput")
+	bench.add_argument('--rate', type=float, default=800, help="output data rate in Hz (default 800)")
+	bench.add_argument('--duration', type=float, default=2.0, help="seconds per test (default 2)")
+	bench.add_argument('--watermark', type=int, default=24, help="FIFO watermark (default 24)")
+	bench.set_defaults(function=_benchCommand)
+
+	stats = commands.add_parser('stats', help="print statistics of a capture file")
+	stats.add_argument('--format', choices=sorted(_WRITERS), default='raw', help="capture file format")
+	stats.add_argument('input', help="capture file")
+	stats.set_defaults(function=_statsCommand)
+
+	args = parser.parse_args(argv)
+	return args.function(args)
+
+if __name__ == '__main__':
+	sys.exit(main())
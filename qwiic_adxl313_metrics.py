@@ -0,0 +1,130 @@
+#-----------------------------------------------------------------------------
+# qwiic_adxl313_metrics.py
+#
+# Prometheus metrics exporter for the qwiic_adxl313 driver.
+#
+# https://www.sparkfun.com/products/17241
+#
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2020
+# 
+# This python library supports the SparkFun Electroncis qwiic 
+# qwiic sensor/board ecosystem 
+#
+# More information on qwiic is at https:# www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2020 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+
+"""
+qwiic_adxl313_metrics
+=====================
+Serves the AcquisitionMetrics of one or more QwiicAdxl313 devices (see
+QwiicAdxl313.enableMetrics()) in the Prometheus text format over HTTP.
+"""
+#-----------------------------------------------------------------------------
+
+import collections
+import http.server
+import threading
+
+#-----------------------------------------------------------------------------
+# Prometheus text exposition format (version 0.0.4), served on /metrics.
+
+def renderMetrics(metrics):
+	"""
+		Renders AcquisitionMetrics in the Prometheus text format, the samples of
+		every device grouped under one HELP/TYPE per metric family
+
+		:param metrics: list of AcquisitionMetrics
+
+		:return: the text
+		:rtype: str
+	"""
+	families = collections.OrderedDict()
+	for registry in metrics:
+		for name, kind, help, samples in registry.families():
+			if name not in families:
+				families[name] = (kind, help, [])
+			families[name][2].extend(samples)
+	lines = []
+	for name, (kind, help, samples) in families.items():
+		lines.append('# HELP %s %s' % (name, help))
+		lines.append('# TYPE %s %s' % (name, kind))
+		for suffix, labels, value in samples:
+			lines.append('%s%s{%s} %s' % (name, suffix, labels, value))
+	return '\n'.join(lines) + '\n'
+
+class MetricsServer(object):
+	"""
+	MetricsServer
+
+		Serves AcquisitionMetrics in the Prometheus text format on
+		http://host:port/metrics, from a daemon thread.
+
+		:param metrics: an AcquisitionMetrics, or a list of them
+		:param port: TCP port, 0 picks a free one (see the port attribute)
+		:param host: address to listen on; local only by default
+	"""
+	CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+	def __init__(self, metrics, port=9313, host='127.0.0.1'):
+		self.metrics = list(metrics) if isinstance(metrics, (list, tuple)) else [metrics]
+		server = self
+
+		class Handler(http.server.BaseHTTPRequestHandler):
+			def do_GET(self):
+				if self.path.split('?')[0] != '/metrics':
+					self.send_error(404)
+					return
+				body = server.render().encode('utf-8')
+				self.send_response(200)
+				self.send_header('Content-Type', MetricsServer.CONTENT_TYPE)
+				self.send_header('Content-Length', str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, format, *args):
+				pass
+
+		self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+		self._server.daemon_threads = True
+		self.port = self._server.server_address[1]
+		self._thread = threading.Thread(target=self._server.serve_forever, name="adxl313-metrics", daemon=True)
+		self._thread.start()
+
+	def render(self):
+		"""
+			:return: the metrics of all devices, in the text format
+			:rtype: str
+		"""
+		return renderMetrics(self.metrics)
+
+	def close(self):
+		"""
+			Stops the server
+		"""
+		self._server.shutdown()
+		self._server.server_close()
+		self._thread.join()
@@ -0,0 +1,269 @@
+#-----------------------------------------------------------------------------
+# qwiic_adxl313_server.py
+#
+# Streams qwiic_adxl313 sample batches to other local processes.
+#
+# https://www.sparkfun.com/products/17241
+#
+#------------------------------------------------------------------------
+#
+# Written by SparkFun Electronics, October 2020
+# 
+# This python library supports the SparkFun Electroncis qwiic 
+# qwiic sensor/board ecosystem 
+#
+# More information on qwiic is at https:# www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#==================================================================================
+# Copyright (c) 2020 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal 
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all 
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE 
+# SOFTWARE.
+#==================================================================================
+
+"""
+qwiic_adxl313_server
+====================
+SampleServer publishes SampleBatches over a Unix datagram socket and/or UDP multicast on
+the loopback interface; SampleSubscriber and parseFrame() receive them.
+"""
+#-----------------------------------------------------------------------------
+
+import os
+import socket
+import struct
+import sys
+import time
+from array import array
+
+from qwiic_adxl313 import SampleBatch
+
+#-----------------------------------------------------------------------------
+# Streaming server
+#
+# Frames (one datagram each):
+#	4 bytes		magic, b'AXS1'
+#	uint32		sequence number, counted per receiver: the frames sent to one Unix socket
+#				subscriber, or every frame for multicast. It increments by 1 per frame, so
+#				gaps mean lost frames. A rate limited subscriber skips whole batches, which
+#				leave no gap (SampleServer.framesRateLimited counts them).
+#	uint32		number of samples
+#	double		timestamp (time.time()) of the last sample
+#	float		output data rate (Hz)
+#	float		scale (g per LSB)
+#	...			samples, int16 x, y, z little endian
+# Unix socket subscribers send b'SUB' (optionally followed by a little endian float:
+# the most batches per second they want) from a bound datagram socket, and b'UNSUB' to leave.
+# A batch of more than _FRAME_MAX_SAMPLES samples is split into several frames, and a
+# subscriber gets either all of them or none.
+
+_FRAME_MAGIC = b'AXS1'
+_FRAME_HEADER = struct.Struct('<4sIIdff')
+_FRAME_MAX_SAMPLES = 1024
+
+class SampleServer(object):
+	"""
+	SampleServer
+
+		Publishes sample batches to other local processes, over a Unix datagram
+		socket and/or UDP multicast on the loopback interface, using the framed
+		binary protocol described above. Publishing never blocks: a subscriber whose
+		socket buffer is full (or that went away) is dropped, and subscribers can
+		ask for a batch rate limit.
+
+		:param unixPath: path of the Unix datagram socket subscribers write to, or None
+		:param multicastGroup: UDP multicast group, or None
+		:param multicastPort: UDP multicast port
+	"""
+	def __init__(self, unixPath=None, multicastGroup=None, multicastPort=31313):
+		self.unixPath = unixPath
+		self.sequence = 0			# multicast sequence number
+		self.framesSent = 0
+		self.framesRateLimited = 0
+		self.subscribersDropped = 0
+		self._subscribers = {}		# address: [max batches per second, time of the last batch, sequence number]
+		self._unix = None
+		self._multicast = None
+		if unixPath is not None:
+			if os.path.exists(unixPath):
+				os.remove(unixPath)
+			self._unix = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+			self._unix.bind(unixPath)
+			self._unix.setblocking(False)
+		if multicastGroup is not None:
+			self._multicast = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+			self._multicast.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 0)
+			self._multicast.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+			self._multicast.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton('127.0.0.1'))
+			self._multicast.setblocking(False)
+			self._multicastAddress = (multicastGroup, multicastPort)
+
+	@property
+	def subscribers(self):
+		return list(self._subscribers)
+
+	def close(self):
+		"""
+			Closes the sockets (and removes the Unix socket file)
+		"""
+		if self._unix is not None:
+			self._unix.close()
+			self._unix = None
+			try:
+				os.remove(self.unixPath)
+			except OSError:
+				pass
+		if self._multicast is not None:
+			self._multicast.close()
+			self._multicast = None
+
+	def _acceptSubscribers(self):
+		while True:
+			try:
+				message, address = self._unix.recvfrom(64)
+			except (BlockingIOError, InterruptedError):
+				return
+			if not address:
+				continue
+			if message.startswith(b'UNSUB'):
+				self._subscribers.pop(address, None)
+			elif message.startswith(b'SUB'):
+				maxRate = struct.unpack('<f', message[3:7])[0] if len(message) >= 7 else 0.0
+				self._subscribers[address] = [maxRate, 0.0, 0]
+
+	def _frames(self, batch):
+		# (count, timestamp, payload) of each frame; the header is packed per receiver
+		data = batch.data
+		if sys.byteorder == 'big':
+			data = array('h', data)
+			data.byteswap()
+		data = memoryview(data).cast('B')
+		count = len(batch)
+		frames = []
+		for start in range(0, count, _FRAME_MAX_SAMPLES):
+			end = min(start + _FRAME_MAX_SAMPLES, count)
+			# timestamp of the last sample in this frame
+			timestamp = batch.sampleTime(end - 1) if batch.timestamp and batch.rate else (batch.timestamp or 0.0)
+			frames.append((end - start, timestamp, data[6 * start:6 * end]))
+		return frames
+
+	def _header(self, sequence, count, timestamp, batch):
+		return _FRAME_HEADER.pack(_FRAME_MAGIC, sequence & 0xFFFFFFFF, count, timestamp,
+								  batch.rate or 0.0, batch.scale or 0.0)
+
+	def publish(self, batch):
+		"""
+			Sends a batch to every subscriber (never blocks)
+
+			:param batch: the SampleBatch
+		"""
+		if self._unix is not None:
+			self._acceptSubscribers()
+		frames = self._frames(batch)
+		if self._multicast is not None:
+			for count, timestamp, payload in frames:
+				header = self._header(self.sequence, count, timestamp, batch)
+				self.sequence += 1
+				try:
+					self._multicast.sendto(header + payload, self._multicastAddress)
+					self.framesSent += 1
+				except OSError:
+					pass
+		now = time.monotonic()
+		for address, state in list(self._subscribers.items()):
+			maxRate, lastSent, sequence = state
+			if maxRate > 0 and now - lastSent < 1.0 / maxRate:
+				self.framesRateLimited += len(frames)
+				continue
+			try:
+				for count, timestamp, payload in frames:
+					self._unix.sendmsg((self._header(sequence, count, timestamp, batch), payload), (), 0, address)
+					sequence += 1
+					self.framesSent += 1
+			except OSError:
+				# full buffer (slow subscriber) or gone: drop it rather than wait
+				del self._subscribers[address]
+				self.subscribersDropped += 1
+				continue
+			state[1] = now
+			state[2] = sequence
+
+class SampleSubscriber(object):
+	"""
+	SampleSubscriber
+
+		Receives batches from a SampleServer Unix socket.
+
+		:param serverPath: the server's Unix socket path
+		:param maxRate: most batches per second wanted, 0 for all
+		:param path: path to bind the subscriber socket to (a temporary one if not provided)
+	"""
+	def __init__(self, serverPath, maxRate=0.0, path=None):
+		import tempfile
+		self.serverPath = serverPath
+		self._ownsPath = path is None
+		if path is None:
+			path = os.path.join(tempfile.mkdtemp(), "subscriber.sock")
+		self.path = path
+		self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+		self._socket.bind(path)
+		self._socket.sendto(b'SUB' + struct.pack('<f', maxRate), serverPath)
+
+	def receive(self, timeout=None):
+		"""
+			Waits for the next frame
+
+			:param timeout: seconds to wait, None waits forever
+
+			:return: (sequence number, SampleBatch), or None on timeout
+			:rtype: tuple
+		"""
+		self._socket.settimeout(timeout)
+		try:
+			frame = self._socket.recv(_FRAME_HEADER.size + 6 * _FRAME_MAX_SAMPLES)
+		except socket.timeout:
+			return None
+		return parseFrame(frame)
+
+	def close(self):
+		try:
+			self._socket.sendto(b'UNSUB', self.serverPath)
+		except OSError:
+			pass
+		self._socket.close()
+		if self._ownsPath:
+			try:
+				os.remove(self.path)
+				os.rmdir(os.path.dirname(self.path))
+			except OSError:
+				pass
+
+def parseFrame(frame):
+	"""
+		Decodes one SampleServer frame
+
+		:param frame: the datagram
+
+		:return: (sequence number, SampleBatch)
+		:rtype: tuple
+	"""
+	magic, sequence, count, timestamp, rate, scale = _FRAME_HEADER.unpack_from(frame)
+	if magic != _FRAME_MAGIC:
+		raise ValueError("not a sample frame")
+	return sequence, SampleBatch.fromBytes(frame[_FRAME_HEADER.size:_FRAME_HEADER.size + 6 * count], timestamp, rate, scale)
@@ -64,6 +64,7 @@ setup(
     author_email='info@sparkfun.com',
 
     install_requires=['sparkfun_qwiic_i2c'],
+    extras_require={'arrow': ['pyarrow']},
 
     # Choose your license
     license='MIT',
@@ -85,17 +86,24 @@ setup(
 
         # Specify the Python versions you support here. In particular, ensure
         # that you indicate whether you support Python 2, Python 3 or both.
-       'Programming Language :: Python :: 2.7',
-       'Programming Language :: Python :: 3.5',
-       'Programming Language :: Python :: 3.6',
+       'Programming Language :: Python :: 3',
+       'Programming Language :: Python :: 3 :: Only',
        'Programming Language :: Python :: 3.7',
+       'Programming Language :: Python :: 3.8',
+       'Programming Language :: Python :: 3.9',
+       'Programming Language :: Python :: 3.10',
+       'Programming Language :: Python :: 3.11',
+       'Programming Language :: Python :: 3.12',
     ],
 
+    python_requires='>=3.7',
+
     # What does your project relate to?
     keywords='electronics, maker',
 
     # You can just specify the packages manually here if your project is
     # simple. Or you can use find_packages().
-    py_modules=["qwiic_adxl313"],
+    py_modules=["qwiic_adxl313", "qwiic_adxl313_analysis", "qwiic_adxl313_arrow", "qwiic_adxl313_cli",
+                "qwiic_adxl313_metrics", "qwiic_adxl313_server"],
 
 )
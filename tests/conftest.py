@@ -0,0 +1,64 @@
+import collections
+import struct
+
+import pytest
+
+import qwiic_adxl313
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+class FakeBus(object):
+	"""
+		Register file with a scripted FIFO, passed as i2c_driver. Samples appended to
+		fifo are read out of DATA_X0..DATA_Z1 one entry at a time, FIFO_STATUS reports
+		their number and the triggered flag, and writing bypass mode to FIFO_CTL clears
+		both, as on the sensor.
+	"""
+	def __init__(self):
+		self.regs = bytearray(0x40)
+		self.regs[Adxl.ADXL313_DEVID_0] = Adxl.ADXL313_DEVID_0_RSP_EXPECTED
+		self.regs[Adxl.ADXL313_DEVID_1] = Adxl.ADXL313_DEVID_1_RSP_EXPECTED
+		self.regs[Adxl.ADXL313_PARTID] = Adxl.ADXL313_PARTID_RSP_EXPECTED
+		self.regs[Adxl.ADXL313_BW_RATE] = Adxl.ADXL313_BW_RATE_RESET
+		self.fifo = collections.deque()
+		self.triggered = False
+		self.reads = collections.Counter()		# register: single byte reads
+		self.blockReads = []					# (register, nBytes) of every block read
+		self.error = None						# exception raised by every transfer while set
+
+	def _check(self):
+		if self.error is not None:
+			raise self.error
+
+	def readByte(self, address, commandCode):
+		self._check()
+		self.reads[commandCode] += 1
+		if commandCode == Adxl.ADXL313_FIFO_STATUS:
+			return min(len(self.fifo), Adxl.ADXL313_FIFO_SIZE) | (self.triggered << Adxl.ADXL313_FIFO_TRIG_BIT)
+		return self.regs[commandCode]
+
+	def writeByte(self, address, commandCode, value):
+		self._check()
+		self.regs[commandCode] = value
+		if commandCode == Adxl.ADXL313_FIFO_CTL and value >> 6 == Adxl.ADXL313_FIFO_MODE_BYPASS:
+			self.fifo.clear()
+			self.triggered = False
+
+	def readBlock(self, address, commandCode, nBytes):
+		self._check()
+		self.blockReads.append((commandCode, nBytes))
+		if commandCode == Adxl.ADXL313_DATA_X0 and self.fifo:
+			data = struct.pack('<hhh', *self.fifo.popleft()) + bytes(self.regs[commandCode + 6:commandCode + nBytes])
+			return list(bytearray(data))
+		return list(self.regs[commandCode:commandCode + nBytes])
+
+	def isDeviceConnected(self, address):
+		return self.error is None
+
+@pytest.fixture
+def bus():
+	return FakeBus()
+
+@pytest.fixture
+def device(bus):
+	return Adxl(i2c_driver=bus)
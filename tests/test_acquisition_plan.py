@@ -0,0 +1,64 @@
+import pytest
+
+import qwiic_adxl313
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+def test_slowest_rate_for_the_bandwidth(device):
+	plan = device.planAcquisition(bandwidth=40, maxLatency=1.0)
+	assert plan.dataRate == 100.0
+	assert plan.bandwidthCode == Adxl.ADXL313_BW_50
+	assert plan.fifoMode == Adxl.ADXL313_FIFO_MODE_STREAM
+	assert plan.lowPower == 1
+	assert plan.current == Adxl.ADXL313_SUPPLY_CURRENT[Adxl.ADXL313_BW_50][1]
+	assert plan.wakeupsPerSecond == pytest.approx(plan.dataRate / plan.watermark)
+	assert 0 < plan.busUtilization < 1
+
+def test_watermark_meets_latency_and_headroom(device):
+	wakeupCost, busThroughput = 0.002, 40000
+	for maxLatency in (0.05, 0.1, 1.0):
+		plan = device.planAcquisition(bandwidth=40, maxLatency=maxLatency, wakeupCost=wakeupCost,
+									  busThroughput=busThroughput)
+		drain = wakeupCost + plan.watermark * Adxl.ADXL313_BUS_BYTES_PER_ENTRY / float(busThroughput)
+		assert plan.watermark / plan.dataRate + drain <= maxLatency
+		assert (Adxl.ADXL313_FIFO_SIZE - plan.watermark) / plan.dataRate >= drain
+	# a tighter latency bound gives a smaller watermark
+	assert device.planAcquisition(40, 0.05).watermark < device.planAcquisition(40, 1.0).watermark
+
+def test_low_power_only_where_supported(device):
+	assert device.planAcquisition(bandwidth=1600, maxLatency=1.0).lowPower == 0
+	assert device.planAcquisition(bandwidth=40, maxLatency=1.0, allowLowPower=False).lowPower == 0
+
+def test_impossible_plans(device):
+	with pytest.raises(ValueError):
+		device.planAcquisition(bandwidth=2000, maxLatency=1.0)
+	with pytest.raises(ValueError):
+		device.planAcquisition(bandwidth=1600, maxLatency=1.0, busThroughput=20000)
+	with pytest.raises(ValueError):
+		device.planAcquisition(bandwidth=40, maxLatency=0.005)
+
+def test_apply_plan_restores_measure_mode_and_trigger_pin(device, bus):
+	device.measureModeOn()
+	device.setFifoTriggerPin(Adxl.ADXL313_INT2_PIN)
+	plan = device.planAcquisition(bandwidth=40, maxLatency=0.2)
+	writes = []
+	writeByte = bus.writeByte
+	def recordWrite(address, commandCode, value):
+		writes.append((commandCode, value))
+		writeByte(address, commandCode, value)
+	bus.writeByte = recordWrite
+	assert device.applyPlan(plan)
+	# BW_RATE and FIFO_CTL are written in standby
+	assert writes[0] == (Adxl.ADXL313_POWER_CTL, 0)
+	assert writes[-1] == (Adxl.ADXL313_POWER_CTL, 1 << Adxl.ADXL313_MEASURE_BIT)
+	assert bus.regs[Adxl.ADXL313_BW_RATE] == plan.bandwidthCode | (1 << Adxl.ADXL313_LOW_POWER_BIT)
+	fifoCtl = bus.regs[Adxl.ADXL313_FIFO_CTL]
+	assert fifoCtl >> 6 == plan.fifoMode
+	assert fifoCtl & 0b11111 == plan.watermark
+	assert (fifoCtl >> Adxl.ADXL313_FIFO_TRIGGER_BIT) & 1 == Adxl.ADXL313_INT2_PIN
+	assert device.getConfiguredDataRate() == plan.dataRate
+
+def test_apply_plan_bus_error(device, bus):
+	plan = device.planAcquisition(bandwidth=40, maxLatency=0.2)
+	bus.error = OSError(121, 'Remote I/O error')
+	assert not device.applyPlan(plan)
@@ -0,0 +1,96 @@
+import os
+import pickle
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import qwiic_adxl313
+from qwiic_adxl313_analysis import analyzeRecording
+
+RATE = 128.0
+
+def countSamples(timestamps, samples, start, end):
+	return int(((timestamps >= start) & (timestamps < end)).sum())
+
+def _record(directory, batches):
+	# batches: (first sample time, sample count); one segment per batch
+	with qwiic_adxl313.SampleRecorder(directory, segmentBytes=1, fsync='never') as recorder:
+		for first, count in batches:
+			samples = [(i, 0, 1024) for i in range(count)]
+			recorder.record(qwiic_adxl313.SampleBatch.fromSamples(samples, first + (count - 1) / RATE, RATE, 1 / 1024.0))
+
+def _analyze(directory, checkpoint):
+	progress = []
+	results = analyzeRecording(directory, countSamples, chunkDuration=1.0, workers=1,
+							   progress=lambda done, total: progress.append((done, total)), checkpoint=checkpoint)
+	return results, progress[0]
+
+def test_resume_after_growth(tmp_path):
+	directory = str(tmp_path / "recording")
+	checkpoint = str(tmp_path / "checkpoint")
+	_record(directory, [(1000.0, 128), (1001.0, 64)])
+	results, _ = _analyze(directory, checkpoint)
+	assert results == [(1000.0, 128), (1001.0, 64)]
+
+	# the last chunk fills up and a new one starts
+	_record(directory, [(1001.5, 64), (1002.0, 128)])
+	results, initial = _analyze(directory, checkpoint)
+	assert results == [(1000.0, 128), (1001.0, 128), (1002.0, 128)]
+	assert initial == (1, 3)		# only chunk 1000 was reused
+
+	results, initial = _analyze(directory, checkpoint)
+	assert initial == (2, 3)
+	assert results == [(1000.0, 128), (1001.0, 128), (1002.0, 128)]
+
+def test_resume_after_pruning(tmp_path):
+	directory = str(tmp_path / "recording")
+	checkpoint = str(tmp_path / "checkpoint")
+	_record(directory, [(1000.0 + i, 128) for i in range(4)])
+	assert [count for _, count in _analyze(directory, checkpoint)[0]] == [128] * 4
+
+	# the recorder deletes the two oldest segments and records another second
+	for name in sorted(os.listdir(directory))[:2]:
+		os.remove(os.path.join(directory, name))
+	_record(directory, [(1004.0, 32)])
+	results, initial = _analyze(directory, checkpoint)
+	assert results == [(1002.0, 128), (1003.0, 128), (1004.0, 32)]
+	assert initial == (1, 3)		# chunk 1002 reused, 1003 (last before) recomputed
+
+def _recordEnds(checkpoint):
+	# file offset after each pickled record
+	ends = []
+	with open(checkpoint, 'rb') as file:
+		while True:
+			try:
+				pickle.load(file)
+			except EOFError:
+				return ends
+			ends.append(file.tell())
+
+def test_resume_from_truncated_checkpoint(tmp_path):
+	directory = str(tmp_path / "recording")
+	checkpoint = str(tmp_path / "checkpoint")
+	_record(directory, [(1000.0 + i, 128) for i in range(4)])
+	_analyze(directory, checkpoint)
+
+	# interrupted in the middle of writing the third result
+	ends = _recordEnds(checkpoint)
+	assert len(ends) == 5
+	with open(checkpoint, 'r+b') as file:
+		file.truncate((ends[2] + ends[3]) // 2)
+	results, initial = _analyze(directory, checkpoint)
+	assert results == [(1000.0 + i, 128) for i in range(4)]
+	assert initial == (2, 4)		# the two complete results are reused
+
+	# the rewritten checkpoint holds no partial record, and no temporary file is left
+	assert len(_recordEnds(checkpoint)) == 5
+	assert not os.path.exists(checkpoint + '.tmp')
+
+def test_checkpoint_for_other_analysis(tmp_path):
+	directory = str(tmp_path / "recording")
+	checkpoint = str(tmp_path / "checkpoint")
+	_record(directory, [(1000.0, 128)])
+	analyzeRecording(directory, countSamples, chunkDuration=1.0, workers=1, checkpoint=checkpoint)
+	with pytest.raises(ValueError):
+		analyzeRecording(directory, countSamples, chunkDuration=2.0, workers=1, checkpoint=checkpoint)
@@ -0,0 +1,42 @@
+import io
+
+import pytest
+
+pyarrow = pytest.importorskip("pyarrow")
+
+import qwiic_adxl313
+from qwiic_adxl313_arrow import ArrowExporter
+
+SAMPLES = [(1, -2, 1024), (-300, 400, 1000), (5, 6, 7)]
+
+def _batch():
+	return qwiic_adxl313.SampleBatch.fromSamples(SAMPLES, timestamp=10.0, rate=100.0, scale=1 / 1024.0)
+
+def test_ipc_leaves_caller_file_open():
+	sink = io.BytesIO()
+	with ArrowExporter(sink, metadata={'run': '1'}) as exporter:
+		exporter.write(_batch())
+	assert not sink.closed
+	table = pyarrow.ipc.open_stream(sink.getvalue()).read_all()
+	assert list(zip(*(table.column(axis).to_pylist() for axis in 'xyz'))) == SAMPLES
+	assert table.column('timestamp').to_pylist() == pytest.approx([9.98, 9.99, 10.0])
+	assert table.schema.metadata[b'run'] == b'1'
+
+def test_ipc_closes_file_opened_from_path(tmp_path):
+	path = tmp_path / "capture.arrows"
+	exporter = ArrowExporter(str(path))
+	exporter.write(_batch())
+	exporter.close()
+	assert exporter._sink.closed
+	assert pyarrow.ipc.open_stream(path.read_bytes()).read_all().num_rows == 3
+
+def test_parquet_leaves_caller_file_open():
+	pytest.importorskip("pyarrow.parquet")
+	import pyarrow.parquet
+	sink = io.BytesIO()
+	with ArrowExporter(sink, format='parquet') as exporter:
+		exporter.write(_batch())
+		exporter.write(_batch())
+	assert not sink.closed
+	sink.seek(0)
+	assert pyarrow.parquet.read_table(sink).num_rows == 6
@@ -0,0 +1,45 @@
+import threading
+import time
+
+import qwiic_adxl313
+
+Arbiter = qwiic_adxl313.QwiicBusArbiter
+
+def _waitFor(condition, timeout=2.0):
+	deadline = time.monotonic() + timeout
+	while not condition():
+		assert time.monotonic() < deadline, "timed out"
+		time.sleep(0.001)
+
+def test_high_priority_runs_ahead_of_queued_low(bus):
+	arbiter = Arbiter(bus)
+	order = []
+
+	def work(priority, name):
+		with arbiter.transaction(priority, 0x1D):
+			order.append(name)
+			arbiter.readByte(0x1D, 0x00)
+
+	with arbiter.transaction(Arbiter.PRIORITY_NORMAL, 0x1D):
+		threads = []
+		for priority, name in ((Arbiter.PRIORITY_LOW, 'low'), (Arbiter.PRIORITY_NORMAL, 'normal'),
+							   (Arbiter.PRIORITY_HIGH, 'high')):
+			thread = threading.Thread(target=work, args=(priority, name))
+			thread.start()
+			threads.append(thread)
+			_waitFor(lambda: len(arbiter._waiters) == len(threads))
+	for thread in threads:
+		thread.join()
+	assert order == ['high', 'normal', 'low']
+
+def test_transactions_are_reentrant_and_accounted(bus):
+	arbiter = Arbiter(bus)
+	device = qwiic_adxl313.QwiicAdxl313(i2c_driver=arbiter)
+	with arbiter.transaction(Arbiter.PRIORITY_HIGH, device.address):
+		assert device.begin()
+		bus.fifo.extend([(1, 2, 3)] * 3)
+		assert list(device.readFifo()) == [(1, 2, 3)] * 3
+	transfers, nBytes, busy, fraction = arbiter.getUtilization()[device.address]
+	assert transfers == 1 + 1 + 3
+	assert nBytes == 3 + 1 + 3 * 6
+	assert busy >= 0.0 and 0.0 <= fraction <= 1.0
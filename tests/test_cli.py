@@ -0,0 +1,83 @@
+import math
+import os
+import struct
+import subprocess
+import sys
+
+import pytest
+
+import qwiic_adxl313
+import qwiic_adxl313_cli
+
+SAMPLES = [(i % 7 - 3, 2 * i - 50, 256 + (i * 13) % 29) for i in range(300)]
+
+def _expected(samples):
+	lines = ["samples: %d" % len(samples)]
+	for axis, name in enumerate('xyz'):
+		values = [sample[axis] for sample in samples]
+		mean = sum(values) / float(len(values))
+		std = math.sqrt(sum((value - mean) ** 2 for value in values) / len(values))
+		rms = math.sqrt(sum(value * value for value in values) / float(len(values)))
+		lines.append("%s: min %d max %d mean %.2f std %.2f rms %.2f" % (name, min(values), max(values), mean, std, rms))
+	return lines
+
+def _write(path, fileFormat, samples):
+	with open(path, 'wb') as f:
+		if fileFormat == 'raw':
+			f.write(b''.join(struct.pack('<hhh', *sample) for sample in samples))
+		elif fileFormat == 'text':
+			f.write("".join("%d\t%d\t%d\n" % sample for sample in samples).encode('ascii'))
+		else:
+			encoder = qwiic_adxl313.SampleEncoder(f)
+			encoder.write(samples)
+			encoder.flush()
+
+@pytest.mark.parametrize('fileFormat', ['raw', 'text', 'codec'])
+def test_stats(tmp_path, capsys, fileFormat):
+	path = str(tmp_path / ('capture.' + fileFormat))
+	_write(path, fileFormat, SAMPLES)
+	assert qwiic_adxl313_cli.main(['stats', '--format', fileFormat, path]) == 0
+	assert capsys.readouterr().out.splitlines() == _expected(SAMPLES)
+
+def test_stats_reads_raw_files_in_chunks(tmp_path, capsys):
+	# more samples than one read, and a partial sample at the end
+	samples = SAMPLES * 30
+	path = str(tmp_path / 'capture.raw')
+	_write(path, 'raw', samples)
+	with open(path, 'ab') as f:
+		f.write(b'\x01\x02')
+	assert qwiic_adxl313_cli.main(['stats', path]) == 0
+	assert capsys.readouterr().out.splitlines() == _expected(samples)
+
+@pytest.mark.parametrize('fileFormat', ['raw', 'text', 'codec'])
+def test_stats_empty_file(tmp_path, capsys, fileFormat):
+	path = str(tmp_path / 'empty')
+	open(path, 'wb').close()
+	assert qwiic_adxl313_cli.main(['stats', '--format', fileFormat, path]) == 0
+	assert capsys.readouterr().out.splitlines() == ["samples: 0"]
+
+def test_capture_reports_overruns(tmp_path, capsys):
+	path = str(tmp_path / 'capture.raw')
+	assert qwiic_adxl313_cli.main(['capture', '--simulate', '--rate', '400', '--duration', '1.2', path]) == 0
+	progress = capsys.readouterr().err
+	assert "overruns (FIFO full when drained)" in progress
+	assert "dropped" not in progress
+	assert os.path.getsize(path) % 6 == 0 and os.path.getsize(path) > 0
+
+def test_module_entry_point_loads_the_driver_once(tmp_path):
+	# python -m qwiic_adxl313 must not import a second copy of the driver for the tool
+	path = str(tmp_path / 'empty')
+	open(path, 'wb').close()
+	script = "\n".join([
+		"import runpy, sys",
+		"sys.argv = ['qwiic_adxl313', 'stats', %r]" % path,
+		"try:",
+		"	runpy.run_module('qwiic_adxl313', run_name='__main__', alter_sys=True)",
+		"except SystemExit:",
+		"	pass",
+		"import qwiic_adxl313_cli",
+		"print(qwiic_adxl313_cli.QwiicAdxl313.__module__)",
+	])
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	output = subprocess.check_output([sys.executable, '-c', script], cwd=root)
+	assert output.decode().splitlines() == ["samples: 0", "__main__"]
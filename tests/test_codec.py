@@ -0,0 +1,80 @@
+import io
+import random
+
+import pytest
+
+import qwiic_adxl313
+
+EXTREMES = [(32767, -32768, 0), (-32768, 32767, -1), (32767, 32767, 32767), (-32768, -32768, -32768),
+			(0, 0, 0), (-32768, 32767, 1)]
+
+def _noise(count, seed=1):
+	rng = random.Random(seed)
+	samples = []
+	x = y = 0
+	for _ in range(count):
+		x = max(-4096, min(4095, x + rng.randint(-20, 20)))
+		y = max(-4096, min(4095, y + rng.randint(-20, 20)))
+		samples.append((x, y, 1024 + rng.randint(-3, 3)))
+	return samples
+
+@pytest.mark.parametrize("order", [1, 2])
+@pytest.mark.parametrize("samples", [EXTREMES, _noise(100), [(5, -5, 1024)], []])
+def test_block_round_trip(samples, order):
+	block = qwiic_adxl313.encodeSamples(samples, order)
+	decoded, end = qwiic_adxl313.decodeSamples(block + b"trailing", 0)
+	assert decoded == samples
+	assert end == len(block)
+
+def test_bad_order():
+	with pytest.raises(ValueError):
+		qwiic_adxl313.encodeSamples(EXTREMES, 3)
+
+@pytest.mark.parametrize("order", [1, 2])
+def test_stream_random_access(order):
+	samples = _noise(250) + EXTREMES
+	stream = io.BytesIO()
+	encoder = qwiic_adxl313.SampleEncoder(stream, blockSize=32, order=order)
+	encoder.write(samples[:100])
+	encoder.write(samples[100:])
+	encoder.flush()
+	assert encoder.samplesWritten == len(samples)
+	assert encoder.bytesWritten == len(stream.getvalue())
+
+	decoder = qwiic_adxl313.SampleDecoder(stream.getvalue())
+	assert list(decoder) == samples
+	index = decoder.buildIndex()
+	assert index == encoder.index
+	assert [first for first, _ in index] == list(range(0, len(samples), 32))
+	for sampleIndex in (0, 31, 32, 200, len(samples) - 1):
+		assert decoder.getSample(sampleIndex) == samples[sampleIndex]
+		assert decoder.getSample(sampleIndex, index) == samples[sampleIndex]
+	for sampleIndex in (-1, len(samples)):
+		with pytest.raises(IndexError):
+			decoder.getSample(sampleIndex, index)
+
+def test_empty_stream():
+	decoder = qwiic_adxl313.SampleDecoder(b"")
+	assert list(decoder) == []
+	assert decoder.buildIndex() == []
+	with pytest.raises(IndexError):
+		decoder.getSample(0)
+
+def test_truncated_stream():
+	samples = _noise(96)
+	stream = io.BytesIO()
+	encoder = qwiic_adxl313.SampleEncoder(stream, blockSize=32)
+	encoder.write(samples)
+	encoder.flush()
+	data = stream.getvalue()
+	lastBlock = encoder.index[-1][1]
+	for cut in (lastBlock + 1, lastBlock + 5, len(data) - 1):
+		decoder = qwiic_adxl313.SampleDecoder(data[:cut])
+		decoded = []
+		with pytest.raises(ValueError):
+			for sample in decoder:
+				decoded.append(sample)
+		# the complete blocks before the cut still decode
+		assert decoded == samples[:64]
+		with pytest.raises(ValueError):
+			decoder.buildIndex()
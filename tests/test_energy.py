@@ -0,0 +1,46 @@
+import threading
+
+import qwiic_adxl313
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+def _autosleep(device):
+	device._writeRegister(Adxl.ADXL313_BW_RATE, Adxl.ADXL313_BW_100)
+	device._writeRegister(Adxl.ADXL313_POWER_CTL, (1 << Adxl.ADXL313_MEASURE_BIT) | (1 << Adxl.ADXL313_AUTOSLEEP_BIT))
+	return device
+
+def test_asleep_is_charged_at_sleep_current(device):
+	_autosleep(device)
+	awakeCurrent = device._powerStateCurrent
+	assert awakeCurrent == Adxl.ADXL313_SUPPLY_CURRENT[Adxl.ADXL313_BW_100][0]
+
+	device._trackSleep(1 << Adxl.ADXL313_INT_INACTIVITY_BIT)
+	assert device.asleep
+	assert device._powerState == 'autosleep'
+	assert device._powerStateCurrent == Adxl.ADXL313_SLEEP_CURRENT
+
+	device._trackSleep(1 << Adxl.ADXL313_INT_ACTIVITY_BIT)
+	assert not device.asleep
+	assert device._powerStateCurrent == awakeCurrent
+
+def test_sleep_follows_int_source_reads(device, bus):
+	_autosleep(device)
+	bus.regs[Adxl.ADXL313_INT_SOURCE] = 1 << Adxl.ADXL313_INT_INACTIVITY_BIT
+	device.getIntSource()
+	assert device.asleep and device._powerStateCurrent == Adxl.ADXL313_SLEEP_CURRENT
+
+def test_bus_counters_are_thread_safe(device):
+	device.resetEnergyStats()
+
+	def reader():
+		for _ in range(2000):
+			device._readRegister(Adxl.ADXL313_INT_SOURCE)
+
+	threads = [threading.Thread(target=reader) for _ in range(4)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	stats = device.getEnergyStats()
+	assert stats['busTransactions'] == 8000
+	assert stats['busBytes'] == 8000
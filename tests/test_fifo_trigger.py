@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+import qwiic_adxl313
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+def _samples(first, count):
+	return [(i, -i, 1024) for i in range(first, first + count)]
+
+def test_arm_sets_trigger_mode(device, bus):
+	bus.fifo.extend(_samples(0, 5))
+	assert device.armFifoTrigger(preSamples=8, interruptPin=Adxl.ADXL313_INT2_PIN)
+	fifoCtl = bus.regs[Adxl.ADXL313_FIFO_CTL]
+	assert fifoCtl >> 6 == Adxl.ADXL313_FIFO_MODE_TRIGGER
+	assert (fifoCtl >> Adxl.ADXL313_FIFO_TRIGGER_BIT) & 1 == Adxl.ADXL313_INT2_PIN
+	assert fifoCtl & 0b11111 == 8
+	assert not bus.fifo		# passing through bypass cleared the FIFO
+
+def test_capture_reads_history_and_post_samples(device, bus):
+	device.armFifoTrigger(preSamples=4)
+	bus.fifo.extend(_samples(0, 4 + 40))	# more than the FIFO holds, read in several drains
+	bus.triggered = True
+	event = device.captureFifoTrigger(postSamples=40, timeout=1.0)
+	assert event.complete
+	assert event.triggerIndex == 4
+	assert event.samples == _samples(0, 44)
+	assert event.rate == 100.0
+	assert event.sampleTime(4) == event.timestamp
+	assert event.sampleTime(5) - event.timestamp == pytest.approx(0.01)
+
+def test_capture_times_out_without_trigger(device, bus):
+	device.armFifoTrigger(preSamples=4)
+	start = time.monotonic()
+	assert device.captureFifoTrigger(timeout=0.05) is None
+	assert time.monotonic() - start < 1.0
+
+def test_capture_stops_when_fifo_stops_filling(device, bus):
+	device.armFifoTrigger(preSamples=4)
+	bus.fifo.extend(_samples(0, 10))
+	bus.triggered = True
+	start = time.monotonic()
+	event = device.captureFifoTrigger(postSamples=100, timeout=0.05)
+	assert time.monotonic() - start < 2.5
+	assert not event.complete
+	assert event.samples == _samples(0, 10)
+
+def test_capture_uses_interrupt_wait(device, bus):
+	device.armFifoTrigger(preSamples=2)
+	waits = []
+	def waitForInterrupt(timeout):
+		waits.append(timeout)
+		if len(waits) == 2:
+			bus.fifo.extend(_samples(0, 3))
+			bus.triggered = True
+	event = device.captureFifoTrigger(postSamples=1, timeout=1.0, waitForInterrupt=waitForInterrupt)
+	assert len(waits) == 2 and event.samples == _samples(0, 3)
+
+def _simulatedDevice(pin=Adxl.ADXL313_INT1_PIN):
+	simulator = qwiic_adxl313.QwiicAdxl313Simulator(vibration=0)
+	device = Adxl(i2c_driver=simulator)
+	device.setRange(Adxl.ADXL313_RANGE_4_G)
+	device.setBandwidth(Adxl.ADXL313_BW_200)
+	device.setActivityThreshold(24)		# 1.5g, above gravity
+	device.setActivityX(True)
+	device.setActivityY(True)
+	device.setActivityZ(True)
+	device.setInterruptMapping(Adxl.ADXL313_INT_ACTIVITY_BIT, pin)
+	device.setInterrupt(Adxl.ADXL313_INT_ACTIVITY_BIT, True)
+	return device, simulator
+
+def test_simulated_activity_fires_the_trigger():
+	device, simulator = _simulatedDevice()
+	device.armFifoTrigger(preSamples=8)
+	device.measureModeOn()
+	time.sleep(0.1)
+	assert not device.isFifoTriggered()
+	simulator.bump(1.0, 3)
+	event = device.captureFifoTrigger(postSamples=20, timeout=1.0)
+	assert event.complete
+	assert event.triggerIndex == 8
+	assert all(sample == (0, 0, 128) for sample in event.samples[:8])
+	assert event.samples[8:11] == [(128, 128, 256)] * 3
+	assert (device.getIntSource() >> Adxl.ADXL313_INT_ACTIVITY_BIT) & 1
+
+def test_simulated_activity_on_the_other_pin():
+	device, simulator = _simulatedDevice(Adxl.ADXL313_INT2_PIN)
+	device.armFifoTrigger(preSamples=8, interruptPin=Adxl.ADXL313_INT1_PIN)
+	device.measureModeOn()
+	simulator.bump(1.0, 3)
+	assert device.captureFifoTrigger(postSamples=4, timeout=0.1) is None
+	assert (device.getIntSource() >> Adxl.ADXL313_INT_ACTIVITY_BIT) & 1
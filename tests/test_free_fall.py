@@ -0,0 +1,79 @@
+import pytest
+
+import qwiic_adxl313
+
+Detector = qwiic_adxl313.FreeFallDetector
+RATE = 1000.0
+SCALE = 1 / 1024.0
+
+@pytest.fixture(params=['numpy', 'python'])
+def implementation(request, monkeypatch):
+	if request.param == 'numpy':
+		pytest.importorskip("numpy")
+	else:
+		monkeypatch.setattr(qwiic_adxl313, '_numpy', lambda: None)
+	return request.param
+
+def _drop(count=3000, fall=(1000, 200), impact=(1200, 5)):
+	# resting at 1 g, falling (0 g) for fall = (start, length), then an impact of 5 g
+	samples = []
+	for index in range(count):
+		if fall[0] <= index < fall[0] + fall[1]:
+			samples.append((10, -10, 20))
+		elif impact[0] <= index < impact[0] + impact[1]:
+			samples.append((0, 0, 5 * 1024))
+		else:
+			samples.append((0, 0, 1024))
+	return samples
+
+def _events(samples, batchSize, **options):
+	detector = Detector(**options)
+	events = []
+	for first in range(0, len(samples), batchSize):
+		chunk = samples[first:first + batchSize]
+		timestamp = 100.0 + (first + len(chunk) - 1) / RATE
+		for event in detector.process(qwiic_adxl313.SampleBatch.fromSamples(chunk, timestamp, RATE, SCALE)):
+			events.append((first + len(chunk), event))
+	return events
+
+def test_drop(implementation):
+	events = [event for _, event in _events(_drop(), 32)]
+	assert [(event.kind, event.sampleIndex) for event in events] == [(Detector.FREE_FALL, 1000), (Detector.IMPACT, 1200)]
+	fall, impact = events
+	assert fall.timestamp == pytest.approx(101.0)
+	assert fall.duration == pytest.approx(0.2)
+	assert fall.peak == pytest.approx(((10 * 10 * 2 + 20 * 20) ** 0.5) * SCALE)
+	assert impact.duration == pytest.approx(0.005)
+	assert impact.peak == pytest.approx(5.0)
+	# the window runs from preEventTime before the event to its last sample
+	assert len(fall.window) == 500 + 200
+	assert fall.window.timestamp == pytest.approx(100.0 + 1199 / RATE)
+	assert list(fall.window)[-1] == (10, -10, 20)
+	assert list(impact.window)[-5:] == [(0, 0, 5 * 1024)] * 5
+
+def test_same_events_whatever_the_batch_size(implementation):
+	def summary(batchSize):
+		return [(event.kind, event.sampleIndex, round(event.duration, 6), len(event.window))
+				for _, event in _events(_drop(), batchSize)]
+	assert summary(32) == summary(1) == summary(7) == summary(3000)
+
+def test_short_fall_is_ignored(implementation):
+	events = [event for _, event in _events(_drop(fall=(1000, 50), impact=(0, 0)), 32)]
+	assert events == []
+
+def test_low_latency(implementation):
+	# reported from the batch where freeFallTime is reached, not when the fall ends
+	events = _events(_drop(), 10, lowLatency=True)
+	(fallBatchEnd, fall), (impactBatchEnd, impact) = events
+	assert fall.kind == Detector.FREE_FALL and fall.sampleIndex == 1000
+	assert fallBatchEnd == 1100
+	assert fall.duration == pytest.approx(0.1)
+	assert len(fall.window) == 500 + 100
+	assert impact.kind == Detector.IMPACT and impactBatchEnd == 1210
+
+def test_history_is_bounded(implementation):
+	# a fall that never ends keeps at most preEventTime + maxWindowTime of samples
+	detector = Detector(maxWindowTime=1.0)
+	for first in range(0, 20000, 100):
+		detector.process(qwiic_adxl313.SampleBatch.fromSamples([(0, 0, 0)] * 100, 100.0 + first / RATE, RATE, SCALE))
+	assert sum(len(batch) for _, batch in detector._history) <= (0.5 + 1.0) * RATE + 100
@@ -0,0 +1,89 @@
+import time
+
+import qwiic_adxl313
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+def startStream(device):
+	device.setFifoMode(Adxl.ADXL313_FIFO_MODE_STREAM)
+	device.measureModeOn()
+
+def test_sensor_at_rest_is_healthy():
+	# a motionless sensor repeats the same frame forever, that is not a fault
+	device = Adxl(i2c_driver=qwiic_adxl313.QwiicAdxl313Simulator(vibration=0))
+	device.setBandwidth(Adxl.ADXL313_BW_1600)
+	startStream(device)
+	deadline = time.monotonic() + 0.1
+	while time.monotonic() < deadline:
+		device.readFifo()
+		assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+		time.sleep(0.005)
+
+def test_sensor_at_rest_in_bypass_mode_is_healthy():
+	device = Adxl(i2c_driver=qwiic_adxl313.QwiicAdxl313Simulator(vibration=0))
+	device.setBandwidth(Adxl.ADXL313_BW_1600)
+	device.measureModeOn()
+	for _ in range(10):
+		time.sleep(0.005)
+		device.readAccel()
+		assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+
+def test_no_data_is_stuck(bus, device):
+	startStream(device)
+	statuses = [device.checkHealth() for _ in range(Adxl.ADXL313_STUCK_CHECKS)]
+	assert statuses[:-1] == [Adxl.ADXL313_NO_ERROR] * (Adxl.ADXL313_STUCK_CHECKS - 1)
+	assert statuses[-1] == Adxl.ADXL313_STUCK_ERROR
+	# recover() re-applied the configuration and restarted the count
+	assert bus.regs[Adxl.ADXL313_POWER_CTL] & (1 << Adxl.ADXL313_MEASURE_BIT)
+	assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+
+def test_data_arriving_while_waiting_is_not_stuck(bus, device):
+	# the check that would report a stuck sensor first waits a few sample periods
+	startStream(device)
+	for _ in range(Adxl.ADXL313_STUCK_CHECKS - 1):
+		assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+	readByte = bus.readByte
+	def lateSample(address, commandCode):
+		if commandCode == Adxl.ADXL313_FIFO_STATUS and bus.reads[commandCode] == Adxl.ADXL313_STUCK_CHECKS + 1:
+			bus.fifo.append((0, 0, 256))
+		return readByte(address, commandCode)
+	bus.readByte = lateSample
+	assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+
+def test_standby_is_not_stuck(device):
+	for _ in range(Adxl.ADXL313_STUCK_CHECKS + 1):
+		assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+
+def test_full_fifo_is_not_stuck(bus, device):
+	# an overrun FIFO (the reader fell behind) still proves the sensor is sampling
+	startStream(device)
+	bus.fifo.extend([(0, 0, 256)] * Adxl.ADXL313_FIFO_SIZE)
+	for _ in range(Adxl.ADXL313_STUCK_CHECKS + 1):
+		assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+
+def test_overrun_in_bypass_mode_is_not_stuck(bus, device):
+	device.measureModeOn()
+	bus.regs[Adxl.ADXL313_INT_SOURCE] = 1 << Adxl.ADXL313_INT_OVERRUN_BIT
+	for _ in range(Adxl.ADXL313_STUCK_CHECKS + 1):
+		assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+	bus.regs[Adxl.ADXL313_INT_SOURCE] = 0
+	statuses = [device.checkHealth() for _ in range(Adxl.ADXL313_STUCK_CHECKS)]
+	assert statuses[-1] == Adxl.ADXL313_STUCK_ERROR
+
+def test_disconnected_sensor_recovers_with_backoff(bus, device):
+	device.measureModeOn()
+	bus.error = OSError(121, 'Remote I/O error')
+	assert device.checkHealth() == Adxl.ADXL313_READ_ERROR
+	firstRetry = device._nextRecovery
+	assert firstRetry > time.monotonic()
+	assert device._recoveryDelay == 2 * Adxl.ADXL313_RECOVERY_DELAY_MIN
+	# within the backoff delay recover() is not attempted again
+	assert device.checkHealth() == Adxl.ADXL313_READ_ERROR
+	assert device._nextRecovery == firstRetry
+	bus.error = None
+	assert device.checkHealth() == Adxl.ADXL313_NO_ERROR
+	assert device._recoveryDelay == Adxl.ADXL313_RECOVERY_DELAY_MIN
+
+def test_wrong_device_id(bus, device):
+	bus.regs[Adxl.ADXL313_PARTID] = 0x00
+	assert device.checkHealth() == Adxl.ADXL313_ID_ERROR
@@ -0,0 +1,87 @@
+import ctypes
+import errno
+import threading
+import time
+
+import qwiic_adxl313
+
+class FakeAdapter(object):
+	"""Answers each read with the register address plus the read's index; can refuse multi-pair transfers."""
+	def __init__(self, maxMsgs):
+		self.maxMsgs = maxMsgs
+		self.transfers = []
+		self.reads = 0
+
+	def ioctl(self, fd, request, address):
+		data = qwiic_adxl313._I2cRdwrIoctlData.from_address(address)
+		self.transfers.append(data.nmsgs)
+		if data.nmsgs > self.maxMsgs:
+			raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+		for i in range(data.nmsgs):
+			msg = data.msgs[i]
+			if msg.flags & qwiic_adxl313._I2C_M_RD:
+				ctypes.memset(msg.buf, self.reads & 0xFF, msg.len)
+				self.reads += 1
+
+def _expected(nBytes, count):
+	return b"".join(bytes([i & 0xFF]) * nBytes for i in range(count))
+
+def test_read_blocks_batches_pairs():
+	adapter = FakeAdapter(maxMsgs=64)
+	i2c = qwiic_adxl313.QwiicLinuxI2C(fd=-1, ioctl=adapter.ioctl)
+	assert i2c.readBlocks(0x1D, 0x32, 6, 30) == _expected(6, 30)
+	assert adapter.transfers == [42, 18]
+
+def test_read_blocks_falls_back_to_single_pairs():
+	adapter = FakeAdapter(maxMsgs=2)
+	i2c = qwiic_adxl313.QwiicLinuxI2C(fd=-1, ioctl=adapter.ioctl)
+	assert i2c.readBlocks(0x1D, 0x32, 6, 5) == _expected(6, 5)
+	assert adapter.transfers == [10, 2, 2, 2, 2, 2]
+	# the fallback is remembered, the next drain doesn't try batching again
+	adapter.transfers = []
+	adapter.reads = 0
+	assert i2c.readBlocks(0x1D, 0x32, 6, 3) == _expected(6, 3)
+	assert adapter.transfers == [2, 2, 2]
+
+def test_read_blocks_without_batching():
+	adapter = FakeAdapter(maxMsgs=2)
+	i2c = qwiic_adxl313.QwiicLinuxI2C(fd=-1, ioctl=adapter.ioctl, batchReads=False)
+	assert i2c.readBlocks(0x1D, 0x32, 6, 2) == _expected(6, 2)
+	assert adapter.transfers == [2, 2]
+
+def test_read_blocks_other_errors_propagate():
+	def ioctl(fd, request, address):
+		raise OSError(errno.EREMOTEIO, "Remote I/O error")
+	i2c = qwiic_adxl313.QwiicLinuxI2C(fd=-1, ioctl=ioctl)
+	try:
+		i2c.readBlocks(0x1D, 0x32, 6, 4)
+	except OSError as e:
+		assert e.errno == errno.EREMOTEIO
+	else:
+		assert False, "expected OSError"
+
+def test_threads_do_not_share_buffers():
+	# each read answers with its register address; interleaved transfers would mix them up
+	active = []
+	def ioctl(fd, request, address):
+		active.append(1)
+		assert len(active) == 1, "overlapping transfers"
+		data = qwiic_adxl313._I2cRdwrIoctlData.from_address(address)
+		time.sleep(0.001)
+		register = ctypes.string_at(data.msgs[0].buf, 1)[0]
+		ctypes.memset(data.msgs[1].buf, register, data.msgs[1].len)
+		active.pop()
+	i2c = qwiic_adxl313.QwiicLinuxI2C(fd=-1, ioctl=ioctl)
+	errors = []
+	def reader(register):
+		try:
+			for _ in range(20):
+				assert i2c.readBlock(0x1D, register, 4) == [register] * 4
+		except AssertionError as e:
+			errors.append(e)
+	threads = [threading.Thread(target=reader, args=(register,)) for register in (0x10, 0x20, 0x30)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert not errors
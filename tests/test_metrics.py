@@ -0,0 +1,51 @@
+import qwiic_adxl313
+import qwiic_adxl313_metrics
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+def _measure(device):
+	device._writeRegister(Adxl.ADXL313_BW_RATE, Adxl.ADXL313_BW_100)
+	device._writeRegister(Adxl.ADXL313_POWER_CTL, 1 << Adxl.ADXL313_MEASURE_BIT)
+	return device
+
+def test_public_configuration_getters(device):
+	_measure(device)
+	assert device.getConfiguredDataRate() == 200.0
+	assert device.getConfiguredRange() == 0.5
+	assert device.getConfiguredScale() == 1 / 1024.0
+	assert device.getPowerState() == 'measure'
+
+def test_scrapes_are_stateless(device):
+	_measure(device)
+	metrics = device.enableMetrics()
+	metrics.observeDrain(32, 0.001)
+	metrics.observeDrain(10, 0.0004)
+	first = qwiic_adxl313_metrics.renderMetrics([metrics])
+	assert qwiic_adxl313_metrics.renderMetrics([metrics]) == first
+	assert 'adxl313_samples_total{address="0x1D"} 42' in first
+	assert 'adxl313_fifo_full_drains_total{address="0x1D"} 1' in first
+	assert 'adxl313_output_data_rate_hz{address="0x1D"} 200.0' in first
+	assert 'adxl313_power_state{address="0x1D",state="measure"} 1' in first
+	for line in first.splitlines():
+		if line.startswith('# TYPE') and line.endswith(' gauge'):
+			assert line.split()[2] in ('adxl313_output_data_rate_hz', 'adxl313_asleep', 'adxl313_power_state')
+
+def test_bus_transaction_latency(device, bus):
+	metrics = device.enableMetrics()
+	_measure(device)
+	bus.fifo.extend([(0, 0, 256)] * 5)
+	device.readFifo()
+	# two register writes, a FIFO_STATUS read and five data reads
+	assert metrics.transactions == 8
+	assert metrics.drains == 1
+	assert 0 < metrics.transactionLatencySum <= metrics.latencySum + 1.0
+	text = qwiic_adxl313_metrics.renderMetrics([metrics])
+	assert 'adxl313_i2c_transaction_latency_seconds_count{address="0x1D"} 8' in text
+	assert 'adxl313_i2c_transaction_latency_seconds_bucket{address="0x1D",le="+Inf"} 8' in text
+
+def test_failed_transactions_are_timed(device, bus):
+	metrics = device.enableMetrics()
+	bus.error = OSError(121, 'Remote I/O error')
+	assert not device._writeRegister(Adxl.ADXL313_BW_RATE, Adxl.ADXL313_BW_100)
+	assert metrics.transactions == 1
+	assert device.i2cErrors == 1
@@ -0,0 +1,45 @@
+import threading
+import time
+
+import qwiic_adxl313
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+def dataReads(bus):
+	return sum(1 for register, _ in bus.blockReads if register == Adxl.ADXL313_DATA_X0)
+
+def test_cached_within_max_age(device, bus):
+	bus.regs[Adxl.ADXL313_DATA_X0:Adxl.ADXL313_DATA_X0 + 6] = bytes([1, 0, 2, 0, 0, 1])
+	version, timestamp, sample = device.readLatest(maxAge=10.0)
+	assert sample == (1, 2, 256)
+	assert device.readLatest(maxAge=10.0) == (version, timestamp, sample)
+	assert dataReads(bus) == 1
+
+def test_stale_sample_is_read_again(device, bus):
+	first = device.readLatest(maxAge=0.0)
+	time.sleep(0.001)
+	second = device.readLatest(maxAge=0.0)
+	assert second[0] == first[0] + 1
+	assert second[1] > first[1]
+	assert dataReads(bus) == 2
+
+def test_readers_share_one_bus_read(device, bus):
+	readBlock = bus.readBlock
+	def slowReadBlock(address, commandCode, nBytes):
+		time.sleep(0.05)
+		return readBlock(address, commandCode, nBytes)
+	bus.readBlock = slowReadBlock
+	results = []
+	threads = [threading.Thread(target=lambda: results.append(device.readLatest(maxAge=1.0))) for _ in range(4)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert dataReads(bus) == 1
+	assert len(set(results)) == 1
+
+def test_fifo_reads_refresh_the_cache(device, bus):
+	bus.fifo.extend([(1, 1, 256), (2, 2, 256)])
+	device.readFifo()
+	assert device.readLatest(maxAge=10.0)[2] == (2, 2, 256)
+	assert dataReads(bus) == 2
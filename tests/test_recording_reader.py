@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+import qwiic_adxl313
+
+RATE = 100.0
+SCALE = 1 / 1024.0
+
+def _batch(first, count):
+	samples = [(int(round((first + i / RATE) * 100)) % 30000, i, 1024) for i in range(count)]
+	return qwiic_adxl313.SampleBatch.fromSamples(samples, first + (count - 1) / RATE, RATE, SCALE)
+
+def _record(directory, batches, segmentBytes=1):
+	with qwiic_adxl313.SampleRecorder(directory, segmentBytes=segmentBytes, fsync='never') as recorder:
+		for batch in batches:
+			recorder.record(batch)
+
+def _times(batches):
+	return [round(batch.sampleTime(i), 6) for batch in batches for i in range(len(batch))]
+
+@pytest.fixture
+def recording(tmp_path):
+	# three segments of two 50 sample batches each, 1000.0 to 1002.99
+	directory = str(tmp_path / "recording")
+	batches = [_batch(1000.0 + 0.5 * i, 50) for i in range(6)]
+	_record(directory, batches, segmentBytes=2 * (24 + 6 * 50))
+	return directory, batches
+
+def test_reads_back_everything(recording):
+	directory, batches = recording
+	reader = qwiic_adxl313.RecordingReader(directory)
+	assert len(reader.segments) == 3
+	read = list(reader.batches())
+	assert [list(batch) for batch in read] == [list(batch) for batch in batches]
+	assert [batch.timestamp for batch in read] == [batch.timestamp for batch in batches]
+	assert read[0].rate == RATE and read[0].scale == pytest.approx(SCALE)
+	assert reader.timeRange() == (1000.0, pytest.approx(1002.99))
+
+def test_time_range_is_trimmed_to_the_sample(recording):
+	directory, batches = recording
+	read = list(qwiic_adxl313.RecordingReader(directory).batches(start=1000.755, end=1001.2))
+	times = _times(read)
+	assert times[0] == 1000.76
+	assert times[-1] == 1001.19
+	assert len(times) == 44
+	assert all(batch.rate == RATE for batch in read)
+
+def test_seeking_opens_only_the_segment_needed(recording, monkeypatch):
+	directory, batches = recording
+	reader = qwiic_adxl313.RecordingReader(directory)
+	opened = []
+	realOpen = open
+	def trackingOpen(path, *args, **kwargs):
+		opened.append(os.path.basename(path))
+		return realOpen(path, *args, **kwargs)
+	monkeypatch.setattr('builtins.open', trackingOpen)
+	assert len(_times(reader.batches(start=2002.0))) == 0
+	assert _times(reader.batches(start=1002.5))[0] == 1002.5
+	assert opened == [reader.segments[-1], reader.segments[-1]]
+
+def test_record_being_written_is_skipped(recording):
+	directory, batches = recording
+	reader = qwiic_adxl313.RecordingReader(directory)
+	with open(os.path.join(directory, reader.segments[-1]), 'ab') as f:
+		f.write(b'AXL1' + bytes(10))
+	assert len(list(reader.batches())) == len(batches)
+
+def test_corrupt_record(recording):
+	directory, batches = recording
+	reader = qwiic_adxl313.RecordingReader(directory)
+	with open(os.path.join(directory, reader.segments[0]), 'r+b') as f:
+		f.write(b'XXXX')
+	with pytest.raises(ValueError):
+		list(reader.batches())
+
+def test_empty_recording(tmp_path):
+	directory = str(tmp_path / "recording")
+	os.makedirs(directory)
+	reader = qwiic_adxl313.RecordingReader(directory)
+	assert reader.timeRange() is None
+	assert list(reader.batches()) == []
+
+def test_chunks(recording):
+	numpy = pytest.importorskip("numpy")
+	directory, batches = recording
+	chunks = list(qwiic_adxl313.RecordingReader(directory).chunks(chunkSize=128))
+	assert [len(timestamps) for timestamps, samples in chunks] == [128, 128, 44]
+	timestamps = numpy.concatenate([timestamps for timestamps, samples in chunks])
+	samples = numpy.concatenate([samples for timestamps, samples in chunks])
+	assert numpy.allclose(timestamps, _times(batches))
+	assert samples.dtype == numpy.float32
+	assert numpy.allclose(samples[:, 2], 1.0)
+	raw = numpy.concatenate([samples for timestamps, samples in
+							 qwiic_adxl313.RecordingReader(directory).chunks(chunkSize=128, scaled=False)])
+	assert raw.dtype == numpy.int16
+	assert raw.tolist() == [list(sample) for batch in batches for sample in batch]
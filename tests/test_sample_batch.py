@@ -0,0 +1,53 @@
+import struct
+
+import pytest
+
+import qwiic_adxl313
+
+SAMPLES = [(1, -2, 1024), (-300, 400, 1000), (32767, -32768, 0)]
+
+def _batch():
+	return qwiic_adxl313.SampleBatch.fromSamples(SAMPLES, timestamp=10.0, rate=100.0, scale=1 / 1024.0)
+
+def test_sequence():
+	batch = _batch()
+	assert len(batch) == 3
+	assert list(batch) == SAMPLES
+	assert batch[-1] == SAMPLES[-1]
+	assert batch[0:2] == SAMPLES[0:2]
+	with pytest.raises(IndexError):
+		batch[3]
+
+def test_from_bytes_round_trip():
+	raw = b"".join(struct.pack("<hhh", *sample) for sample in SAMPLES)
+	assert list(qwiic_adxl313.SampleBatch.fromBytes(raw)) == SAMPLES
+
+def test_buffer_is_zero_copy():
+	batch = _batch()
+	view = batch.buffer
+	assert view.format == "h" and view.contiguous
+	assert view.nbytes == 6 * len(batch)
+	assert view.obj is batch.data
+
+def test_axis_views():
+	batch = _batch()
+	assert batch.x.tolist() == [s[0] for s in SAMPLES]
+	assert batch.y.tolist() == [s[1] for s in SAMPLES]
+	assert batch.z.tolist() == [s[2] for s in SAMPLES]
+
+def test_columns_are_contiguous():
+	x, y, z = _batch().columns()
+	assert memoryview(x).contiguous
+	assert (list(x), list(y), list(z)) == tuple(list(axis) for axis in zip(*SAMPLES))
+
+def test_numpy_hand_off():
+	numpy = pytest.importorskip("numpy")
+	batch = _batch()
+	values = numpy.frombuffer(batch.buffer, dtype=numpy.int16).reshape(-1, 3)
+	assert values.tolist() == [list(s) for s in SAMPLES]
+	assert numpy.asarray(batch.y).tolist() == [s[1] for s in SAMPLES]
+	assert numpy.frombuffer(batch.columns()[2], dtype=numpy.int16).tolist() == [s[2] for s in SAMPLES]
+
+def test_immutable():
+	with pytest.raises(AttributeError):
+		_batch().rate = 5
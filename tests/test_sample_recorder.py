@@ -0,0 +1,83 @@
+import os
+import struct
+import threading
+
+import qwiic_adxl313
+
+RATE = 100.0
+SCALE = 1 / 1024.0
+HEADER = struct.Struct('<4sIdff')
+
+def _batch(first, count, start=0):
+	samples = [(i, -i, 1024) for i in range(start, start + count)]
+	return qwiic_adxl313.SampleBatch.fromSamples(samples, first + (count - 1) / RATE, RATE, SCALE)
+
+def _segments(directory):
+	return sorted(name for name in os.listdir(directory) if name.endswith(".seg"))
+
+def test_record_format(tmp_path):
+	directory = str(tmp_path / "recording")
+	with qwiic_adxl313.SampleRecorder(directory, fsync='never') as recorder:
+		assert recorder.record(_batch(1000.0, 3))
+	assert recorder.stats()['batchesWritten'] == 1
+	assert _segments(directory) == ["adxl313-00000000-0000001000000000.seg"]
+	with open(os.path.join(directory, _segments(directory)[0]), 'rb') as f:
+		data = f.read()
+	magic, count, timestamp, rate, scale = HEADER.unpack(data[:HEADER.size])
+	assert (magic, count, timestamp, rate) == (b'AXL1', 3, 1000.02, RATE)
+	assert scale == struct.unpack('<f', struct.pack('<f', SCALE))[0]
+	assert data[HEADER.size:] == struct.pack('<9h', 0, 0, 1024, 1, -1, 1024, 2, -2, 1024)
+
+def test_segments_rotate_and_continue_numbering(tmp_path):
+	directory = str(tmp_path / "recording")
+	with qwiic_adxl313.SampleRecorder(directory, segmentBytes=1, fsync='never') as recorder:
+		recorder.record(_batch(1000.0, 10))
+		recorder.record(_batch(1001.0, 10))
+	with qwiic_adxl313.SampleRecorder(directory, segmentBytes=1, fsync='never') as recorder:
+		recorder.record(_batch(1002.0, 10))
+	assert [name.split('-')[1] for name in _segments(directory)] == ["00000000", "00000001", "00000002"]
+
+def test_old_segments_are_pruned(tmp_path):
+	directory = str(tmp_path / "recording")
+	recordBytes = HEADER.size + 6 * 10
+	with qwiic_adxl313.SampleRecorder(directory, segmentBytes=recordBytes, maxBytes=3 * recordBytes, fsync='never') as recorder:
+		for second in range(6):
+			recorder.record(_batch(1000.0 + second, 10))
+	stats = recorder.stats()
+	# the budget holds the segment being written and the two before it
+	assert stats['segmentsDeleted'] == 3
+	assert len(_segments(directory)) == 3
+	assert sum(os.path.getsize(os.path.join(directory, name)) for name in _segments(directory)) <= 3 * recordBytes
+
+def test_full_queue_drops_without_blocking(tmp_path):
+	directory = str(tmp_path / "recording")
+	recorder = qwiic_adxl313.SampleRecorder(directory, fsync='never', queueSize=2)
+	started = threading.Event()
+	release = threading.Event()
+	write = recorder._write
+	def slowWrite(batch):
+		started.set()
+		release.wait()
+		write(batch)
+	recorder._write = slowWrite
+	assert recorder.record(_batch(1000.0, 10))
+	assert started.wait(1.0)
+	# the writer is stuck on the first batch, two more fit in the queue
+	results = [recorder.record(_batch(1001.0 + second, 10)) for second in range(9)]
+	release.set()
+	recorder.close()
+	assert results == [True, True] + [False] * 7
+	stats = recorder.stats()
+	assert stats['batchesDropped'] == 7
+	assert stats['batchesWritten'] == 3
+
+def test_write_errors_are_kept(tmp_path):
+	directory = str(tmp_path / "recording")
+	recorder = qwiic_adxl313.SampleRecorder(directory, fsync='never')
+	def failingWrite(batch):
+		raise OSError(28, "No space left on device")
+	recorder._write = failingWrite
+	recorder.record(_batch(1000.0, 10))
+	recorder.close()
+	assert recorder.error.errno == 28
+	assert recorder.stats()['batchesDropped'] == 1
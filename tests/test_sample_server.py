@@ -0,0 +1,54 @@
+import os
+import socket
+
+import pytest
+
+import qwiic_adxl313
+import qwiic_adxl313_server
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix sockets")
+
+def _batch(count):
+	return qwiic_adxl313.SampleBatch.fromSamples([(i % 100, 0, 1024) for i in range(count)],
+												 timestamp=100.0, rate=3200.0, scale=1 / 1024.0)
+
+@pytest.fixture
+def server(tmp_path):
+	server = qwiic_adxl313_server.SampleServer(unixPath=os.path.join(str(tmp_path), "server.sock"))
+	yield server
+	server.close()
+
+def _receiveAll(subscriber):
+	frames = []
+	while True:
+		frame = subscriber.receive(timeout=0.2)
+		if frame is None:
+			return frames
+		frames.append(frame)
+
+def test_rate_limit_keeps_whole_batches(server):
+	subscriber = qwiic_adxl313_server.SampleSubscriber(server.unixPath, maxRate=1.0)
+	try:
+		server.publish(_batch(2500))	# 3 frames
+		server.publish(_batch(2500))	# within the limit, skipped
+		frames = _receiveAll(subscriber)
+		assert [sequence for sequence, _ in frames] == [0, 1, 2]
+		assert sum(len(batch) for _, batch in frames) == 2500
+		assert frames[-1][1].timestamp == 100.0
+		assert server.framesRateLimited == 3
+	finally:
+		subscriber.close()
+
+def test_skipped_batches_leave_no_sequence_gap(server):
+	subscriber = qwiic_adxl313_server.SampleSubscriber(server.unixPath, maxRate=1.0)
+	try:
+		server.publish(_batch(1500))	# 2 frames
+		server.publish(_batch(1500))	# rate limited
+		server._subscribers[subscriber.path][1] -= 1.0		# the limit interval passed
+		server.publish(_batch(10))
+		frames = _receiveAll(subscriber)
+		assert [sequence for sequence, _ in frames] == [0, 1, 2]
+		assert len(frames[2][1]) == 10
+		assert server.framesRateLimited == 2
+	finally:
+		subscriber.close()
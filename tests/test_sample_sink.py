@@ -0,0 +1,31 @@
+import qwiic_adxl313
+
+def _batch():
+	return qwiic_adxl313.SampleBatch.fromSamples([(0, 0, 1024)] * 4, timestamp=1.0, rate=100.0)
+
+def test_default_names_are_unique():
+	fanout = qwiic_adxl313.SampleFanout([qwiic_adxl313.SampleSink(lambda batches: None) for _ in range(3)])
+	try:
+		names = [sink.name for sink in fanout.sinks]
+		assert len(set(names)) == 3
+		assert all(name.startswith('<lambda>-') for name in names)
+		assert len(fanout.stats()) == 3
+	finally:
+		fanout.close()
+
+def test_stats_keep_sinks_with_the_same_name():
+	fanout = qwiic_adxl313.SampleFanout([qwiic_adxl313.SampleSink(lambda batches: None, name='log') for _ in range(3)])
+	fanout.close()
+	assert sorted(fanout.stats()) == ['log', 'log#2', 'log#3']
+
+def test_offer_after_close_is_dropped():
+	delivered = []
+	sink = qwiic_adxl313.SampleSink(delivered.extend)
+	assert sink.offer(_batch())
+	sink.close()
+	assert not sink.offer(_batch())
+	stats = sink.stats()
+	assert stats['batchesIn'] == 2
+	assert stats['batchesDelivered'] == 1 and len(delivered) == 1
+	assert stats['batchesDropped'] == 1
+	assert stats['queued'] == 0
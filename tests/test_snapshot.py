@@ -0,0 +1,49 @@
+import qwiic_adxl313
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+def test_burst_reads_skip_data_and_int_source(device, bus):
+	bus.fifo.append((1, 2, 3))
+	snap = device.snapshot()
+	assert len(bus.blockReads) == 4
+	skipped = {Adxl.ADXL313_INT_SOURCE} | set(range(Adxl.ADXL313_DATA_X0, Adxl.ADXL313_DATA_Z1 + 1))
+	for start, count in bus.blockReads:
+		assert not set(range(start, start + count)) & skipped
+	assert len(bus.fifo) == 1
+	assert snap.intSource is None
+
+def test_int_source_on_request(device, bus):
+	bus.regs[Adxl.ADXL313_INT_SOURCE] = 1 << Adxl.ADXL313_INT_ACTIVITY_BIT
+	snap = device.snapshot(includeIntSource=True)
+	assert len(bus.blockReads) == 3
+	assert snap.intSource == 1 << Adxl.ADXL313_INT_ACTIVITY_BIT
+
+def test_decoded_fields(device, bus):
+	bus.regs[Adxl.ADXL313_OFSX] = 0xFE
+	bus.regs[Adxl.ADXL313_POWER_CTL] = 1 << Adxl.ADXL313_MEASURE_BIT
+	bus.regs[Adxl.ADXL313_BW_RATE] = Adxl.ADXL313_BW_400
+	snap = device.snapshot()
+	assert snap.validId
+	assert snap.offsetX == -2
+	assert snap.measure == 1
+	assert snap.dataRate == 800.0		# BW_RATE codes are named after the bandwidth, half the data rate
+
+def test_diff_and_equality(device, bus):
+	first = device.snapshot()
+	assert device.snapshot() == first
+	bus.regs[Adxl.ADXL313_THRESH_ACT] = 20
+	second = device.snapshot()
+	assert second != first
+	assert second.diff(first) == [Adxl.ADXL313_THRESH_ACT]
+
+def test_refreshes_cached_configuration(device, bus):
+	# registers written behind this object's back are picked up, and re-applied by recover()
+	bus.regs[Adxl.ADXL313_BW_RATE] = Adxl.ADXL313_BW_800
+	bus.regs[Adxl.ADXL313_THRESH_ACT] = 42
+	device.snapshot()
+	assert device.getConfiguredDataRate() == 1600.0
+	bus.regs[Adxl.ADXL313_BW_RATE] = Adxl.ADXL313_BW_RATE_RESET
+	bus.regs[Adxl.ADXL313_THRESH_ACT] = 0
+	assert device.recover()
+	assert bus.regs[Adxl.ADXL313_BW_RATE] == Adxl.ADXL313_BW_800
+	assert bus.regs[Adxl.ADXL313_THRESH_ACT] == 42
@@ -0,0 +1,23 @@
+import qwiic_adxl313
+
+class FakeSpi(object):
+	def __init__(self, speed):
+		self.max_speed_hz = speed
+		self.speeds = []
+
+	def xfer2(self, values, speed=0, delay=0):
+		self.speeds.append(speed)
+		return [0] * len(values)
+
+def test_read_blocks_keeps_caller_speed():
+	spi = FakeSpi(1000000)
+	driver = qwiic_adxl313.QwiicAdxl313Spi(spi=spi)
+	driver.readBlocks(0, qwiic_adxl313.QwiicAdxl313.ADXL313_DATA_X0, 6, 3)
+	assert spi.speeds == [1000000] * 3
+
+def test_read_blocks_explicit_speed():
+	spi = FakeSpi(1000000)
+	driver = qwiic_adxl313.QwiicAdxl313Spi(maxSpeed=2000000, spi=spi)
+	assert len(driver.readBlocks(0, qwiic_adxl313.QwiicAdxl313.ADXL313_DATA_X0, 6, 2)) == 12
+	assert spi.speeds == [2000000] * 2
+	assert spi.max_speed_hz == 1000000
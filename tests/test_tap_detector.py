@@ -0,0 +1,82 @@
+import pytest
+
+import qwiic_adxl313
+
+RATE = 1600.0
+SCALE = 1 / 1024.0
+
+def _samples(count, taps):
+	# resting on z (1 g), with taps of 3000 counts on z at {start: length}
+	samples = []
+	for index in range(count):
+		z = 1024
+		for start, length in taps.items():
+			if start <= index < start + length:
+				z += 3000
+		samples.append((0, 0, z))
+	return samples
+
+@pytest.fixture(params=['numpy', 'python'])
+def implementation(request, monkeypatch):
+	if request.param == 'numpy':
+		pytest.importorskip("numpy")
+	else:
+		monkeypatch.setattr(qwiic_adxl313, '_numpy', lambda: None)
+	return request.param
+
+def _events(samples, batchSize, duration=0.02):
+	detector = qwiic_adxl313.TapDetector(threshold=1.5, duration=duration, latency=0.05, window=0.3)
+	events = []
+	for first in range(0, len(samples), batchSize):
+		chunk = samples[first:first + batchSize]
+		timestamp = 100.0 + (first + len(chunk) - 1) / RATE
+		events += detector.process(qwiic_adxl313.SampleBatch.fromSamples(chunk, timestamp, RATE, SCALE))
+	return events
+
+def _run(samples, batchSize, duration=0.02):
+	return [(event.kind, event.sampleIndex, round(event.timestamp, 6)) for event in _events(samples, batchSize, duration)]
+
+def test_tap_and_double_tap():
+	events = _run(_samples(4000, {1000: 10, 1300: 10, 3000: 100}), 32)
+	assert events == [('tap', 1000, round(100.0 + 1000 / RATE, 6)),
+					  ('double-tap', 1300, round(100.0 + 1300 / RATE, 6))]
+
+def test_run_ending_on_batch_boundary():
+	# the tap covers samples 1016-1023 and ends exactly where the next batch starts
+	events = _run(_samples(2048, {1016: 8}), 32)
+	assert events == [('tap', 1016, round(100.0 + 1016 / RATE, 6))]
+
+def test_run_split_across_batches():
+	# the tap starts in one batch and ends in the next
+	samples = _samples(2048, {1020: 8})
+	assert _run(samples, 32) == [('tap', 1020, round(100.0 + 1020 / RATE, 6))]
+	assert _run(samples, 32) == _run(samples, 7) == _run(samples, 1024)
+
+def test_tap_in_the_first_batch(implementation):
+	# the rest estimate must not start from a mean pulled up by the tap
+	events = _events(_samples(256, {8: 10}), 32)
+	assert [event.kind for event in events] == ['tap']
+	assert events[0].peak == pytest.approx(3000 * SCALE)
+
+def test_taps_do_not_move_the_rest_estimate(implementation):
+	# a burst of taps must not raise the rest level
+	taps = dict((start, 10) for start in range(100, 3000, 200))
+	events = _events(_samples(3200, taps), 256)
+	assert len(events) == len(taps)
+	assert all(event.peak == pytest.approx(3000 * SCALE) for event in events)
+
+def test_rest_follows_a_change_of_orientation(implementation):
+	# z goes from 1 g to 0 g for good: too long for a tap, the rest level moves to it
+	samples = [(0, 0, 1024)] * 256 + [(0, 0, -500)] * 12000
+	samples[10000:10010] = [(0, 0, 2500)] * 10
+	events = _events(samples, 256)
+	assert [(event.kind, event.sampleIndex) for event in events] == [('tap', 10000)]
+	assert events[0].peak == pytest.approx(3000 * SCALE, rel=0.01)
+
+def test_latency_counts_from_the_end_of_the_tap(implementation):
+	# 30 sample taps; latency is 80 samples. The second tap starts 110 samples after
+	# the first one started, but only 80 after it ended: ignored, as on the sensor
+	assert _run(_samples(2048, {1000: 30, 1110: 30}), 32, duration=0.05) == [
+		('tap', 1000, round(100.0 + 1000 / RATE, 6))]
+	assert _run(_samples(2048, {1000: 30, 1111: 30}), 32, duration=0.05) == [
+		('tap', 1000, round(100.0 + 1000 / RATE, 6)), ('double-tap', 1111, round(100.0 + 1111 / RATE, 6))]
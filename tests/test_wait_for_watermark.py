@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+import qwiic_adxl313
+
+Adxl = qwiic_adxl313.QwiicAdxl313
+
+class CountingSimulator(qwiic_adxl313.QwiicAdxl313Simulator):
+	def __init__(self):
+		super(CountingSimulator, self).__init__()
+		self.statusReads = 0
+
+	def readByte(self, address, commandCode):
+		if commandCode == Adxl.ADXL313_FIFO_STATUS:
+			self.statusReads += 1
+		return super(CountingSimulator, self).readByte(address, commandCode)
+
+def streamingDevice(watermark):
+	simulator = CountingSimulator()
+	device = Adxl(i2c_driver=simulator)
+	device.setBandwidth(Adxl.ADXL313_BW_200)		# 400Hz
+	device.setFifoMode(Adxl.ADXL313_FIFO_MODE_STREAM)
+	device.setFifoSamplesThreshhold(watermark)
+	device.measureModeOn()
+	return device, simulator
+
+def test_returns_at_the_watermark_with_few_polls():
+	device, simulator = streamingDevice(16)
+	start = time.monotonic()
+	entries = device.waitForWatermark(timeout=1.0)
+	elapsed = time.monotonic() - start
+	assert entries >= 16
+	assert elapsed >= 0.9 * 16 / 400.0
+	# a prediction plus a correction or two, not a busy loop
+	assert simulator.statusReads <= 5
+
+def test_repeated_waits_drain_at_the_watermark():
+	device, simulator = streamingDevice(8)
+	for _ in range(5):
+		entries = device.waitForWatermark(timeout=1.0)
+		assert 8 <= entries < Adxl.ADXL313_FIFO_SIZE
+		device.readFifo(entries)
+
+def test_timeout_without_data(device, bus):
+	device.setFifoMode(Adxl.ADXL313_FIFO_MODE_STREAM)
+	device.setFifoSamplesThreshhold(16)
+	start = time.monotonic()
+	assert device.waitForWatermark(timeout=0.05) is None
+	assert time.monotonic() - start < 0.5
+
+def test_fifo_already_past_the_watermark(device, bus):
+	device.setFifoMode(Adxl.ADXL313_FIFO_MODE_STREAM)
+	device.setFifoSamplesThreshhold(4)
+	bus.fifo.extend([(0, 0, 256)] * 10)
+	assert device.waitForWatermark(timeout=0) == 10
+	assert bus.reads[Adxl.ADXL313_FIFO_STATUS] == 1
+
+def test_bypass_mode_is_refused(device, bus):
+	# the FIFO never fills in bypass mode, waiting would never end
+	with pytest.raises(ValueError):
+		device.waitForWatermark()
+	device.setFifoMode(Adxl.ADXL313_FIFO_MODE_STREAM)
+	device.setFifoMode(Adxl.ADXL313_FIFO_MODE_BYPASS)
+	with pytest.raises(ValueError):
+		device.waitForWatermark(timeout=1.0)